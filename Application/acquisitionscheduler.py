@@ -0,0 +1,158 @@
+# SPDX-FileCopyrightText: 2023 Karl Bauer (BAUER GROUP)
+# SPDX-License-Identifier: MIT
+
+#######################################################################################################################
+#
+# Description :  Package for Toni der Topf
+# Author      :  Karl Bauer (karl.bauer@bauer-group.com) / www.bauer-group.com
+#
+#######################################################################################################################
+
+# System Imports
+import time
+import threading
+
+# Local Imports
+from .stagetimer import Histogram
+
+#######################################################################################################################
+
+class AcquisitionJob:
+    """A sensor read scheduled every ``interval`` seconds; ``handler`` gets the value of each read."""
+
+    def __init__(self, name, interval, read, handler):
+        if interval <= 0:
+            raise ValueError(f"Invalid interval for {name}: {interval}")
+        self.name = name
+        self.interval = interval
+        self.read = read
+        self.handler = handler
+        self.next_due = None
+
+        self.reads = 0
+        self.errors = 0
+        self.missed = 0
+        self.last_error = None
+        self.drift = Histogram()  # Distance of the read from its deadline
+        self.duration = Histogram()  # Bus time of the read
+
+    @property
+    def stats(self):
+        return {
+            "interval_s": self.interval,
+            "reads": self.reads,
+            "errors": self.errors,
+            "missed_deadlines": self.missed,
+            "drift_p50_ms": self.drift.percentile(50),
+            "drift_p99_ms": self.drift.percentile(99),
+            "drift_max_ms": round(self.drift.max * 1000, 3),
+            "read_mean_ms": round(self.duration.total / self.duration.count * 1000, 3) if self.duration.count else 0.0,
+            "last_error": self.last_error,
+        }
+
+#######################################################################################################################
+
+class AcquisitionScheduler:
+    """Reads all sensors of the I2C bus from a single thread.
+
+    Every job keeps a fixed grid of deadlines (start + n * interval), so the timing does not
+    drift with the read durations. Jobs that fall due within ``batch_window`` of each other are
+    read back to back while holding ``bus_lock`` once, and their handlers run after the bus was
+    released. Deadlines that passed while the bus was busy are counted as missed and skipped.
+    """
+
+    def __init__(self, bus_lock=None, batch_window=0.05, clock=time.monotonic):
+        self.bus_lock = bus_lock if bus_lock is not None else threading.Lock()
+        self.batch_window = batch_window
+        self._clock = clock
+        self._jobs = []
+        self._stop_event = threading.Event()
+        self._thread = None
+
+        self.batches = 0
+
+    def add(self, name, interval, read, handler) -> AcquisitionJob:
+        job = AcquisitionJob(name, interval, read, handler)
+        self._jobs.append(job)
+        return job
+
+    @property
+    def jobs(self):
+        return list(self._jobs)
+
+    @property
+    def lag(self):
+        """Seconds the most overdue read is behind its deadline."""
+        now = self._clock()
+        return max([0.0] + [now - job.next_due for job in self._jobs if job.next_due is not None])
+
+    @property
+    def stats(self):
+        return {
+            "batches": self.batches,
+            "lag_s": round(self.lag, 3),
+            "jobs": {job.name: job.stats for job in self._jobs},
+        }
+
+    def start(self):
+        start = self._clock()
+        for job in self._jobs:
+            job.next_due = start + job.interval  # The sensors were read once when they were set up
+
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread is not None and self._thread.is_alive():
+            self._thread.join()
+
+    def _run(self):
+        while self._jobs and not self._stop_event.is_set():
+            now = self._clock()
+            next_due = min(job.next_due for job in self._jobs)
+            if next_due > now:
+                if self._stop_event.wait(next_due - now):
+                    break
+                now = self._clock()
+
+            self.run_due(now)
+
+    def run_due(self, now):
+        """Read all jobs due until ``now`` plus the batch window, then schedule their next deadlines."""
+        due = [job for job in self._jobs if job.next_due <= now + self.batch_window]
+        if not due:
+            return
+
+        values = []
+        with self.bus_lock:
+            for job in due:
+                started = self._clock()
+                job.drift.record(abs(started - job.next_due))
+                try:
+                    values.append((job, job.read()))
+                    job.reads += 1
+                except Exception as e:  # I2C errors must not stop the acquisition of the other sensors
+                    job.errors += 1
+                    job.last_error = repr(e)
+                job.duration.record(self._clock() - started)
+        self.batches += 1
+
+        for job, value in values:
+            try:
+                job.handler(value)
+            except Exception as e:
+                job.errors += 1
+                job.last_error = repr(e)
+
+        # Next deadlines on the grid of each job, deadlines that already passed are skipped
+        now = self._clock()
+        for job in due:
+            job.next_due += job.interval
+            if job.next_due < now:
+                missed = int((now - job.next_due) // job.interval) + 1
+                job.missed += missed
+                job.next_due += missed * job.interval
+
+#######################################################################################################################
@@ -0,0 +1,102 @@
+# SPDX-FileCopyrightText: 2023 Karl Bauer (BAUER GROUP)
+# SPDX-License-Identifier: MIT
+
+#######################################################################################################################
+#
+# Description :  Package for Toni der Topf
+# Author      :  Karl Bauer (karl.bauer@bauer-group.com) / www.bauer-group.com
+#
+#######################################################################################################################
+
+# System Imports
+import time
+import statistics
+
+# Local Imports
+from .stagetimer import Histogram
+
+#######################################################################################################################
+
+class ADCSampler:
+    """Oversamples the channels of an A/D converter and reduces each channel to one value.
+
+    ``read_channel(channel)`` returns one conversion. In continuous mode the converter keeps
+    converting the selected channel at ``data_rate`` samples per second: the first read of a
+    channel switches the multiplexer (and waits for it to settle), the following ones only fetch
+    the conversion register, spaced one conversion period apart so each returns a new
+    conversion. Each channel is sampled completely before the multiplexer moves on, so it is
+    switched once per channel and cycle, and never when only one channel is sampled.
+
+    The latency of each channel and of the whole cycle is kept in histograms.
+    """
+
+    REDUCERS = {"median": statistics.median_low, "mean": statistics.fmean}
+
+    def __init__(
+        self,
+        read_channel,
+        channels=(0, 1, 2, 3),
+        samples=8,
+        reducer="median",
+        data_rate=860,
+        continuous=True,
+        sleep=time.sleep,
+        clock=time.perf_counter,
+    ):
+        if reducer not in self.REDUCERS:
+            raise ValueError(f"Invalid reducer: {reducer}. Valid reducers are: {list(self.REDUCERS)}")
+        if samples < 1:
+            raise ValueError(f"Invalid number of samples: {samples}")
+
+        self._read_channel = read_channel
+        self.channels = tuple(channels)
+        self.samples = samples
+        self.reducer = reducer
+        self.data_rate = data_rate
+        self.continuous = continuous
+        self._reduce = self.REDUCERS[reducer]
+        self._sleep = sleep
+        self._clock = clock
+
+        self.cycle_latency = Histogram()
+        self.channel_latency = {channel: Histogram() for channel in self.channels}
+        self.spread = {channel: 0 for channel in self.channels}  # Max - min of the samples of the last cycle
+
+    def read(self):
+        """Return ``{channel: value}`` with the reduced samples of every channel."""
+        values = {}
+        cycle_start = self._clock()
+        for channel in self.channels:
+            start = self._clock()
+            samples = [self._read_channel(channel)]
+            for _ in range(self.samples - 1):
+                if self.continuous:
+                    self._sleep(1 / self.data_rate)  # Single-shot reads wait for their own conversion
+                samples.append(self._read_channel(channel))
+            values[channel] = self._reduce(samples)
+            self.spread[channel] = max(samples) - min(samples)
+            self.channel_latency[channel].record(self._clock() - start)
+        self.cycle_latency.record(self._clock() - cycle_start)
+        return values
+
+    @property
+    def stats(self):
+        return {
+            "mode": "continuous" if self.continuous else "single",
+            "data_rate": self.data_rate,
+            "samples": self.samples,
+            "reducer": self.reducer,
+            "cycle": self._latency(self.cycle_latency),
+            "channels": {channel: dict(self._latency(histogram), spread=self.spread[channel])
+                         for channel, histogram in self.channel_latency.items()},
+        }
+
+    @staticmethod
+    def _latency(histogram):
+        return {
+            "mean_ms": round(histogram.total / histogram.count * 1000, 3) if histogram.count else 0.0,
+            "p99_ms": histogram.percentile(99),
+            "max_ms": round(histogram.max * 1000, 3),
+        }
+
+#######################################################################################################################
@@ -0,0 +1,242 @@
+# SPDX-FileCopyrightText: 2023 Karl Bauer (BAUER GROUP)
+# SPDX-License-Identifier: MIT
+
+#######################################################################################################################
+#
+# Description :  Package for Toni der Topf
+# Author      :  Karl Bauer (karl.bauer@bauer-group.com) / www.bauer-group.com
+#
+#######################################################################################################################
+
+# System Imports
+import os
+import json
+import bisect
+import struct
+import threading
+from collections import OrderedDict
+from PIL import Image
+
+# Local Imports
+from .imageprocessing import changed_regions, crop_rgb565, image_to_rgb565, to_display_orientation, transform_image
+
+#######################################################################################################################
+
+_CATALOG_FILE = "emotions.json"
+_ANIMATION_EXTENSIONS = (".webp", ".gif")
+
+
+def find_animation(catalog_folder, name):
+    """Return the path of the animation ``name`` (``tag`` or ``category/tag``) in the emoji catalog.
+
+    WebP is preferred over GIF, as it keeps the full colors and the alpha channel.
+    """
+    if "/" in name:
+        category, tag = name.split("/", 1)
+        categories = [category]
+    else:
+        tag = name
+        with open(os.path.join(catalog_folder, _CATALOG_FILE), "r") as f:
+            catalog = json.load(f)
+        categories = [category for category, tags in catalog.items() if tag in tags]
+
+    for category in categories:
+        for extension in _ANIMATION_EXTENSIONS:
+            path = os.path.join(catalog_folder, category, tag + extension)
+            if os.path.exists(path):
+                return path
+    raise ValueError(f"Animation not found in catalog: {name}")
+
+#######################################################################################################################
+
+class AnimatedFrameSource:
+    """Plays an animated GIF/WebP file with the same interface as a ``FrameSet``.
+
+    Frames are decoded from the file on demand, scaled to the display height, shifted once and
+    converted to RGB565. Only the last ``window`` converted frames are kept, so long animations
+    never sit in RAM completely. Each frame is shown for its own duration: the animation is
+    mapped onto the ticks of the frame scheduler (``frame_rate``), frames shorter than a tick
+    are skipped and never converted.
+    """
+
+    DEFAULT_DURATION = 100  # ms, for frames without a duration
+
+    def __init__(
+        self,
+        path,
+        durations,
+        width=320,
+        height=240,
+        rotation=90,
+        frame_rate=10,
+        shift_x=0,
+        rotate=0,
+        window=8,
+        full_frame_ratio=0.5,
+    ):
+        self.path = path
+        self.durations = durations
+        self.rotation = rotation
+        self.shift_x = shift_x
+        self.rotate = rotate
+        self.window = max(1, window)
+        self.full_frame_ratio = full_frame_ratio
+        self._logical_size = (width, height)
+
+        # Size in the native orientation of the display
+        if rotation in (90, 270):
+            self.width, self.height = height, width
+        else:
+            self.width, self.height = width, height
+
+        # Frame of the animation shown at every scheduler tick of one loop
+        ends = []
+        total = 0
+        for duration in durations:
+            total += duration
+            ends.append(total)
+        ticks = max(1, round(total * frame_rate / 1000))
+        self.tick_frames = [min(bisect.bisect_right(ends, tick * 1000 / frame_rate), len(durations) - 1)
+                            for tick in range(ticks)]
+
+        self._image = None
+        self._image_lock = threading.Lock()  # The file may be closed by another thread, e.g. on frame cache eviction
+        self._frames = OrderedDict()  # frame -> (buffer, update, previous frame of the update)
+        self._last_frame = None
+        self._last_image = None
+        self.decoded_frames = 0
+
+    def __len__(self):
+        return len(self.tick_frames)
+
+    @property
+    def nbytes(self):
+        # Upper bound of the converted frames kept in the window
+        return min(self.window, len(set(self.tick_frames))) * self.width * self.height * 2
+
+    def regions(self, index, previous_index=None):
+        """Return the windows ``(box, buffer)`` to write to show tick ``index`` after ``previous_index``.
+
+        Nothing has to be written while a frame is held over several ticks.
+        """
+        frame = self.tick_frames[index]
+        previous_frame = self.tick_frames[previous_index] if previous_index is not None else None
+        if frame == previous_frame:
+            return []
+
+        buffer, update, update_from = self._frame(frame)
+        if update is not None and update_from == previous_frame:
+            return update
+        return [((0, 0, self.width, self.height), buffer)]
+
+    def crop(self, index, box):
+        """Return the RGB565 pixels of tick ``index`` in ``box``."""
+        return crop_rgb565(self._frame(self.tick_frames[index])[0], self.width, box)
+
+    def _frame(self, frame):
+        entry = self._frames.get(frame)
+        if entry is not None:
+            self._frames.move_to_end(frame)
+            return entry
+
+        native_image = self._decode(frame)
+        buffer = image_to_rgb565(native_image)
+
+        # Diff against the frame converted before, which is the one shown before during playback
+        update = None
+        if self._last_image is not None:
+            boxes = changed_regions(self._last_image, native_image)
+            changed_area = sum((right - left) * (lower - upper) for left, upper, right, lower in boxes)
+            if changed_area <= self.full_frame_ratio * self.width * self.height:
+                update = [(box, crop_rgb565(buffer, self.width, box)) for box in boxes]
+
+        entry = (buffer, update, self._last_frame)
+        self._frames[frame] = entry
+        while len(self._frames) > self.window:
+            self._frames.popitem(last=False)
+
+        self._last_frame = frame
+        self._last_image = native_image
+        return entry
+
+    def _decode(self, frame):
+        with self._image_lock:
+            if self._image is None:
+                self._image = Image.open(self.path)
+            self._image.seek(frame)
+            self.decoded_frames += 1
+            emoji = self._image.convert("RGBA")
+
+        # Scale the emoji to the display height and center it on a black background
+        width, height = self._logical_size
+        size = min(width, height)
+        emoji = emoji.resize((size, size), Image.BILINEAR)
+        image = Image.new("RGB", (width, height))
+        image.paste(emoji, ((width - size) // 2, (height - size) // 2), emoji)
+
+        return to_display_orientation(transform_image(image, self.rotate, self.shift_x), self.rotation)
+
+    def close(self):
+        """Close the animation file; it is opened again if more frames are decoded."""
+        with self._image_lock:
+            if self._image is not None:
+                self._image.close()
+                self._image = None
+
+    @classmethod
+    def load(cls, path, **kwargs):
+        """Open the animation at ``path`` and read the frame durations; frames are decoded during playback.
+
+        The durations are read from the GIF/WebP frame headers, without decoding any frame.
+        """
+        with open(path, "rb") as f:
+            data = f.read()
+        if data[:4] == b"GIF8":
+            durations = _gif_durations(data)
+        elif data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+            durations = _webp_durations(data)
+        else:
+            raise ValueError(f"Unsupported animation format: {path}")
+        return cls(path, [duration or cls.DEFAULT_DURATION for duration in durations], **kwargs)
+
+#######################################################################################################################
+
+def _skip_sub_blocks(data, offset):
+    # GIF data is split into sub-blocks of up to 255 bytes, ended by an empty one
+    while data[offset]:
+        offset += data[offset] + 1
+    return offset + 1
+
+def _gif_durations(data):
+    # Duration in ms of every image of a GIF, from the graphic control extension before it (0 if there is none)
+    durations = []
+    flags = data[10]
+    offset = 13 + (3 << (flags & 7) + 1 if flags & 0x80 else 0)  # Header, screen descriptor, global color table
+    duration = 0
+    while offset < len(data) and data[offset] != 0x3B:
+        if data[offset] == 0x21:
+            if data[offset + 1] == 0xF9:
+                duration = struct.unpack_from("<H", data, offset + 4)[0] * 10
+            offset = _skip_sub_blocks(data, offset + 2)
+        elif data[offset] == 0x2C:
+            flags = data[offset + 9]
+            offset += 10 + (3 << (flags & 7) + 1 if flags & 0x80 else 0) + 1  # Descriptor, local color table, code size
+            offset = _skip_sub_blocks(data, offset)
+            durations.append(duration)
+            duration = 0
+        else:
+            raise ValueError(f"Invalid GIF block at offset {offset}")
+    return durations or [0]
+
+def _webp_durations(data):
+    # Duration in ms of every ANMF chunk of an animated WebP, a single 0 for a still image
+    durations = []
+    offset = 12
+    while offset + 8 <= len(data):
+        chunk, size = struct.unpack_from("<4sI", data, offset)
+        if chunk == b"ANMF":
+            durations.append(int.from_bytes(data[offset + 20:offset + 23], "little"))
+        offset += 8 + size + (size & 1)
+    return durations or [0]
+
+#######################################################################################################################
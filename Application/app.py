@@ -9,6 +9,7 @@
 #######################################################################################################################
 
 # System Imports
+import os
 import threading
 import time
 
@@ -17,12 +18,23 @@ from .configuration import Configuration
 from .applogger import ApplicationLogger
 
 from .displaymanager import DisplayManager, Emotions
+from .renderprocess import RenderProcess
+from .framerategovernor import FrameRateGovernor
+from .displaybackend import create_display_backend
+from .sensoroverlay import SensorOverlay
+from .displaymirror import DisplayMirror
 from .sensormanager import SensorManager
+from .sensorstore import SensorStore
+from .signalfilter import Hysteresis, create_filter
 from .homeassistantsensor import HomeAssistantSensor
 
 #######################################################################################################################
 
 class Application:
+    # Seconds to look ahead when predicting the next emotion, from the sensor trends of the last seconds
+    _PREDICTION_HORIZON = 60
+    _TREND_WINDOW = 120
+
     def __init__(self, config: Configuration):
         self._log = ApplicationLogger(level=config.LOG_LEVEL)
         self._log.debug("Application Class Initializing...")
@@ -31,9 +43,77 @@ class Application:
 
         self._app_thread_is_running = False
         self._app_thread = None
-
-        self.display_manager = DisplayManager(self._log, frame_rate=10, frames_skip=5, assets_folder='assets/emotion', shift_x=-25, rotate=0)
-        self.sensor_manager = SensorManager(bmp280_address=0x76, bh1750_address=0x23, ads1x15_address=0x48)
+        self._app_loop_lag = 0.0
+        self._emotion_switches = 0
+
+        # Emotion thresholds with hysteresis, so noise around a threshold does not make the face flap
+        self._thresholds = {
+            "night": Hysteresis(config.NIGHT_MODE_BELOW, config.NIGHT_MODE_HYSTERESIS, below=True),
+            "cold": Hysteresis(config.TEMPERATURE_COLD_BELOW, config.TEMPERATURE_HYSTERESIS, below=True),
+            "hot": Hysteresis(config.TEMPERATURE_HOT_ABOVE, config.TEMPERATURE_HYSTERESIS),
+            "dry": Hysteresis(config.SOIL_DRY_ABOVE, config.SOIL_HYSTERESIS),
+            "wet": Hysteresis(config.SOIL_WET_BELOW, config.SOIL_HYSTERESIS, below=True),
+        }
+
+        # The display frame rate backs off when the sensor polling or the application thread fall behind
+        lag_sources = [lambda: self.sensor_manager.polling_lag, lambda: self._app_loop_lag]
+        display_settings = dict(frame_rate=10, frames_skip=5, assets_folder='assets/emotion', shift_x=-25, rotate=0,
+                                frame_cache_size=config.DISPLAY_FRAME_CACHE_MB * 1024 * 1024,
+                                transition_frames=config.DISPLAY_TRANSITION_FRAMES,
+                                animations=config.DISPLAY_ANIMATIONS,
+                                frame_pack_compression=config.DISPLAY_FRAME_PACK_COMPRESSION,
+                                stage_timing=config.DISPLAY_STAGE_TIMING,
+                                indexed_frames=config.DISPLAY_INDEXED_FRAMES)
+
+        # Live view of the display over HTTP (optional)
+        mirror_settings = None
+        if config.DISPLAY_MIRROR_PORT:
+            mirror_settings = {"port": config.DISPLAY_MIRROR_PORT, "address": config.DISPLAY_MIRROR_ADDRESS,
+                               "max_fps": config.DISPLAY_MIRROR_FPS}
+
+        if config.DISPLAY_RENDER_PROCESS:
+            # The render loop runs in its own process, the governor and the overlay live there
+            self.frame_rate_governor = None
+            self.sensor_overlay = None
+            self.display_manager = RenderProcess(self._log, log_level=config.LOG_LEVEL,
+                                                 governor_settings={"min_fps": config.DISPLAY_FPS_MIN, "max_fps": config.DISPLAY_FPS_MAX},
+                                                 lag_sources=lag_sources,
+                                                 overlay=config.DISPLAY_OVERLAY,
+                                                 mirror_settings=mirror_settings,
+                                                 backend=config.DISPLAY_BACKEND, backend_path=config.DISPLAY_BACKEND_PATH or None,
+                                                 **display_settings)
+        else:
+            self.frame_rate_governor = FrameRateGovernor(self._log, min_fps=config.DISPLAY_FPS_MIN, max_fps=config.DISPLAY_FPS_MAX,
+                                                         lag_sources=lag_sources)
+
+            # Sensor values shown on top of the animation (optional)
+            self.sensor_overlay = SensorOverlay() if config.DISPLAY_OVERLAY else None
+
+            mirror = DisplayMirror(self._log, overlay=self.sensor_overlay, **mirror_settings) if mirror_settings else None
+
+            self.display_manager = DisplayManager(self._log, governor=self.frame_rate_governor, overlay=self.sensor_overlay, mirror=mirror,
+                                                  backend=create_display_backend(config.DISPLAY_BACKEND, path=config.DISPLAY_BACKEND_PATH or None),
+                                                  **display_settings)
+        ads1x15_settings = dict(gain=config.ADS1115_GAIN, data_rate=config.ADS1115_DATA_RATE, continuous=config.ADS1115_CONTINUOUS,
+                                oversampling=config.ADS1115_OVERSAMPLING, reducer=config.ADS1115_REDUCER,
+                                active_channels=config.ADS1115_CHANNELS)
+        sensor_filters = {}
+        for channel, spec in config.SENSOR_FILTERS.items():
+            try:
+                sensor_filters[channel] = create_filter(spec)
+            except ValueError as e:
+                self._log.error(f"Invalid filter for {channel}: {e}")
+        self.sensor_manager = SensorManager(bmp280_address=0x76, bh1750_address=0x23, ads1x15_address=0x48,
+                                            ads1x15_settings=ads1x15_settings, filters=sensor_filters)
+
+        # Every reading is kept on disk, so the history of the plant survives restarts (optional)
+        self.sensor_store = None
+        if config.SENSOR_STORE_PATH:
+            store_path = os.path.join(os.path.dirname(os.path.realpath(__file__)), config.SENSOR_STORE_PATH)
+            self.sensor_store = SensorStore(self._log, store_path, flush_interval=config.SENSOR_STORE_FLUSH_SECONDS,
+                                            raw_retention=config.SENSOR_STORE_RETENTION_DAYS * 86400,
+                                            aggregate_retention=config.SENSOR_STORE_AGGREGATE_RETENTION_DAYS * 86400)
+            self.sensor_manager.register_reading_callback(self.sensor_store.append)
         self.ha_client = None
 
     def start_application(self):
@@ -43,6 +123,10 @@ class Application:
             # Start Display Manager
             self.display_manager.start()
 
+            # Start writing the sensor history
+            if self.sensor_store is not None:
+                self.sensor_store.start()
+
             # Start Application Thread
             self._app_thread = threading.Thread(target=self._app_thread_run)
             self._app_thread.start()
@@ -63,6 +147,12 @@ class Application:
 
         # Stop sensors
         self.sensor_manager.stop()
+        self._log.debug(f"Sensor acquisition: {self.sensor_manager.acquisition_stats}")
+        self._log.debug(f"ADS1115 read latency: {self.sensor_manager.adc_stats}")
+        self._log.debug(f"Sensor notifications: {self.sensor_manager.notifications}, emotion switches: {self._emotion_switches}")
+        if self.sensor_store is not None:
+            self.sensor_store.stop()
+            self._log.debug(f"Sensor store: {self.sensor_store.stats}")
 
         # Stop Display Manager
         self.display_manager.stop()
@@ -88,9 +178,19 @@ class Application:
         # Application
         self._log.info("Starting Visualization...")
         while self._app_thread_is_running:
+            sleep_start = time.monotonic()
             time.sleep(1)
+            self._app_loop_lag = max(0.0, time.monotonic() - sleep_start - 1)
+
             self.log_sensor_values()
-            self.display_manager.set_emotion( self.apply_emotion_face() )
+            emotion = self.apply_emotion_face()
+            if emotion != self.display_manager.current_emotion:
+                self._emotion_switches += 1
+            self.display_manager.set_emotion(emotion)
+            self.update_sensor_overlay()
+
+            # Load the emotion we are most likely to show next in the background
+            self.display_manager.prefetch( self.predict_next_emotion() )
 
     ###################################################################################################################
 
@@ -109,7 +209,24 @@ class Application:
 
         self._log.info(f"{temperature_str} / {pressure_str} / {light_intensity_str}")
         self._log.info(f"A/D: {ads1x15_values_str}")
-        self._log.info(f"Display Emotion: {self.display_manager._current_emotion.value}")
+        self._log.info(f"Display Emotion: {self.display_manager.current_emotion.value}")
+
+    ###################################################################################################################
+    def update_sensor_overlay(self):
+        # The overlay is only rendered again when a shown value changes
+        if not self._config.DISPLAY_OVERLAY:
+            return
+        self.display_manager.update_overlay(temperature=self.sensor_manager.temperature,
+                                            light_intensity=self.sensor_manager.light_intensity,
+                                            moisture=self._soil_moisture(self.sensor_manager.ads1x15_channel_values[0]))
+
+    def _soil_moisture(self, ad_value):
+        # Soil moisture in percent, same conversion as the HomeAssistant telemetry
+        if ad_value is None:
+            return None
+        soil_range = self._config.SOIL_MAX - self._config.SOIL_MIN
+        relative_ad = max(min(ad_value, self._config.SOIL_MAX), self._config.SOIL_MIN) - self._config.SOIL_MIN
+        return 100 - ((relative_ad / soil_range) * 100)
 
     ###################################################################################################################
     def show_random_emotions(self):
@@ -124,28 +241,51 @@ class Application:
 
     ###################################################################################################################
     def apply_emotion_face(self):
+        soil = self.sensor_manager.ads1x15_channel_values[0]
+        return self._emotion_for_values(self.sensor_manager.light_intensity, self.sensor_manager.temperature, soil,
+                                        update=True)
+
+    def _emotion_for_values(self, light_intensity, temperature, soil, update=False):
+        # Every threshold is checked, so each keeps its hysteresis state (``update``), predictions leave it unchanged
+        values = {"night": light_intensity, "cold": temperature, "hot": temperature, "dry": soil, "wet": soil}
+        active = {name: self._thresholds[name].update(value) if update else self._thresholds[name].test(value)
+                  for name, value in values.items()}
+
         # Light
-        if self.sensor_manager.light_intensity is not None and \
-                self.sensor_manager.light_intensity < self._config.NIGHT_MODE_BELOW:
+        if active["night"]:
             return Emotions.SLEEPY
 
         # Temperature
-        elif self.sensor_manager.temperature is not None and \
-                self.sensor_manager.temperature < self._config.TEMPERATURE_COLD_BELOW:
+        elif active["cold"]:
             return Emotions.FREEZE
-        elif self.sensor_manager.temperature is not None and \
-                self.sensor_manager.temperature > self._config.TEMPERATURE_HOT_ABOVE:
+        elif active["hot"]:
             return Emotions.HOT
 
         # Soil
-        elif self.sensor_manager.ads1x15_channel_values[0] is not None and \
-                self.sensor_manager.ads1x15_channel_values[0] > self._config.SOIL_DRY_ABOVE:
+        elif active["dry"]:
             return Emotions.THIRSTY
-        elif self.sensor_manager.ads1x15_channel_values[0] is not None and \
-                self.sensor_manager.ads1x15_channel_values[0] < self._config.SOIL_WET_BELOW:
+        elif active["wet"]:
             return Emotions.SAVORY
 
         # Default
         return Emotions.HAPPY
 
+    ###################################################################################################################
+    def predict_next_emotion(self):
+        """Return the emotion the sensor values are heading to within the prediction horizon.
+
+        For example, light falling toward ``NIGHT_MODE_BELOW`` predicts ``SLEEPY``.
+        """
+        values = {
+            "light_intensity": self.sensor_manager.light_intensity,
+            "temperature": self.sensor_manager.temperature,
+            "ads1x15_0": self.sensor_manager.ads1x15_channel_values[0],
+        }
+        predicted = {}
+        for channel, value in values.items():
+            trend = self.sensor_manager.trend(channel, self._TREND_WINDOW)
+            predicted[channel] = None if value is None or trend is None else value + trend["slope"] * self._PREDICTION_HORIZON
+
+        return self._emotion_for_values(predicted["light_intensity"], predicted["temperature"], predicted["ads1x15_0"])
+
 #######################################################################################################################
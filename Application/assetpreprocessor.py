@@ -0,0 +1,235 @@
+# SPDX-FileCopyrightText: 2023 Karl Bauer (BAUER GROUP)
+# SPDX-License-Identifier: MIT
+
+#######################################################################################################################
+#
+# Description :  Package for Toni der Topf
+# Author      :  Karl Bauer (karl.bauer@bauer-group.com) / www.bauer-group.com
+#
+#######################################################################################################################
+
+# System Imports
+import os
+import io
+import json
+import hashlib
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from PIL import Image
+
+# Local Imports
+from .applogger import ApplicationLogger
+from .imageprocessing import transform_image
+from .transitions import TransitionBuilder
+from .framepack import FramePack
+
+#######################################################################################################################
+
+def _hash_bytes(data):
+    return hashlib.sha1(data).hexdigest()
+
+
+def _process_frame(source_path, output_path, rotate, shift_x):
+    # Runs in a worker process: transform one source frame and return the source and output hashes.
+    with open(source_path, "rb") as f:
+        source_data = f.read()
+
+    with Image.open(io.BytesIO(source_data)) as image:
+        processed_image = transform_image(image, rotate, shift_x)
+        output = io.BytesIO()
+        processed_image.save(output, format="PNG")
+
+    # Replace instead of overwriting the file, it may be a hard link shared with another frame
+    output_data = output.getvalue()
+    temp_path = output_path + ".tmp"
+    with open(temp_path, "wb") as f:
+        f.write(output_data)
+    os.replace(temp_path, output_path)
+
+    return _hash_bytes(source_data), _hash_bytes(output_data)
+
+#######################################################################################################################
+
+class AssetPreprocessor:
+    """Generates the rotated/shifted temporary images and keeps them up to date incrementally.
+
+    ``manifest.json`` in the temp folder records for every frame the hash of the source, the
+    transform parameters and the hash of the output. Only frames whose source, parameters or
+    output changed are regenerated; the work is spread over a process pool. Identical outputs,
+    e.g. the same pose in several emotions, are stored once as hard links.
+    """
+
+    _MANIFEST_FILE = "manifest.json"
+    _MANIFEST_VERSION = 1
+
+    def __init__(self, app_logger: ApplicationLogger, assets_folder, temp_folder, rotate=0, shift_x=0, workers=None, nice=0):
+        self._log = app_logger
+        self._assets_folder = assets_folder
+        self._temp_folder = temp_folder
+        self._rotate = rotate
+        self._shift_x = shift_x
+        self._workers = workers if workers is not None else (os.cpu_count() or 1)
+        self._nice = nice  # Lower priority of the worker processes, e.g. while the animation is running
+        self._manifest_path = os.path.join(self._temp_folder, self._MANIFEST_FILE)
+
+    def prepare(self, emotions):
+        """Bring the temporary images of all ``emotions`` (folder names) up to date.
+
+        Returns the number of regenerated frames.
+        """
+        os.makedirs(self._temp_folder, exist_ok=True)
+        manifest = self._load_manifest()
+
+        # Entries of the emotions that are not prepared in this call are kept
+        stale = []
+        frames = {key: entry for key, entry in manifest.items() if key.split("/", 1)[0] not in emotions}
+        changed_emotions = []
+        for emotion in emotions:
+            image_folder_path = os.path.join(self._assets_folder, emotion)
+            temp_folder_path = os.path.join(self._temp_folder, emotion)
+            os.makedirs(temp_folder_path, exist_ok=True)
+
+            image_files = sorted([f for f in os.listdir(image_folder_path) if f.endswith(".png")])
+            for image_file in image_files:
+                key = f"{emotion}/{image_file}"
+                source_path = os.path.join(image_folder_path, image_file)
+                output_path = os.path.join(temp_folder_path, image_file)
+
+                entry = manifest.get(key)
+                if self._is_stale(entry, source_path, output_path):
+                    stale.append((key, source_path, output_path))
+                else:
+                    frames[key] = entry
+
+            # Remove outputs whose source frame no longer exists
+            removed = False
+            for temp_file in os.listdir(temp_folder_path):
+                if temp_file.endswith(".png") and temp_file not in image_files:
+                    os.remove(os.path.join(temp_folder_path, temp_file))
+                    removed = True
+
+            # The frame pack of the emotion is built from the outputs and has to be built again
+            if removed or any(key.startswith(emotion + "/") for key, _, _ in stale):
+                changed_emotions.append(emotion)
+                pack_path = os.path.join(self._temp_folder, emotion + FramePack.EXTENSION)
+                if os.path.exists(pack_path):
+                    os.remove(pack_path)
+
+        if not stale:
+            self._log.debug("All temporary images are up to date. Reusing existing images.")
+        else:
+            self._log.debug(f"Regenerating {len(stale)} temporary images using {self._workers} worker(s)...")
+            for key, entry in self._process(stale):
+                frames[key] = entry
+            shared = self._share_outputs(frames, [key for key, _, _ in stale])
+            if shared:
+                self._log.debug(f"{shared} temporary images are identical to others and stored once.")
+
+        # Transitions are blended from the emotion frames and have to be built again
+        for emotion in changed_emotions:
+            TransitionBuilder.clear(self._temp_folder, emotion)
+
+        self._save_manifest(frames)
+        return len(stale)
+
+    def _is_stale(self, entry, source_path, output_path):
+        if entry is None or not os.path.exists(output_path):
+            return True
+        if entry.get("rotate") != self._rotate or entry.get("shift_x") != self._shift_x:
+            return True
+
+        # Unchanged file stats are trusted, otherwise the content hashes decide
+        source_stat = os.stat(source_path)
+        if entry.get("source_stat") != [source_stat.st_size, source_stat.st_mtime_ns]:
+            with open(source_path, "rb") as f:
+                if _hash_bytes(f.read()) != entry.get("source"):
+                    return True
+            entry["source_stat"] = [source_stat.st_size, source_stat.st_mtime_ns]
+
+        output_stat = os.stat(output_path)
+        if entry.get("output_stat") != [output_stat.st_size, output_stat.st_mtime_ns]:
+            with open(output_path, "rb") as f:
+                if _hash_bytes(f.read()) != entry.get("output"):
+                    return True
+            entry["output_stat"] = [output_stat.st_size, output_stat.st_mtime_ns]
+
+        return False
+
+    def _process(self, stale):
+        jobs = [(source_path, output_path, self._rotate, self._shift_x) for _, source_path, output_path in stale]
+
+        if self._workers > 1 and len(jobs) > 1:
+            initializer, initargs = (os.nice, (self._nice,)) if self._nice else (None, ())
+            # Not forked: the pool is started from a background thread while the render and sensor threads run
+            context = multiprocessing.get_context(
+                "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+            )
+            with ProcessPoolExecutor(max_workers=self._workers, initializer=initializer, initargs=initargs,
+                                     mp_context=context) as executor:
+                results = list(executor.map(_process_frame, *zip(*jobs), chunksize=8))
+        else:
+            results = [_process_frame(*job) for job in jobs]
+
+        for (key, source_path, output_path), (source_hash, output_hash) in zip(stale, results):
+            source_stat = os.stat(source_path)
+            output_stat = os.stat(output_path)
+            yield key, {
+                "source": source_hash,
+                "source_stat": [source_stat.st_size, source_stat.st_mtime_ns],
+                "rotate": self._rotate,
+                "shift_x": self._shift_x,
+                "output": output_hash,
+                "output_stat": [output_stat.st_size, output_stat.st_mtime_ns],
+            }
+
+    def _share_outputs(self, frames, keys):
+        # Replace the new outputs of ``keys`` by hard links to identical outputs, returns how many were linked
+        keys = set(keys)
+        first_keys = {}
+        for key, entry in sorted(frames.items()):
+            if key not in keys:
+                first_keys.setdefault(entry["output"], key)
+
+        shared = 0
+        for key in sorted(keys):
+            entry = frames[key]
+            first_key = first_keys.setdefault(entry["output"], key)
+            if first_key == key:
+                continue
+
+            output_path = os.path.join(self._temp_folder, key)
+            first_path = os.path.join(self._temp_folder, first_key)
+            try:
+                if not os.path.samefile(first_path, output_path):
+                    temp_path = output_path + ".tmp"
+                    os.link(first_path, temp_path)
+                    os.replace(temp_path, output_path)
+            except OSError:
+                continue  # File systems without hard links keep the copy
+
+            output_stat = os.stat(output_path)
+            entry["output_stat"] = [output_stat.st_size, output_stat.st_mtime_ns]
+            shared += 1
+        return shared
+
+    def _load_manifest(self):
+        if not os.path.exists(self._manifest_path):
+            return {}
+        try:
+            with open(self._manifest_path, "r") as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            self._log.warning("Manifest of temporary images is unreadable. Regenerating images...")
+            return {}
+        if manifest.get("version") != self._MANIFEST_VERSION:
+            return {}
+        return manifest.get("frames", {})
+
+    def _save_manifest(self, frames):
+        # Write to a temporary file first, so an interrupted write never leaves a broken manifest
+        temp_path = self._manifest_path + ".tmp"
+        with open(temp_path, "w") as f:
+            json.dump({"version": self._MANIFEST_VERSION, "frames": frames}, f)
+        os.replace(temp_path, self._manifest_path)
+
+#######################################################################################################################
@@ -10,6 +10,7 @@
 
 # System Imports
 import os
+from fractions import Fraction
 from dotenv import load_dotenv
 from pathlib import Path
 import logging
@@ -44,6 +45,42 @@ class Configuration:
 
         self.NIGHT_MODE_BELOW = float(os.environ.get('NIGHT_MODE_BELOW', 5.00))
 
+        # Values have to move back by these bands before a threshold is released again
+        self.SOIL_HYSTERESIS = float(os.environ.get('SOIL_HYSTERESIS', 300))
+        self.TEMPERATURE_HYSTERESIS = float(os.environ.get('TEMPERATURE_HYSTERESIS', 0.5))
+        self.NIGHT_MODE_HYSTERESIS = float(os.environ.get('NIGHT_MODE_HYSTERESIS', 2.0))
+
+        self.SENSOR_FILTERS = Configuration.mapping_from_string(
+            os.environ.get('SENSOR_FILTERS', 'temperature=ema:0.3, light_intensity=median:5, ads1x15_0=median:5+ema:0.3'))
+
+        self.DISPLAY_BACKEND = os.environ.get('DISPLAY_BACKEND', 'ili9341').lower()
+        self.DISPLAY_BACKEND_PATH = os.environ.get('DISPLAY_BACKEND_PATH', '')
+        self.DISPLAY_FRAME_CACHE_MB = int(os.environ.get('DISPLAY_FRAME_CACHE_MB', 48))
+        self.DISPLAY_TRANSITION_FRAMES = int(os.environ.get('DISPLAY_TRANSITION_FRAMES', 0))
+        self.DISPLAY_FPS_MIN = float(os.environ.get('DISPLAY_FPS_MIN', 2))
+        self.DISPLAY_FPS_MAX = float(os.environ.get('DISPLAY_FPS_MAX', 10))
+        self.DISPLAY_FRAME_PACK_COMPRESSION = os.environ.get('DISPLAY_FRAME_PACK_COMPRESSION', 'none').lower()
+        self.DISPLAY_INDEXED_FRAMES = os.environ.get('DISPLAY_INDEXED_FRAMES', 'false').lower() == 'true'
+        self.DISPLAY_OVERLAY = os.environ.get('DISPLAY_OVERLAY', 'false').lower() == 'true'
+        self.DISPLAY_STAGE_TIMING = os.environ.get('DISPLAY_STAGE_TIMING', 'false').lower() == 'true'
+        self.DISPLAY_RENDER_PROCESS = os.environ.get('DISPLAY_RENDER_PROCESS', 'false').lower() == 'true'
+        self.DISPLAY_MIRROR_PORT = int(os.environ.get('DISPLAY_MIRROR_PORT', 0))
+        self.DISPLAY_MIRROR_ADDRESS = os.environ.get('DISPLAY_MIRROR_ADDRESS', '0.0.0.0')
+        self.DISPLAY_MIRROR_FPS = float(os.environ.get('DISPLAY_MIRROR_FPS', 2))
+        self.DISPLAY_ANIMATIONS = Configuration.mapping_from_string(os.environ.get('DISPLAY_ANIMATIONS', ''))
+
+        self.ADS1115_GAIN = float(Fraction(os.environ.get('ADS1115_GAIN', '1')))
+        self.ADS1115_DATA_RATE = int(os.environ.get('ADS1115_DATA_RATE', 860))
+        self.ADS1115_CONTINUOUS = os.environ.get('ADS1115_CONTINUOUS', 'true').lower() == 'true'
+        self.ADS1115_OVERSAMPLING = int(os.environ.get('ADS1115_OVERSAMPLING', 8))
+        self.ADS1115_REDUCER = os.environ.get('ADS1115_REDUCER', 'median').lower()
+        self.ADS1115_CHANNELS = Configuration.channels_from_string(os.environ.get('ADS1115_CHANNELS', '0,1,2,3'))
+
+        self.SENSOR_STORE_PATH = os.environ.get('SENSOR_STORE_PATH', 'data/sensors')
+        self.SENSOR_STORE_FLUSH_SECONDS = float(os.environ.get('SENSOR_STORE_FLUSH_SECONDS', 300))
+        self.SENSOR_STORE_RETENTION_DAYS = float(os.environ.get('SENSOR_STORE_RETENTION_DAYS', 7))
+        self.SENSOR_STORE_AGGREGATE_RETENTION_DAYS = float(os.environ.get('SENSOR_STORE_AGGREGATE_RETENTION_DAYS', 365))
+
         self.HOMEASSISTANT_ENABLED = os.environ.get('HOMEASSISTANT_ENABLED', 'false').lower() == 'true'
         self.HOMEASSISTANT_ID = os.environ.get('HOMEASSISTANT_ID', 'TeoTopf')
         self.HOMEASSISTANT_MQTT_SERVER = os.environ.get('HOMEASSISTANT_MQTT_SERVER', 'undefined')
@@ -63,6 +100,24 @@ class Configuration:
 
         self._log.info(f"|- Night Mode: < {self.NIGHT_MODE_BELOW}")
 
+        self._log.info(f"|- Hysteresis: Soil {self.SOIL_HYSTERESIS}, Temperature {self.TEMPERATURE_HYSTERESIS}, Night Mode {self.NIGHT_MODE_HYSTERESIS}")
+        self._log.info(f"|- Sensor Filters: {self.SENSOR_FILTERS}")
+
+        self._log.info(f"|- Display Backend: {self.DISPLAY_BACKEND}")
+        self._log.info(f"|- Display Frame Cache: {self.DISPLAY_FRAME_CACHE_MB} MB")
+        self._log.info(f"|- Display Transition Frames: {self.DISPLAY_TRANSITION_FRAMES}")
+        self._log.info(f"|- Display Frame Rate: {self.DISPLAY_FPS_MIN} - {self.DISPLAY_FPS_MAX} fps")
+        self._log.info(f"|- Display Frame Pack Compression: {self.DISPLAY_FRAME_PACK_COMPRESSION}")
+        self._log.info(f"|- Display Indexed Frames: {self.DISPLAY_INDEXED_FRAMES}")
+        self._log.info(f"|- Display Sensor Overlay: {self.DISPLAY_OVERLAY}")
+        self._log.info(f"|- Display Stage Timing: {self.DISPLAY_STAGE_TIMING}")
+        self._log.info(f"|- Display Render Process: {self.DISPLAY_RENDER_PROCESS}")
+        self._log.info(f"|- Display Mirror: {f'{self.DISPLAY_MIRROR_ADDRESS}:{self.DISPLAY_MIRROR_PORT}, {self.DISPLAY_MIRROR_FPS} fps' if self.DISPLAY_MIRROR_PORT else 'disabled'}")
+        self._log.info(f"|- Display Animations: {self.DISPLAY_ANIMATIONS}")
+
+        self._log.info(f"|- ADS1115: {'continuous' if self.ADS1115_CONTINUOUS else 'single-shot'}, {self.ADS1115_DATA_RATE} SPS, gain {self.ADS1115_GAIN}, {self.ADS1115_OVERSAMPLING}x {self.ADS1115_REDUCER}, channels {list(self.ADS1115_CHANNELS)}")
+        self._log.info(f"|- Sensor Store: {f'{self.SENSOR_STORE_PATH}, raw {self.SENSOR_STORE_RETENTION_DAYS} days, hourly {self.SENSOR_STORE_AGGREGATE_RETENTION_DAYS} days' if self.SENSOR_STORE_PATH else 'disabled'}")
+
         self._log.info(f"|- HomeAssistant Enabled: {self.HOMEASSISTANT_ENABLED}")
         self._log.info(f"|- HomeAssistant MQTT Server: {self.HOMEASSISTANT_MQTT_SERVER}")
 
@@ -80,4 +135,31 @@ class Configuration:
         """
         return logging._nameToLevel.get(log_level.upper(), default)
 
+    @staticmethod
+    def mapping_from_string(value: str) -> dict:
+        """Return the ``key=value`` pairs of a comma separated string as dictionary.
+
+        ``"happy=grin, hot=hot-face"`` becomes ``{"happy": "grin", "hot": "hot-face"}``.
+        Entries without ``=`` are ignored.
+        """
+        mapping = {}
+        for entry in value.split(','):
+            key, separator, item = entry.partition('=')
+            if separator and key.strip() and item.strip():
+                mapping[key.strip().lower()] = item.strip()
+        return mapping
+
+    @staticmethod
+    def channels_from_string(value: str) -> tuple:
+        """Return the A/D converter channels (0-3) of a comma separated string, e.g. ``"0, 2"``.
+
+        Invalid and repeated entries are ignored.
+        """
+        channels = []
+        for entry in value.split(','):
+            entry = entry.strip()
+            if entry.isdigit() and int(entry) < 4 and int(entry) not in channels:
+                channels.append(int(entry))
+        return tuple(channels)
+
 #######################################################################################################################
@@ -0,0 +1,229 @@
+# SPDX-FileCopyrightText: 2023 Karl Bauer (BAUER GROUP)
+# SPDX-License-Identifier: MIT
+
+#######################################################################################################################
+#
+# Description :  Package for Toni der Topf
+# Author      :  Karl Bauer (karl.bauer@bauer-group.com) / www.bauer-group.com
+#
+#######################################################################################################################
+
+# System Imports
+import time
+import struct
+from collections import deque
+from PIL import Image
+
+# Local Imports
+from .imageprocessing import rgb565_to_image
+
+#######################################################################################################################
+
+class DisplayBackend:
+    """Target for the prepared RGB565 frames of the ``DisplayManager``.
+
+    ``width`` and ``height`` are the logical (landscape) size of the display; frames are written in
+    the native orientation of the panel for ``rotation``, i.e. with ``native_width`` x ``native_height``
+    pixels. All backends count the written bytes and record the frame timings.
+    """
+
+    def __init__(self, width=320, height=240, rotation=90, timing_history=1000):
+        self.width = width
+        self.height = height
+        self.rotation = rotation
+        if rotation in (90, 270):
+            self.native_width, self.native_height = height, width
+        else:
+            self.native_width, self.native_height = width, height
+
+        self.frames = 0
+        self.windows = 0
+        self.bytes_written = 0
+        self.frame_times = deque(maxlen=timing_history)
+        self._frame_start = None
+
+    def set_backlight(self, on):
+        pass
+
+    def write_window(self, box, buffer):
+        """Write the RGB565 ``buffer`` into ``box`` (``left, upper, right, lower``, native orientation)."""
+        if self._frame_start is None:
+            self._frame_start = time.perf_counter()
+        self.windows += 1
+        self.bytes_written += len(buffer)
+        self._write_window(box, buffer)
+
+    def _write_window(self, box, buffer):
+        pass
+
+    def end_frame(self):
+        """Mark the end of a frame; records the time spent writing it."""
+        if self._frame_start is not None:
+            self.frame_times.append(time.perf_counter() - self._frame_start)
+            self._frame_start = None
+        self.frames += 1
+
+    def close(self):
+        pass
+
+    @property
+    def stats(self):
+        frame_times = list(self.frame_times)
+        return {
+            "frames": self.frames,
+            "windows": self.windows,
+            "bytes_written": self.bytes_written,
+            "bytes_per_frame": round(self.bytes_written / self.frames) if self.frames else 0,
+            "write_ms_avg": round(sum(frame_times) / len(frame_times) * 1000, 3) if frame_times else 0.0,
+            "write_ms_max": round(max(frame_times) * 1000, 3) if frame_times else 0.0,
+        }
+
+#######################################################################################################################
+
+class SPIWindowWriter:
+    """Writes RGB565 windows to an ILI9341 without copying the pixel data.
+
+    ``spi_device`` is an ``adafruit_bus_device`` ``SPIDevice`` (a context manager yielding the bus,
+    which has ``write(buffer, start, end)``) and ``dc_pin`` the data/command pin. The command and
+    address buffers are allocated once; the caller's buffer is sent as ``start``/``end`` ranges of
+    ``chunk_size`` bytes, so no slices or intermediate copies are created per frame. The bus is
+    locked once per window instead of once per command.
+    """
+
+    _COLUMN_SET = b"\x2a"
+    _PAGE_SET = b"\x2b"
+    _RAM_WRITE = b"\x2c"
+    _ENCODE_POS = struct.Struct(">HH")
+
+    def __init__(self, spi_device, dc_pin, chunk_size=64 * 1024):
+        self._spi_device = spi_device
+        self._dc_pin = dc_pin
+        self.chunk_size = chunk_size
+        self._column_args = bytearray(4)
+        self._page_args = bytearray(4)
+
+    def write_window(self, box, buffer):
+        left, upper, right, lower = box
+        self._ENCODE_POS.pack_into(self._column_args, 0, left, right - 1)
+        self._ENCODE_POS.pack_into(self._page_args, 0, upper, lower - 1)
+
+        dc_pin = self._dc_pin
+        with self._spi_device as spi:
+            dc_pin.value = 0
+            spi.write(self._COLUMN_SET)
+            dc_pin.value = 1
+            spi.write(self._column_args)
+            dc_pin.value = 0
+            spi.write(self._PAGE_SET)
+            dc_pin.value = 1
+            spi.write(self._page_args)
+            dc_pin.value = 0
+            spi.write(self._RAM_WRITE)
+            dc_pin.value = 1
+            size = len(buffer)
+            for start in range(0, size, self.chunk_size):
+                spi.write(buffer, start=start, end=min(start + self.chunk_size, size))
+
+#######################################################################################################################
+
+class ILI9341Backend(DisplayBackend):
+    """The ILI9341 display on the SPI bus of the Raspberry Pi, with the backlight on GPIO 23."""
+
+    _BAUDRATE = 80000000
+
+    def __init__(self, width=320, height=240, rotation=90, baudrate=_BAUDRATE):
+        super().__init__(width, height, rotation)
+
+        # Hardware libraries are only needed for the real display
+        import digitalio
+        import board
+        from adafruit_rgb_display import ili9341
+
+        # Backlight setup
+        self._backlight = digitalio.DigitalInOut(board.D23)
+        self._backlight.switch_to_output()
+
+        # Configuration for CS and DC pins (these are PiTFT defaults):
+        cs_pin = digitalio.DigitalInOut(board.CE0)
+        dc_pin = digitalio.DigitalInOut(board.D25)
+        reset_pin = digitalio.DigitalInOut(board.D24)
+
+        # Setup SPI bus using hardware SPI:
+        spi = board.SPI()
+
+        self.disp = ili9341.ILI9341(
+            spi,
+            rotation=rotation,
+            cs=cs_pin,
+            dc=dc_pin,
+            rst=reset_pin,
+            baudrate=baudrate,
+        )
+
+        # The display is initialized by the library, the frames are written directly to the SPI bus
+        self._writer = SPIWindowWriter(self.disp.spi_device, self.disp.dc_pin)
+
+    def set_backlight(self, on):
+        self._backlight.value = on
+
+    def _write_window(self, box, buffer):
+        self._writer.write_window(box, buffer)
+
+#######################################################################################################################
+
+class NullBackend(DisplayBackend):
+    """Discards all frames, only the byte counters and timings are kept."""
+
+#######################################################################################################################
+
+class FileBackend(DisplayBackend):
+    """Keeps the display content in an RGB565 framebuffer and optionally writes it to a file.
+
+    With ``path`` set, the full framebuffer (native orientation, big endian RGB565) is written to
+    the start of that file after every frame; this can be a regular file or a framebuffer device.
+    """
+
+    def __init__(self, width=320, height=240, rotation=90, path=None):
+        super().__init__(width, height, rotation)
+        self.framebuffer = bytearray(self.native_width * self.native_height * 2)
+        self._file = open(path, "wb") if path else None
+
+    def _write_window(self, box, buffer):
+        left, upper, right, lower = box
+        row_bytes = (right - left) * 2
+        view = memoryview(buffer)
+        for row in range(upper, lower):
+            offset = (row * self.native_width + left) * 2
+            source = (row - upper) * row_bytes
+            self.framebuffer[offset:offset + row_bytes] = view[source:source + row_bytes]
+
+    def end_frame(self):
+        super().end_frame()
+        if self._file is not None:
+            self._file.seek(0)
+            self._file.write(self.framebuffer)
+            self._file.flush()
+
+    def snapshot(self) -> Image.Image:
+        """Return the current display content as RGB image in native orientation."""
+        return rgb565_to_image(self.framebuffer, (self.native_width, self.native_height))
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+#######################################################################################################################
+
+def create_display_backend(name="ili9341", path=None, **kwargs) -> DisplayBackend:
+    """Create the display backend selected in the configuration (``ili9341``, ``null`` or ``file``)."""
+    name = name.lower()
+    if name == "ili9341":
+        return ILI9341Backend(**kwargs)
+    if name == "null":
+        return NullBackend(**kwargs)
+    if name == "file":
+        return FileBackend(path=path, **kwargs)
+    raise ValueError(f"Invalid display backend: {name}. Valid backends are: ['ili9341', 'null', 'file']")
+
+#######################################################################################################################
@@ -14,14 +14,23 @@ import time
 import threading
 from enum import Enum
 from PIL import Image, ImageDraw
-import shutil
-import json
-import digitalio
-import board
-from adafruit_rgb_display import ili9341
 
 # Local Imports
 from .applogger import ApplicationLogger
+from .imageprocessing import shift_and_wrap, image_to_rgb565
+from .assetpreprocessor import AssetPreprocessor
+from .frameset import FrameSet, IndexedFrameSet
+from .framepack import FramePack
+from .stagetimer import StageTimer
+from .framecache import FrameCache
+from .framescheduler import FrameScheduler
+from .transitions import TransitionBuilder
+from .frameloader import FrameLoader
+from .framerategovernor import FrameRateGovernor
+from .displaybackend import DisplayBackend, ILI9341Backend
+from .animatedframesource import AnimatedFrameSource, find_animation
+from .sensoroverlay import SensorOverlay
+from .displaymirror import DisplayMirror
 
 
 class Emotions(Enum):
@@ -33,13 +42,15 @@ class Emotions(Enum):
     THIRSTY = "thirsty"
 
 class DisplayManager(threading.Thread):
-    _BAUDRATE = 80000000
-
     _DISP_WIDTH = 320
     _DISP_HEIGHT = 240
+    _DISP_ROTATION = 90
 
     _VALID_EMOTIONS = list(Emotions)
 
+    _PREPARED_WAIT = 0.5  # Seconds the first emotion may wait for its pre-processed frames
+    _STOP_TIMEOUT = 5.0  # Seconds to wait for the background preprocessing when stopping
+
     def __init__(
         self,
         app_logger: ApplicationLogger,
@@ -47,12 +58,29 @@ class DisplayManager(threading.Thread):
         frames_skip=0,
         default_emotion=Emotions.HAPPY,
         assets_folder="assets/emotion",
+        temp_folder="assets/temp",
         shift_x=0,
         rotate=0,
+        frame_cache_size=48 * 1024 * 1024,
+        transition_frames=0,
+        governor: FrameRateGovernor = None,
+        backend: DisplayBackend = None,
+        animations=None,
+        animations_folder="assets/emoji-animation",
+        animation_window=8,
+        frame_pack_compression="none",
+        stage_timing=False,
+        indexed_frames=False,
+        overlay: SensorOverlay = None,
+        mirror: DisplayMirror = None,
+        preprocess_workers=None,
     ):
         threading.Thread.__init__(self)
         self._log = app_logger
         self._log.debug("Initializing Display Manager...")
+        self._created_time = time.monotonic()
+        self.startup = {"time_to_first_face_s": None, "preprocessing_s": None}
+        self.held_frames = 0  # Ticks without a transfer, because the frame did not change
 
         self._frame_rate = frame_rate
         self._frames_skip = max(1, frames_skip)
@@ -63,163 +91,407 @@ class DisplayManager(threading.Thread):
         self._shift_x = shift_x
         self._rotate = rotate
         self._is_running = False
+        self.frame_cache = FrameCache(frame_cache_size, on_evict=self._on_frames_evicted)
+        self.scheduler = FrameScheduler(self._frame_rate)
+        self.governor = governor
+        self.overlay = overlay
+        self.mirror = mirror
+        self.stage_timer = StageTimer() if stage_timing else None  # Disabled: no timing in the render loop
+        self._wake_event = threading.Event()
+        self._switch_lock = threading.Lock()
+        self._switch_frames = {}  # Frames of the pending switch by key (None while loading), kept until the swap
+        self._loader = FrameLoader(self._log, self.frame_cache, on_loaded=self._on_frames_loaded)
         self._temp_folder = os.path.join(
-            os.path.dirname(os.path.realpath(__file__)), "assets/temp"
+            os.path.dirname(os.path.realpath(__file__)), temp_folder
         )
-
-        # Backlight setup
-        self._backlight = digitalio.DigitalInOut(board.D23)
-        self._backlight.switch_to_output()
+        self._indexed_frames = indexed_frames
+        self._preprocess_workers = preprocess_workers  # Worker processes of the preprocessing, one per CPU if None
+        self._frame_pack_compression = frame_pack_compression
+        if not FramePack.is_supported(frame_pack_compression):
+            self._log.warning(f"Frame pack compression {frame_pack_compression} is not available, frames are stored uncompressed.")
+            self._frame_pack_compression = "none"
+
+        # Emotions played from animations of the emoji catalog instead of the PNG frames (optional)
+        self._animation_window = animation_window
+        self._animations = {}
+        catalog_folder = os.path.join(os.path.dirname(os.path.realpath(__file__)), animations_folder)
+        for emotion, name in (animations or {}).items():
+            emotion = Emotions(emotion)
+            self._animations[emotion] = find_animation(catalog_folder, name)
+            self._log.debug(f"Emotion {emotion.value} is played from {self._animations[emotion]}")
+
+        # Crossfade transitions between emotions (optional)
+        self._transitions = None
+        if transition_frames > 0:
+            self._transitions = TransitionBuilder(self._log, self._temp_folder, transition_frames, self._frames_skip)
 
         # Display a Pattern after Setup
-        self._setup_display()
+        self.backend = backend if backend is not None else ILI9341Backend(
+            self._DISP_WIDTH, self._DISP_HEIGHT, self._DISP_ROTATION
+        )
         self._display_pattern()
-        self._backlight.value = True
-
-        # Prepare the Images
-        self._prepare_images()
+        self.backend.set_backlight(True)
+        if self.mirror is not None:
+            self.mirror.rotation = self.backend.rotation  # The mirror shows the frames as the display does
+
+        # Prepare the Images in the background, emotions that are not ready yet are processed on the fly
+        self._prepared = {emotion: threading.Event() for emotion in self._VALID_EMOTIONS}
+        self._preparation_done = threading.Event()  # Set when the preprocessing finished, failed or was stopped
+        self._prefetch_hint = None
+        self._is_preparing = True
+        self._preparer = threading.Thread(target=self._prepare_images, daemon=True)
+        self._preparer.start()
 
     def _prepare_images(self):
+        try:
+            self._prepare_pending_images()
+        finally:
+            self._preparation_done.set()
+
+    def _prepare_pending_images(self):
         self._log.debug("Checking and preparing images temp folder...")
+        start = time.monotonic()
+        workers = self._preprocess_workers
+        preprocessor = self._create_preprocessor(workers)
+
+        pending = list(self._VALID_EMOTIONS)
+        while pending and self._is_preparing:
+            emotion = self._next_emotion_to_prepare(pending)
+            pending.remove(emotion)
+            try:
+                try:
+                    regenerated = preprocessor.prepare([emotion.value])
+                except Exception as e:
+                    if workers == 1:
+                        raise
+                    # E.g. a process that may not have children or a broken process pool: prepare in this process
+                    self._log.warning(f"Preparing the images of emotion {emotion.value} failed: {e}. "
+                                      f"Retrying without worker processes...")
+                    workers = 1
+                    preprocessor = self._create_preprocessor(workers)
+                    regenerated = preprocessor.prepare([emotion.value])
+            except Exception as e:
+                self._log.error(f"Preparing the images of emotion {emotion.value} failed: {e}")
+                continue
+            self._prepared[emotion].set()
+            self._log.debug(f"Images of emotion {emotion.value} are ready ({regenerated} regenerated)")
+
+        # Settings file of older versions, replaced by the manifest
         settings_path = os.path.join(self._temp_folder, "displaysettings.json")
         if os.path.exists(settings_path):
-            with open(settings_path, "r") as f:
-                settings = json.load(f)
-                previous_rotate = settings.get("rotate", None)
-                previous_shift_x = settings.get("shift_x", None)
-        else:
-            previous_rotate = None
-            previous_shift_x = None
+            os.remove(settings_path)
 
-        if self._shift_x != previous_shift_x or self._rotate != previous_rotate:
-            self._log.debug(
-                "Shift/rotate value changed or not found. Regenerating images..."
-            )
+        if not pending:
+            self.startup["preprocessing_s"] = round(time.monotonic() - start, 3)
+            self._log.info(f"Image preprocessing finished in {self.startup['preprocessing_s']:.1f} s")
 
-            # Clean up and generate new images
-            if os.path.exists(self._temp_folder):
-                shutil.rmtree(self._temp_folder)
-            os.makedirs(self._temp_folder, exist_ok=True)
-
-            self._generate_temporary_images()
-
-            # Store new settings
-            with open(settings_path, "w") as f:
-                json.dump({"rotate": self._rotate, "shift_x": self._shift_x}, f)
-        else:
-            self._log.debug(
-                "No change in shift/rotate value detected. Reusing existing images."
-            )
-
-    def _generate_temporary_images(self):
-        self._log.debug("Generating temporary images...")
-        # Pre-process all images
-        for emotion in self._VALID_EMOTIONS:
-            self._log.debug(f"Processing images for emotion {emotion.value}")
-            image_folder_path = os.path.join(self._assets_folder, emotion.value)
-            temp_folder_path = os.path.join(self._temp_folder, emotion.value)
-
-            os.makedirs(temp_folder_path, exist_ok=True)
-
-            image_files = sorted(
-                [f for f in os.listdir(image_folder_path) if f.endswith(".png")]
-            )
-
-            for image_file in image_files:
-                self._log.debug(f"Processing image {image_file} for emotion {emotion.value}")
-                temp_image_path = os.path.join(temp_folder_path, image_file)
-                image_path = os.path.join(image_folder_path, image_file)
-
-                with Image.open(image_path) as image:
-                    processed_image = image
-
-                    # Rotate the image
-                    if self._rotate != 0:
-                        processed_image = processed_image.rotate(self._rotate)
-
-                    # Shift the image
-                    if self._shift_x != 0:
-                        processed_image = self._shift_and_wrap(
-                            processed_image, self._shift_x
-                        )
-
-                    processed_image.save(temp_image_path)
-
-    def _setup_display(self):
-        # Configuration for CS and DC pins (these are PiTFT defaults):
-        cs_pin = digitalio.DigitalInOut(board.CE0)
-        dc_pin = digitalio.DigitalInOut(board.D25)
-        reset_pin = digitalio.DigitalInOut(board.D24)
-
-        # Setup SPI bus using hardware SPI:
-        spi = board.SPI()
-
-        self.disp = ili9341.ILI9341(
-            spi,
-            rotation=90,
-            cs=cs_pin,
-            dc=dc_pin,
-            rst=reset_pin,
-            baudrate=self._BAUDRATE,
+    def _create_preprocessor(self, workers):
+        return AssetPreprocessor(
+            self._log, self._assets_folder, self._temp_folder, rotate=self._rotate, shift_x=self._shift_x,
+            workers=workers, nice=10,
         )
 
+    def _next_emotion_to_prepare(self, pending):
+        # The emotion on the display first, then the one expected next, then the default order
+        for emotion in (self._current_emotion, self._prefetch_hint):
+            if emotion in pending:
+                return emotion
+        return pending[0]
+
+    def is_prepared(self, emotion: Emotions):
+        """Return whether the pre-processed images of ``emotion`` are ready."""
+        return self._prepared[emotion].is_set()
+
+    def wait_prepared(self, emotion: Emotions = None, timeout=None):
+        """Wait until the pre-processed images of ``emotion`` (of all emotions if ``None``) are ready.
+
+        Returns whether they are ready; ``False`` after ``timeout`` seconds or if their preprocessing failed.
+        """
+        if emotion is None:
+            self._preparation_done.wait(timeout)
+            return all(self.is_prepared(emotion) for emotion in self._VALID_EMOTIONS)
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not self._prepared[emotion].is_set() and not self._preparation_done.is_set():
+            remaining = 0.1 if deadline is None else min(0.1, deadline - time.monotonic())
+            if remaining <= 0:
+                break
+            self._prepared[emotion].wait(remaining)
+        return self.is_prepared(emotion)
+
     def set_emotion(self, emotion: Emotions):
         if emotion in self._VALID_EMOTIONS:
-            self._current_emotion = emotion
+            if emotion != self._current_emotion:
+                self._current_emotion = emotion
+                self._wake_event.set()
         else:
             valid = [e.value for e in self._VALID_EMOTIONS]
             raise ValueError(f"Invalid emotion: {emotion}. Valid emotions are: {valid}")
 
+    def update_overlay(self, temperature=None, light_intensity=None, moisture=None):
+        """Show new values in the sensor overlay, if there is one."""
+        if self.overlay is not None:
+            self.overlay.update(temperature=temperature, light_intensity=light_intensity, moisture=moisture)
+
+    @property
+    def metrics(self):
+        """Return the frame timing, frame cache and governor statistics."""
+        return {
+            "frames": self.scheduler.stats,
+            "frame_cache": self.frame_cache.stats,
+            "governor": self.governor.metrics if self.governor is not None else {},
+            "backend": self.backend.stats,
+            "stages": self.stage_timer.snapshot if self.stage_timer is not None else {},
+            "startup": dict(self.startup),
+            "held_frames": self.held_frames,
+            "mirror": self.mirror.stats if self.mirror is not None else {},
+        }
+
     @property
     def current_emotion(self):
         """Return the emotion currently being displayed."""
         return self._current_emotion
 
+    def prefetch(self, emotion: Emotions):
+        """Load the frames of ``emotion`` in the background, so a later switch to it does not stall."""
+        if emotion not in self._VALID_EMOTIONS:
+            return
+        self._prefetch_hint = emotion
+        self._loader.request(emotion, self._emotion_loader(emotion), FrameLoader.PRIORITY_PREFETCH)
+
     def run(self):
         self._is_running = True
-        self._backlight.value = True  # Turn on the backlight when starting
-        frame_delay = 1.0 / self._frame_rate
+        self.backend.set_backlight(True)  # Turn on the backlight when starting
+        self._loader.start()
+        if self.mirror is not None:
+            self.mirror.start()
 
         last_emotion = None
-        images = []
-        frame_counter = 0
+        frames = []
+        next_frames = None  # Frames of the new emotion while a transition is playing
+        previous_index = None
+        pending = None  # (emotion, frames, next_frames) of a switch waiting for the last frame of the animation
+        self.scheduler.reset_stats()
+        rendered_ticks = None  # Display ticks shown as of the last render, early wake-ups stay within a tick
 
         while self._is_running:
-            if last_emotion != self._current_emotion:
-                # Load the names of all pre-processed PNG images in the temp folder.
-                image_folder_path = os.path.join(self._temp_folder, self._current_emotion.value)
-                image_files = sorted([f for f in os.listdir(image_folder_path) if f.endswith(".png")])
-                # Load all images into memory.
-                images = [
-                    Image.open(os.path.join(image_folder_path, image_file))
-                    for image_file in image_files
-                ]
-                last_emotion = self._current_emotion
-
-            for image in images:
-                # If emotion changed, break the image loop and restart with new emotion
-                if last_emotion != self._current_emotion:
-                    break
-
-                if frame_counter % self._frames_skip == 0:
-                    self.disp.image(image)
-
-                    # Wait for the next frame.
-                    time.sleep(frame_delay)
-
-                frame_counter += 1
-
-                # Check if the thread should stop after processing each image.
-                if not self._is_running:
-                    return
+            if pending is not None and pending[0] != self._current_emotion:
+                pending = None  # The emotion changed again before the switch
+            if pending is None and last_emotion != self._current_emotion:
+                # The current animation keeps playing until the new frames are loaded in the background,
+                # only the very first emotion is loaded right away.
+                if not frames:
+                    self._prepared[self._current_emotion].wait(self._PREPARED_WAIT)
+                incoming = self._frames_for_switch(last_emotion, self._current_emotion, block=not frames)
+                if incoming is not None:
+                    pending = (self._current_emotion, *incoming)
+
+            # A transition starts from the last frame of the animation, so the switch waits until it was shown.
+            # Without a transition the new emotion is shown right away.
+            if pending is not None and (pending[2] is None or not frames or
+                                        (next_frames is None and previous_index == len(frames) - 1)):
+                last_emotion, frames, next_frames = pending
+                pending = None
+                previous_index = None
+                self.scheduler.restart()
+
+            # The frame to show depends on the elapsed time, frames are dropped if we are late.
+            index = self.scheduler.frame_index(len(frames))
+
+            # A transition is played once, then the animation of the new emotion starts.
+            if next_frames is not None and self.scheduler.position >= len(frames):
+                frames, next_frames = next_frames, None
+                previous_index = None
+                self.scheduler.restart()
+                index = self.scheduler.frame_index(len(frames))
+
+            # Write only the regions that changed since the previous frame.
+            if frames:
+                render_start = time.perf_counter()
+                regions = frames.regions(index, previous_index)
+                if self.overlay is not None:
+                    regions = self.overlay.apply(regions, lambda box: frames.crop(index, box))
+                convert_end = time.perf_counter()
+                if regions:
+                    for box, buffer in regions:
+                        self.backend.write_window(box, buffer)
+                    self.backend.end_frame()
+                elif self.scheduler.frames_shown != rendered_ticks:
+                    # The frame is held: nothing changed, so nothing is sent to the display
+                    self.held_frames += 1
+                rendered_ticks = self.scheduler.frames_shown
+                previous_index = index
+                render_end = time.perf_counter()
+                if self.startup["time_to_first_face_s"] is None:
+                    self.startup["time_to_first_face_s"] = round(time.monotonic() - self._created_time, 3)
+                    self._log.info(f"Time to first face: {self.startup['time_to_first_face_s']:.2f} s")
+                if self.mirror is not None:
+                    self.mirror.publish(frames, index, bool(regions))
+                if self.stage_timer is not None:
+                    self.stage_timer.record("convert", convert_end - render_start)
+                    if regions:
+                        self.stage_timer.record("transfer", render_end - convert_end)
+                if self.governor is not None:
+                    self.governor.record_frame(render_end - render_start)
+
+            # Let the governor lower the display rate under load, the animation speed stays the same.
+            if self.governor is not None:
+                display_rate = min(self.governor.update(), self._frame_rate)
+                if display_rate != self.scheduler.display_rate:
+                    self.scheduler.display_rate = display_rate
+
+            # Wait for the deadline of the next frame, emotion changes and stop wake up early.
+            if self.stage_timer is None:
+                self.scheduler.wait(self._wake_event)
+            else:
+                wait_start = time.perf_counter()
+                on_time = self.scheduler.wait(self._wake_event)
+                self.stage_timer.record("wait", time.perf_counter() - wait_start)
+                if on_time:
+                    self.stage_timer.record("overshoot", self.scheduler.last_lateness)
+
+        self._loader.stop()
+        if self.mirror is not None:
+            self.mirror.stop()
+
+    def _frames_for_switch(self, from_emotion, to_emotion, block=False):
+        # Returns (frames, next_frames) to switch to, or None while the frames are still loading.
+        # With transitions, the transition is played first and the emotion frames follow.
+        loaders = {to_emotion: self._emotion_loader(to_emotion)}
+        if self._transitions is not None and from_emotion is not None and \
+                from_emotion not in self._animations and to_emotion not in self._animations and \
+                self.is_prepared(from_emotion) and self.is_prepared(to_emotion):
+            loaders[(from_emotion, to_emotion)] = self._transition_loader(from_emotion, to_emotion)
+
+        # Frames that are loaded are kept here until the swap, the cache may evict them to make room for the others.
+        with self._switch_lock:
+            self._switch_frames = {key: self._switch_frames.get(key) for key in loaders}
+            for key in loaders:
+                if self._switch_frames[key] is None and key in self.frame_cache:
+                    self._switch_frames[key] = self.frame_cache.get(key)
+            pinned = dict(self._switch_frames)
+
+        missing = [key for key, frames in pinned.items() if frames is None]
+        if missing and not block:
+            for key in missing:
+                self._loader.request(key, loaders[key])
+            return None
+
+        frames = {key: pinned[key] if pinned[key] is not None else self.frame_cache.get(key, loader)
+                  for key, loader in loaders.items()}
+        with self._switch_lock:
+            self._switch_frames = {}
+        self._log.debug(f"Frame cache for emotion {to_emotion.value}: {self.frame_cache.stats}")
+
+        if len(frames) > 1:
+            return frames[(from_emotion, to_emotion)], frames[to_emotion]
+        return frames[to_emotion], None
+
+    def _on_frames_loaded(self, key, frames):
+        # Called by the frame loader; only frames of the pending switch wake up the render loop
+        with self._switch_lock:
+            if key not in self._switch_frames:
+                return
+            self._switch_frames[key] = frames
+        self._wake_event.set()
+
+    @staticmethod
+    def _on_frames_evicted(key, frames):
+        # Animations keep their file open; it is opened again if the animation is still shown
+        if isinstance(frames, AnimatedFrameSource):
+            frames.close()
+
+    def _emotion_loader(self, emotion):
+        if emotion in self._animations:
+            def load_animation():
+                # Animations are decoded frame by frame during playback, with their own frame durations.
+                return AnimatedFrameSource.load(
+                    self._animations[emotion], width=self._DISP_WIDTH, height=self._DISP_HEIGHT,
+                    rotation=self.backend.rotation, frame_rate=self._frame_rate, shift_x=self._shift_x,
+                    rotate=self._rotate, window=self._animation_window,
+                )
+            return self._timed_loader(load_animation)
+
+        def load():
+            if not self.is_prepared(emotion):
+                # Not pre-processed yet: transform the source frames on the fly, the result is the same
+                image_folder_path = os.path.join(self._assets_folder, emotion.value)
+                return self._resident_frames(FrameSet.load(
+                    image_folder_path, self.backend.rotation, self._frames_skip, rotate=self._rotate,
+                    shift_x=self._shift_x, shared=self._shared_frames(),
+                ))
+
+            # The converted frames are kept in one frame pack per emotion, so later starts read a single
+            # file instead of decoding the pre-processed PNG images. Only every n-th frame is shown,
+            # so only those are loaded.
+            pack_path = os.path.join(self._temp_folder, emotion.value + FramePack.EXTENSION)
+            metadata = self.frame_pack_metadata(self.backend.rotation, self._frames_skip, self._frame_pack_compression)
+            tick_duration = round(1000 / self._frame_rate)
+            try:
+                return self._resident_frames(FrameSet.load_pack(
+                    pack_path, metadata=metadata, duration=tick_duration, shared=self._shared_frames()
+                ))
+            except (OSError, ValueError):
+                pass
+
+            image_folder_path = os.path.join(self._temp_folder, emotion.value)
+            frames = FrameSet.load(image_folder_path, self.backend.rotation, self._frames_skip,
+                                   shared=self._shared_frames())
+            frames.save(pack_path, self._frame_pack_compression, tick_duration, metadata)
+            return self._resident_frames(frames)
+        return self._timed_loader(load)
+
+    @staticmethod
+    def frame_pack_metadata(rotation, frames_skip, compression):
+        """Return the metadata a frame pack in the temp folder needs to be loaded instead of the images."""
+        return {"rotation": rotation, "frames_skip": max(1, frames_skip), "compression": compression}
+
+    def _transition_loader(self, from_emotion, to_emotion):
+        def load():
+            # Transitions are built on first use and then cached like the emotion frames.
+            folder = self._transitions.ensure(from_emotion.value, to_emotion.value)
+            return self._resident_frames(FrameSet.load(folder, self.backend.rotation))
+        return self._timed_loader(load)
+
+    def _shared_frames(self):
+        # Frames that other emotions in the frame cache have as well are kept in memory only once
+        shared = {}
+        for frames in self.frame_cache.values():
+            if isinstance(frames, FrameSet):
+                shared.update(frames.shared_frames())
+        return shared
+
+    def _resident_frames(self, frames):
+        # Palette-indexed frames need half the memory in the frame cache
+        if self._indexed_frames:
+            return IndexedFrameSet.from_frame_set(frames, shared=self._shared_frames())
+        return frames
+
+    def _timed_loader(self, load):
+        if self.stage_timer is None:
+            return load
+
+        def timed_load():
+            start = time.perf_counter()
+            frames = load()
+            self.stage_timer.record("load", time.perf_counter() - start)
+            return frames
+        return timed_load
 
     def stop(self):
         self._is_running = False
+        self._is_preparing = False
+        self._preparer.join(self._STOP_TIMEOUT)
+        self._wake_event.set()
         if self.is_alive():
+            self.join()
+            self._log.debug(f"Display metrics: {self.metrics}")
+            if self.stage_timer is not None:
+                self._log.info(f"Render stage timings:\n{self.stage_timer.format()}")
             # Show a pattern before stopping.
             self._display_pattern()
-            self.join()
-        self._backlight.value = False  # Turn off the backlight when stopping
+        self.backend.set_backlight(False)  # Turn off the backlight when stopping
+        self.backend.close()
 
     def _display_pattern(self):
         # Create a new image with RGB mode
@@ -243,24 +515,12 @@ class DisplayManager(threading.Thread):
         )
 
         # Display the pattern
-        self.disp.image(image)
+        self.backend.write_window(
+            (0, 0, self.backend.native_width, self.backend.native_height),
+            image_to_rgb565(image, self.backend.rotation),
+        )
+        self.backend.end_frame()
 
     @staticmethod
     def _shift_and_wrap(image, x):
-        data = image.load()
-        new_data = {}
-
-        for y in range(image.size[1]):
-            for x_new in range(image.size[0]):
-                new_data[(x_new, y)] = data[((x_new - x) % image.size[0], y)]
-
-        new_image = Image.new(image.mode, image.size)
-        new_image.putdata(
-            [
-                new_data[(x, y)]
-                for y in range(image.size[1])
-                for x in range(image.size[0])
-            ]
-        )
-
-        return new_image
+        return shift_and_wrap(image, x)
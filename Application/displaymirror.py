@@ -0,0 +1,249 @@
+# SPDX-FileCopyrightText: 2023 Karl Bauer (BAUER GROUP)
+# SPDX-License-Identifier: MIT
+
+#######################################################################################################################
+#
+# Description :  Package for Toni der Topf
+# Author      :  Karl Bauer (karl.bauer@bauer-group.com) / www.bauer-group.com
+#
+#######################################################################################################################
+
+# System Imports
+import io
+import time
+import threading
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+# Local Imports
+from .applogger import ApplicationLogger
+from .imageprocessing import from_display_orientation, rgb565_to_image
+from .sensoroverlay import SensorOverlay
+
+#######################################################################################################################
+
+class DisplayMirror:
+    """Serves what the display shows as MJPEG or PNG stream over HTTP, e.g. for remote support.
+
+    The render loop hands every shown frame to ``publish``. Without a connected client that is
+    all it costs. With clients, the frame is copied from the prepared frame source (nothing is
+    read back from the display) when it changed, at most ``max_fps`` times per second. Each copy
+    is encoded once per image format in the HTTP threads and shared by all clients.
+
+    ``/`` shows the stream in a page, ``/stream.mjpg`` and ``/stream.png`` are multipart streams,
+    ``/frame.jpg`` and ``/frame.png`` return the current frame.
+    """
+
+    FORMATS = {"jpeg": "image/jpeg", "png": "image/png"}
+
+    _BOUNDARY = b"frame"
+    _CLIENT_TIMEOUT = 2.0  # Seconds a client waits for the first frame
+    _POLL_INTERVAL = 1.0
+
+    def __init__(
+        self,
+        app_logger: ApplicationLogger,
+        port=8080,
+        address="0.0.0.0",
+        max_fps=2.0,
+        rotation=90,
+        quality=75,
+        overlay: SensorOverlay = None,
+    ):
+        if max_fps <= 0:
+            raise ValueError(f"Invalid mirror frame rate: {max_fps}")
+
+        self._log = app_logger
+        self.port = port
+        self.address = address
+        self.max_fps = max_fps
+        self.rotation = rotation
+        self.quality = quality
+        self.overlay = overlay
+
+        self._condition = threading.Condition()
+        self._encode_lock = threading.Lock()
+        self._clients = 0
+        self._dirty = True
+        self._next_snapshot = 0.0
+        self._snapshot = None  # (RGB565 buffer, size, overlay buffer or None)
+        self._version = 0
+        self._encoded = {}  # image format -> (version, data)
+
+        self._server = None
+        self._is_running = False
+
+        self.snapshots = 0
+        self.encodes = 0
+
+    @property
+    def clients(self):
+        return self._clients
+
+    @property
+    def stats(self):
+        return {"clients": self._clients, "snapshots": self.snapshots, "encodes": self.encodes}
+
+    def start(self):
+        try:
+            self._server = ThreadingHTTPServer((self.address, self.port), _MirrorRequestHandler)
+        except OSError as e:
+            self._log.error(f"Display mirror could not listen on {self.address}:{self.port}: {e}")
+            return
+        self._server.daemon_threads = True
+        self._server.mirror = self
+        self.port = self._server.server_address[1]
+        self._is_running = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        self._log.info(f"Display mirror is served on http://{self.address}:{self.port}/")
+
+    def stop(self):
+        if self._server is None:
+            return
+        self._is_running = False
+        with self._condition:
+            self._condition.notify_all()
+        self._server.shutdown()
+        self._server.server_close()
+        self._server = None
+
+    def publish(self, frames, index, changed=True):
+        """Called by the render loop after tick ``index`` of ``frames`` was shown (``changed``: something was written)."""
+        if changed:
+            self._dirty = True
+        if not self._clients or not self._dirty:
+            return
+        now = time.monotonic()
+        if now < self._next_snapshot:
+            return
+        self._next_snapshot = now + 1 / self.max_fps
+        self._dirty = False
+
+        # Copy the prepared frame and the overlay on top of it, they are encoded in the HTTP threads
+        buffer = frames.crop(index, (0, 0, frames.width, frames.height))
+        overlay = None
+        if self.overlay is not None and self.overlay.text is not None:
+            overlay = self.overlay.composite(frames.crop(index, self.overlay.native_box))
+
+        with self._condition:
+            self._snapshot = (buffer, (frames.width, frames.height), overlay)
+            self._version += 1
+            self.snapshots += 1
+            self._condition.notify_all()
+
+    def wait_for_frame(self, version, timeout):
+        """Wait until a frame newer than ``version`` was published. Returns ``False`` on timeout or stop."""
+        with self._condition:
+            self._condition.wait_for(lambda: self._version > version or not self._is_running, timeout)
+            return self._is_running and self._version > version
+
+    def frame(self, image_format="jpeg"):
+        """Return ``(version, data)`` of the latest frame encoded as ``image_format``."""
+        with self._encode_lock:
+            with self._condition:
+                version, snapshot = self._version, self._snapshot
+            encoded = self._encoded.get(image_format)
+            if encoded is not None and encoded[0] == version:
+                return encoded
+
+            buffer, size, overlay = snapshot
+            image = rgb565_to_image(buffer, size)
+            if overlay is not None:
+                left, upper, right, lower = self.overlay.native_box
+                image.paste(rgb565_to_image(overlay, (right - left, lower - upper)), (left, upper))
+            image = from_display_orientation(image, self.rotation)
+
+            output = io.BytesIO()
+            if image_format == "png":
+                image.save(output, format="PNG", compress_level=1)
+            else:
+                image.save(output, format="JPEG", quality=self.quality)
+            self._encoded[image_format] = encoded = (version, output.getvalue())
+            self.encodes += 1
+            return encoded
+
+    @contextmanager
+    def client(self):
+        """Register a client while it is connected; frames are only copied and encoded while there is one.
+
+        Yields the current frame version, the client waits for the frames after it.
+        """
+        with self._condition:
+            self._clients += 1
+            self._dirty = True  # A new client needs the current frame
+            version = self._version
+        try:
+            yield version
+        finally:
+            with self._condition:
+                self._clients -= 1
+                if not self._clients:
+                    # Nothing is kept for later clients
+                    self._snapshot = None
+                    self._encoded = {}
+
+    @property
+    def is_running(self):
+        return self._is_running
+
+#######################################################################################################################
+
+class _MirrorRequestHandler(BaseHTTPRequestHandler):
+    _PAGE = b"<!DOCTYPE html><html><head><title>Display</title></head>" \
+            b"<body style=\"margin:0;background:#000\"><img src=\"/stream.mjpg\" alt=\"Display\"></body></html>"
+
+    _STREAMS = {"/stream.mjpg": "jpeg", "/stream.png": "png"}
+    _FRAMES = {"/frame.jpg": "jpeg", "/frame.png": "png"}
+
+    def do_GET(self):
+        path = urlparse(self.path).path
+        try:
+            if path == "/":
+                self._send(200, "text/html", self._PAGE)
+            elif path in self._STREAMS:
+                self._stream(self._STREAMS[path])
+            elif path in self._FRAMES:
+                self._single_frame(self._FRAMES[path])
+            else:
+                self.send_error(404)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # Client disconnected
+
+    def _single_frame(self, image_format):
+        mirror = self.server.mirror
+        with mirror.client() as version:
+            if not mirror.wait_for_frame(version, mirror._CLIENT_TIMEOUT):
+                self.send_error(503, "No frame shown yet")
+                return
+            _, data = mirror.frame(image_format)
+        self._send(200, DisplayMirror.FORMATS[image_format], data)
+
+    def _stream(self, image_format):
+        mirror = self.server.mirror
+        self.send_response(200)
+        self.send_header("Content-Type", "multipart/x-mixed-replace; boundary=" + mirror._BOUNDARY.decode())
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+
+        content_type = DisplayMirror.FORMATS[image_format].encode()
+        with mirror.client() as version:
+            while mirror.is_running:
+                if not mirror.wait_for_frame(version, mirror._POLL_INTERVAL):
+                    continue
+                version, data = mirror.frame(image_format)
+                self.wfile.write(b"--" + mirror._BOUNDARY + b"\r\nContent-Type: " + content_type +
+                                 b"\r\nContent-Length: " + str(len(data)).encode() + b"\r\n\r\n" + data + b"\r\n")
+
+    def _send(self, status, content_type, data):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass  # Requests are not logged, a stream would flood the log
+
+#######################################################################################################################
@@ -0,0 +1,112 @@
+# SPDX-FileCopyrightText: 2023 Karl Bauer (BAUER GROUP)
+# SPDX-License-Identifier: MIT
+
+#######################################################################################################################
+#
+# Description :  Package for Toni der Topf
+# Author      :  Karl Bauer (karl.bauer@bauer-group.com) / www.bauer-group.com
+#
+#######################################################################################################################
+
+# System Imports
+import threading
+from collections import OrderedDict
+
+#######################################################################################################################
+
+class FrameCache:
+    """LRU cache of loaded frame sets with a memory budget in bytes.
+
+    Values must provide an ``nbytes`` attribute. The least recently used entries are evicted
+    until the cache fits into ``max_bytes`` again; the entry that was just added is always kept,
+    even if it alone exceeds the budget. ``on_evict(key, value)`` is called (outside the lock)
+    for every evicted entry, e.g. to release its resources.
+    """
+
+    def __init__(self, max_bytes, on_evict=None):
+        self.max_bytes = max_bytes
+        self._on_evict = on_evict
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._entries
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    @property
+    def nbytes(self):
+        with self._lock:
+            return sum(value.nbytes for value in self._entries.values())
+
+    @property
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(self),
+            "bytes": self.nbytes,
+            "max_bytes": self.max_bytes,
+        }
+
+    def values(self):
+        """Return the cached values, from the least to the most recently used."""
+        with self._lock:
+            return list(self._entries.values())
+
+    def get(self, key, loader=None):
+        """Return the cached value for ``key``.
+
+        On a miss ``loader()`` is called (outside the lock) and its result is cached.
+        Without ``loader``, ``None`` is returned on a miss.
+        """
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+
+        if loader is None:
+            return None
+
+        value = loader()
+        self.put(key, value)
+        return value
+
+    def put(self, key, value):
+        evicted = []
+        with self._lock:
+            replaced = self._entries.get(key)
+            if replaced is not None and replaced is not value:
+                evicted.append((key, replaced))
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+
+            total = sum(entry.nbytes for entry in self._entries.values())
+            while total > self.max_bytes and len(self._entries) > 1:
+                evicted.append(self._entries.popitem(last=False))
+                total -= evicted[-1][1].nbytes
+                self.evictions += 1
+        self._evicted(evicted)
+
+    def clear(self):
+        with self._lock:
+            evicted = list(self._entries.items())
+            self._entries.clear()
+        self._evicted(evicted)
+
+    def _evicted(self, entries):
+        if self._on_evict is not None:
+            for key, value in entries:
+                self._on_evict(key, value)
+
+#######################################################################################################################
@@ -0,0 +1,107 @@
+# SPDX-FileCopyrightText: 2023 Karl Bauer (BAUER GROUP)
+# SPDX-License-Identifier: MIT
+
+#######################################################################################################################
+#
+# Description :  Package for Toni der Topf
+# Author      :  Karl Bauer (karl.bauer@bauer-group.com) / www.bauer-group.com
+#
+#######################################################################################################################
+
+# System Imports
+import itertools
+import queue
+import threading
+import time
+
+# Local Imports
+from .applogger import ApplicationLogger
+from .framecache import FrameCache
+
+#######################################################################################################################
+
+class FrameLoader(threading.Thread):
+    """Loads frame sets into a ``FrameCache`` in the background.
+
+    The render thread keeps playing the current animation while the next one is loaded here.
+    Requests for an emotion change are served before prefetch requests.
+
+    ``on_loaded(key, frames)`` gets the loaded frames directly, so the caller can keep them even if
+    the cache evicts them again. A failed load is not reported there; the key is only requested
+    again after a retry delay that doubles with every failure.
+    """
+
+    PRIORITY_SWITCH = 0
+    PRIORITY_PREFETCH = 1
+
+    RETRY_DELAY = 1.0
+    MAX_RETRY_DELAY = 60.0
+
+    def __init__(self, app_logger: ApplicationLogger, frame_cache: FrameCache, on_loaded=None, clock=time.monotonic):
+        threading.Thread.__init__(self, daemon=True)
+        self._log = app_logger
+        self._cache = frame_cache
+        self._on_loaded = on_loaded
+        self._clock = clock
+
+        self._queue = queue.PriorityQueue()
+        self._counter = itertools.count()
+        self._pending = set()
+        self._failures = {}  # Key -> (number of failed loads, time of the next retry)
+        self._lock = threading.Lock()
+        self._is_running = False
+
+    def request(self, key, loader, priority=PRIORITY_SWITCH):
+        """Queue loading ``key`` with ``loader()``.
+
+        Returns ``False`` if it is cached or queued already, or if its last load failed and the retry delay has not passed.
+        """
+        with self._lock:
+            if key in self._pending or key in self._cache:
+                return False
+            if key in self._failures and self._clock() < self._failures[key][1]:
+                return False
+            self._pending.add(key)
+        self._queue.put((priority, next(self._counter), key, loader))
+        return True
+
+    def is_pending(self, key):
+        with self._lock:
+            return key in self._pending
+
+    def failures(self, key):
+        """Return the number of failed loads of ``key`` since it was last loaded."""
+        with self._lock:
+            return self._failures.get(key, (0, None))[0]
+
+    def run(self):
+        self._is_running = True
+        while self._is_running:
+            _, _, key, loader = self._queue.get()
+            if key is None:
+                break
+
+            try:
+                frames = self._cache.get(key, loader)
+            except Exception as e:
+                with self._lock:
+                    self._pending.discard(key)
+                    failures = self._failures.get(key, (0, None))[0] + 1
+                    delay = min(self.RETRY_DELAY * 2 ** (failures - 1), self.MAX_RETRY_DELAY)
+                    self._failures[key] = (failures, self._clock() + delay)
+                self._log.error(f"Loading frames for {key} failed ({failures}x), retrying in {delay:.0f} s: {e}")
+                continue
+
+            with self._lock:
+                self._pending.discard(key)
+                self._failures.pop(key, None)
+            if self._on_loaded is not None:
+                self._on_loaded(key, frames)
+
+    def stop(self):
+        self._is_running = False
+        self._queue.put((-1, next(self._counter), None, None))
+        if self.is_alive():
+            self.join()
+
+#######################################################################################################################
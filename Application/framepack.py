@@ -0,0 +1,193 @@
+# SPDX-FileCopyrightText: 2023 Karl Bauer (BAUER GROUP)
+# SPDX-License-Identifier: MIT
+
+#######################################################################################################################
+#
+# Description :  Package for Toni der Topf
+# Author      :  Karl Bauer (karl.bauer@bauer-group.com) / www.bauer-group.com
+#
+#######################################################################################################################
+
+# System Imports
+import os
+import json
+import mmap
+import struct
+import zlib
+
+# Local Imports
+from .imageprocessing import frame_digest
+
+#######################################################################################################################
+
+class FramePack:
+    """Read-only container with all frames of one animation in a single file.
+
+    Layout (little endian)::
+
+        header    magic, version, compression, width, height, frame count, metadata size
+        metadata  JSON (e.g. rotation and frame skip the frames were prepared for)
+        index     per frame: payload offset, payload size, first box, duration (ms), box count, digest
+        boxes     changed regions (left, upper, right, lower) of every frame against the one before
+        payloads  RGB565 frames in native display orientation, raw or compressed
+
+    The file is memory-mapped, so uncompressed frames are returned as views into the mapping
+    and only paged in when they are written to the display. Payloads are content-addressed by
+    the frame digest: identical frames share one payload.
+    """
+
+    EXTENSION = ".pack"
+
+    COMPRESSION_NONE = 0
+    COMPRESSION_ZLIB = 1
+    COMPRESSION_LZ4 = 2
+    _COMPRESSION_NAMES = {"none": COMPRESSION_NONE, "zlib": COMPRESSION_ZLIB, "lz4": COMPRESSION_LZ4}
+
+    NO_UPDATE = 0xFFFF  # Box count of frames that are always written completely
+
+    _MAGIC = b"TEOPACK\0"
+    _VERSION = 2
+    _HEADER = struct.Struct("<8sHHHHII")
+    _INDEX_ENTRY = struct.Struct("<QIIIH8s")
+    _BOX = struct.Struct("<HHHH")
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        try:
+            magic, version, self.compression, self.width, self.height, frame_count, metadata_size = \
+                self._HEADER.unpack_from(self._mmap, 0)
+            if magic != self._MAGIC or version != self._VERSION:
+                raise ValueError(f"Invalid frame pack: {path}")
+            if self.compression not in self._COMPRESSION_NAMES.values():
+                raise ValueError(f"Unsupported frame pack compression: {self.compression}")
+
+            offset = self._HEADER.size
+            self.metadata = json.loads(bytes(self._mmap[offset:offset + metadata_size]))
+            offset += metadata_size
+
+            self._index = [self._INDEX_ENTRY.unpack_from(self._mmap, offset + i * self._INDEX_ENTRY.size)
+                           for i in range(frame_count)]
+            self._boxes_offset = offset + frame_count * self._INDEX_ENTRY.size
+        except (struct.error, ValueError):
+            self._mmap.close()
+            raise ValueError(f"Invalid frame pack: {path}")
+
+    def __len__(self):
+        return len(self._index)
+
+    def frame(self, index):
+        """Return the RGB565 buffer of frame ``index`` (a view into the file if it is not compressed)."""
+        offset, size = self._index[index][:2]
+        payload = memoryview(self._mmap)[offset:offset + size]
+        if self.compression == self.COMPRESSION_NONE:
+            return payload
+        return _decompress(self.compression, payload, self.width * self.height * 2)
+
+    def duration(self, index):
+        return self._index[index][3]
+
+    def digest(self, index):
+        """Return the content digest of frame ``index`` (see ``frame_digest``)."""
+        return self._index[index][5]
+
+    def boxes(self, index):
+        """Return the changed regions of frame ``index``, or ``None`` if it is always written completely."""
+        _, _, first_box, _, box_count, _ = self._index[index]
+        if box_count == self.NO_UPDATE:
+            return None
+        offset = self._boxes_offset + first_box * self._BOX.size
+        return [self._BOX.unpack_from(self._mmap, offset + i * self._BOX.size) for i in range(box_count)]
+
+    def close(self):
+        self._mmap.close()
+
+    @classmethod
+    def is_supported(cls, compression):
+        """Return whether packs with ``compression`` (``none``, ``zlib`` or ``lz4``) can be written and read."""
+        if compression not in cls._COMPRESSION_NAMES:
+            return False
+        if cls._COMPRESSION_NAMES[compression] == cls.COMPRESSION_LZ4:
+            try:
+                _lz4_block()
+            except RuntimeError:
+                return False
+        return True
+
+    @classmethod
+    def write(cls, path, frames, width, height, boxes=None, durations=None, compression="none", metadata=None,
+              digests=None):
+        """Write ``frames`` (RGB565 buffers of ``width`` x ``height``) into a frame pack at ``path``.
+
+        ``boxes`` holds the changed regions per frame (``None`` entries for full frames),
+        ``durations`` the frame durations in milliseconds and ``digests`` the frame digests
+        (computed if not given). Identical frames are stored once.
+        """
+        if compression not in cls._COMPRESSION_NAMES:
+            raise ValueError(f"Invalid compression: {compression}. Valid values are: {list(cls._COMPRESSION_NAMES)}")
+        compression_id = cls._COMPRESSION_NAMES[compression]
+
+        boxes = boxes if boxes is not None else [None] * len(frames)
+        durations = durations if durations is not None else [0] * len(frames)
+        digests = digests if digests is not None else [frame_digest(frame) for frame in frames]
+        metadata_bytes = json.dumps(metadata or {}).encode()
+
+        payloads = {}
+        for frame, digest in zip(frames, digests):
+            if digest not in payloads:
+                payloads[digest] = bytes(frame) if compression_id == cls.COMPRESSION_NONE \
+                    else _compress(compression_id, frame)
+
+        box_count = sum(len(frame_boxes) for frame_boxes in boxes if frame_boxes is not None)
+        offset = cls._HEADER.size + len(metadata_bytes) + len(frames) * cls._INDEX_ENTRY.size + box_count * cls._BOX.size
+
+        payload_offsets = {}
+        for digest, payload in payloads.items():
+            payload_offsets[digest] = offset
+            offset += len(payload)
+
+        index = []
+        first_box = 0
+        for digest, frame_boxes, duration in zip(digests, boxes, durations):
+            count = len(frame_boxes) if frame_boxes is not None else cls.NO_UPDATE
+            index.append(cls._INDEX_ENTRY.pack(payload_offsets[digest], len(payloads[digest]), first_box, duration,
+                                               count, digest))
+            first_box += len(frame_boxes) if frame_boxes is not None else 0
+
+        # Write to a temporary file first, so an interrupted write never leaves a broken pack
+        temp_path = path + ".tmp"
+        with open(temp_path, "wb") as f:
+            f.write(cls._HEADER.pack(cls._MAGIC, cls._VERSION, compression_id, width, height, len(frames),
+                                     len(metadata_bytes)))
+            f.write(metadata_bytes)
+            f.writelines(index)
+            for frame_boxes in boxes:
+                f.writelines(cls._BOX.pack(*box) for box in frame_boxes or [])
+            f.writelines(payloads.values())
+        os.replace(temp_path, path)
+
+#######################################################################################################################
+
+def _compress(compression, data):
+    if compression == FramePack.COMPRESSION_ZLIB:
+        return zlib.compress(data, 1)
+    return _lz4_block().compress(data, store_size=False)
+
+
+def _decompress(compression, data, size):
+    if compression == FramePack.COMPRESSION_ZLIB:
+        return zlib.decompress(data)
+    return _lz4_block().decompress(data, uncompressed_size=size)
+
+
+def _lz4_block():
+    # LZ4 is optional, it is only needed for packs written with LZ4 compression
+    try:
+        import lz4.block
+    except ImportError:
+        raise RuntimeError("LZ4 compressed frame packs need the 'lz4' package (pip install lz4)")
+    return lz4.block
+
+#######################################################################################################################
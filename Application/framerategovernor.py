@@ -0,0 +1,122 @@
+# SPDX-FileCopyrightText: 2023 Karl Bauer (BAUER GROUP)
+# SPDX-License-Identifier: MIT
+
+#######################################################################################################################
+#
+# Description :  Package for Toni der Topf
+# Author      :  Karl Bauer (karl.bauer@bauer-group.com) / www.bauer-group.com
+#
+#######################################################################################################################
+
+# System Imports
+import os
+import time
+
+# Local Imports
+from .applogger import ApplicationLogger
+
+#######################################################################################################################
+
+class FrameRateGovernor:
+    """Adjusts the display frame rate to the measured render cost and system load.
+
+    The render loop reports the time spent writing each frame with ``record_frame``. Every
+    ``interval`` seconds ``update`` looks at the render cost, the system load average and the
+    lag reported by ``lag_sources`` (callables returning how many seconds other threads are
+    behind their schedule). The frame rate is lowered quickly when the system is overloaded
+    and raised slowly again when there is headroom.
+    """
+
+    def __init__(
+        self,
+        app_logger: ApplicationLogger,
+        min_fps=2,
+        max_fps=10,
+        render_budget=0.5,
+        max_load=1.0,
+        max_lag=0.5,
+        lag_sources=None,
+        interval=5.0,
+        clock=time.monotonic,
+        load_average=os.getloadavg,
+    ):
+        if min_fps <= 0 or max_fps < min_fps:
+            raise ValueError(f"Invalid frame rate bounds: {min_fps}..{max_fps}")
+
+        self._log = app_logger
+        self.min_fps = min_fps
+        self.max_fps = max_fps
+        self.render_budget = render_budget  # Share of one CPU core the rendering may use
+        self.max_load = max_load  # Load average per CPU core
+        self.max_lag = max_lag
+        self.lag_sources = list(lag_sources or [])
+        self.interval = interval
+        self._clock = clock
+        self._load_average = load_average
+        self._cpu_count = os.cpu_count() or 1
+
+        self.fps = max_fps
+        self._last_update = clock()
+        self._render_time = 0.0
+        self._render_frames = 0
+
+        self.decreases = 0
+        self.increases = 0
+        self.metrics = {}
+
+    def add_lag_source(self, lag_source):
+        self.lag_sources.append(lag_source)
+
+    def record_frame(self, render_seconds):
+        self._render_time += render_seconds
+        self._render_frames += 1
+
+    def update(self):
+        """Re-evaluate the frame rate once per ``interval``. Returns the frame rate to use."""
+        now = self._clock()
+        elapsed = now - self._last_update
+        if elapsed < self.interval:
+            return self.fps
+
+        render_usage = self._render_time / elapsed
+        load = self._load_average()[0] / self._cpu_count
+        lag = max((source() or 0.0 for source in self.lag_sources), default=0.0)
+
+        previous_fps = self.fps
+        reason = None
+        if lag > self.max_lag:
+            reason = f"threads lagging by {lag:.2f} s"
+        elif render_usage > self.render_budget:
+            reason = f"rendering uses {render_usage:.0%} CPU"
+        elif load > self.max_load:
+            reason = f"system load {load:.2f} per core"
+
+        if reason is not None:
+            # Back off quickly
+            self.fps = max(self.min_fps, self.fps * 0.75)
+            if self.fps < previous_fps:
+                self.decreases += 1
+                self._log.info(f"Frame rate governor: {previous_fps:.1f} -> {self.fps:.1f} fps ({reason})")
+        elif render_usage < self.render_budget / 2 and load < self.max_load * 0.75 and lag < self.max_lag / 2:
+            # Recover slowly while there is headroom
+            self.fps = min(self.max_fps, self.fps + 1)
+            if self.fps > previous_fps:
+                self.increases += 1
+                self._log.info(f"Frame rate governor: {previous_fps:.1f} -> {self.fps:.1f} fps (headroom available)")
+
+        self.metrics = {
+            "fps": round(self.fps, 2),
+            "render_ms_per_frame": round(self._render_time / self._render_frames * 1000, 3) if self._render_frames else 0.0,
+            "render_usage": round(render_usage, 3),
+            "load_per_core": round(load, 2),
+            "lag_s": round(lag, 3),
+            "decreases": self.decreases,
+            "increases": self.increases,
+        }
+
+        self._last_update = now
+        self._render_time = 0.0
+        self._render_frames = 0
+        return self.fps
+
+#######################################################################################################################
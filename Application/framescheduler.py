@@ -0,0 +1,168 @@
+# SPDX-FileCopyrightText: 2023 Karl Bauer (BAUER GROUP)
+# SPDX-License-Identifier: MIT
+
+#######################################################################################################################
+#
+# Description :  Package for Toni der Topf
+# Author      :  Karl Bauer (karl.bauer@bauer-group.com) / www.bauer-group.com
+#
+#######################################################################################################################
+
+# System Imports
+import math
+import time
+import threading
+
+#######################################################################################################################
+
+class FrameScheduler:
+    """Time-driven animation clock.
+
+    The frame to show is derived from the elapsed monotonic time, and waiting is done until
+    absolute deadlines. If writing a frame takes longer than the frame budget, the following
+    frames are dropped instead of slowing the animation down.
+
+    ``frame_rate`` is the speed of the animation in frames per second. ``display_rate`` is how
+    often a frame is written to the display; it defaults to ``frame_rate`` and can be lowered
+    (e.g. by a governor) without changing the speed of the animation.
+    """
+
+    def __init__(self, frame_rate, clock=time.monotonic):
+        self._clock = clock
+        self._display_rate = None
+        self.frame_rate = frame_rate
+        self.restart()
+        self.reset_stats()
+
+    @property
+    def frame_rate(self):
+        return self._frame_rate
+
+    @frame_rate.setter
+    def frame_rate(self, frame_rate):
+        if frame_rate <= 0:
+            raise ValueError(f"Invalid frame rate: {frame_rate}")
+        # Keep the current position of the animation when the rate changes
+        if hasattr(self, "_start_time"):
+            now = self._clock()
+            position = (now - self._start_time) * self._frame_rate
+            self._start_time = now - position / frame_rate
+            self._tick = self._elapsed_ticks(now, self._display_rate or frame_rate)
+        self._frame_rate = frame_rate
+
+    @property
+    def display_rate(self):
+        return self._display_rate or self._frame_rate
+
+    @display_rate.setter
+    def display_rate(self, display_rate):
+        if display_rate is not None and display_rate <= 0:
+            raise ValueError(f"Invalid display rate: {display_rate}")
+        self._display_rate = display_rate
+        # Continue with the tick numbering of the new rate, so the change is not counted as dropped frames
+        self._tick = self._elapsed_ticks(self._clock(), self.display_rate)
+
+    def restart(self):
+        """Start the animation again at frame 0 (e.g. after an emotion change)."""
+        self._start_time = self._clock()
+        self._tick = 0
+        self._tick_shown = False
+        self._position = 0
+
+    def reset_stats(self):
+        self._stats_start_time = self._clock()
+        self.frames_shown = 0
+        self.late_frames = 0
+        self.dropped_frames = 0
+        self._lateness_count = 0
+        self._lateness_mean = 0.0
+        self._lateness_m2 = 0.0
+        self.max_lateness = 0.0
+        self.last_lateness = 0.0
+
+    def _elapsed_ticks(self, now, rate):
+        # The small epsilon keeps a wake-up exactly at the deadline from rounding down to the previous tick
+        return int((now - self._start_time) * rate + 1e-6)
+
+    def frame_index(self, frame_count):
+        """Return the index of the frame to show now for an animation of ``frame_count`` frames.
+
+        Display ticks that passed without a frame being shown are counted as dropped.
+        """
+        now = self._clock()
+        tick = self._elapsed_ticks(now, self.display_rate)
+
+        # An early wake-up (e.g. emotion change) within the same tick does not count as a new frame
+        if tick != self._tick or not self._tick_shown:
+            if self._tick_shown and tick > self._tick + 1:
+                self.late_frames += 1
+                self.dropped_frames += tick - self._tick - 1
+            self.frames_shown += 1
+
+        self._tick = tick
+        self._tick_shown = True
+        self._position = self._elapsed_ticks(now, self._frame_rate)
+        return self._position % frame_count if frame_count else 0
+
+    @property
+    def position(self):
+        """Number of animation frames since the last restart, as of the last ``frame_index`` call."""
+        return self._position
+
+    def next_deadline(self):
+        return self._start_time + (self._tick + 1) / self.display_rate
+
+    def wait(self, wake_event: threading.Event = None):
+        """Sleep until the deadline of the next frame.
+
+        Returns ``False`` if ``wake_event`` was set while waiting (the event is cleared again).
+        """
+        deadline = self.next_deadline()
+        timeout = deadline - self._clock()
+
+        if timeout > 0:
+            if wake_event is not None:
+                if wake_event.wait(timeout):
+                    wake_event.clear()
+                    return False
+            else:
+                time.sleep(timeout)
+
+        self.last_lateness = max(0.0, self._clock() - deadline)
+        self._record_lateness(self.last_lateness)
+        return True
+
+    def _record_lateness(self, lateness):
+        # Welford's online algorithm for mean and variance
+        self._lateness_count += 1
+        delta = lateness - self._lateness_mean
+        self._lateness_mean += delta / self._lateness_count
+        self._lateness_m2 += delta * (lateness - self._lateness_mean)
+        self.max_lateness = max(self.max_lateness, lateness)
+
+    @property
+    def jitter(self):
+        """Standard deviation of the wake-up lateness in seconds."""
+        if self._lateness_count < 2:
+            return 0.0
+        return math.sqrt(self._lateness_m2 / (self._lateness_count - 1))
+
+    @property
+    def achieved_fps(self):
+        elapsed = self._clock() - self._stats_start_time
+        return self.frames_shown / elapsed if elapsed > 0 else 0.0
+
+    @property
+    def stats(self):
+        return {
+            "target_fps": self._frame_rate,
+            "display_fps": self.display_rate,
+            "achieved_fps": round(self.achieved_fps, 2),
+            "frames_shown": self.frames_shown,
+            "late_frames": self.late_frames,
+            "dropped_frames": self.dropped_frames,
+            "jitter_ms": round(self.jitter * 1000, 3),
+            "max_lateness_ms": round(self.max_lateness * 1000, 3),
+        }
+
+#######################################################################################################################
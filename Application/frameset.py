@@ -0,0 +1,295 @@
+# SPDX-FileCopyrightText: 2023 Karl Bauer (BAUER GROUP)
+# SPDX-License-Identifier: MIT
+
+#######################################################################################################################
+#
+# Description :  Package for Toni der Topf
+# Author      :  Karl Bauer (karl.bauer@bauer-group.com) / www.bauer-group.com
+#
+#######################################################################################################################
+
+# System Imports
+import os
+from PIL import Image
+
+# Local Imports
+from .imageprocessing import (changed_regions, crop_buffer, crop_rgb565, expand_indexed, frame_digest,
+                              image_to_rgb565, rgb565_lookup_tables, rgb565_to_image, to_display_orientation,
+                              transform_image)
+from .framepack import FramePack
+
+#######################################################################################################################
+
+class FrameSet:
+    """Frames of one emotion, converted once into ready-to-send RGB565 buffers.
+
+    Besides the full frames, the set keeps the changed regions between consecutive frames
+    (``updates``), so playback only has to write the parts of the display that change.
+    An entry of ``None`` means the change is too large and the full frame is written.
+
+    Runs of identical frames are collapsed into one frame that is held for several ticks of the
+    frame scheduler (``holds``). Playback is indexed by tick, like ``AnimatedFrameSource``:
+    ``len()`` is the number of ticks and ``tick_frames`` maps every tick to its frame.
+    """
+
+    # Largest number of skipped frames whose changed regions are combined instead of writing a full frame
+    MAX_DELTA_GAP = 4
+
+    BYTES_PER_PIXEL = 2
+
+    def __init__(self, frames, width, height, updates=None, full_frame_ratio=0.5, holds=None, digests=None):
+        self.frames = frames
+        self.width = width
+        self.height = height
+        self.updates = updates
+        self.full_frame_ratio = full_frame_ratio
+        self.holds = holds if holds is not None else [1] * len(frames)
+        self.digests = digests
+        self.tick_frames = [frame for frame, hold in enumerate(self.holds) for _ in range(hold)]
+        # The windows of full frames are built once, so playback does not allocate them per frame
+        self._full_frame_regions = [[((0, 0, width, height), frame)] for frame in frames]
+
+    def __len__(self):
+        return len(self.tick_frames)
+
+    def __getitem__(self, index):
+        return self.frames[self.tick_frames[index]]
+
+    def __iter__(self):
+        return (self[index] for index in range(len(self)))
+
+    @property
+    def nbytes(self):
+        # Identical frames share one buffer
+        total = sum(len(frame) for frame in {id(frame): frame for frame in self.frames}.values())
+        for regions in self.updates or []:
+            total += sum(len(buffer) for _, buffer in regions or [])
+        return total
+
+    def regions(self, index, previous_index=None):
+        """Return the windows ``(box, buffer)`` to write to show tick ``index`` after ``previous_index``.
+
+        Boxes are ``(left, upper, right, lower)`` in display orientation. Nothing has to be written
+        while a frame is held. If the previous frame is the one right before, the stored delta is
+        used. If a few frames were skipped (dropped frames, lower display rate), the changed regions
+        of the skipped frames are combined and cut out of the target frame. Otherwise the full frame
+        is returned.
+        """
+        frame = self.tick_frames[index]
+        previous_frame = self.tick_frames[previous_index] if previous_index is not None else None
+        if previous_frame == frame:
+            return []
+
+        if self.updates is not None and previous_frame is not None:
+            gap = (frame - previous_frame) % len(self.frames)
+            if gap == 1 and self.updates[frame] is not None:
+                return self.updates[frame]
+            if 1 < gap <= self.MAX_DELTA_GAP:
+                boxes = self._combined_boxes(previous_frame, gap)
+                if boxes is not None:
+                    return [(box, crop_buffer(self.frames[frame], self.width, box, self.BYTES_PER_PIXEL))
+                            for box in boxes]
+
+        return self._full_frame_regions[frame]
+
+    def crop(self, index, box):
+        """Return the RGB565 pixels of tick ``index`` in ``box``."""
+        return crop_buffer(self.frames[self.tick_frames[index]], self.width, box, self.BYTES_PER_PIXEL)
+
+    def shared_frames(self):
+        """Return the frame buffers by digest, to be shared with frame sets loaded later."""
+        if self.digests is None:
+            return {}
+        return dict(zip(self.digests, self.frames))
+
+    def _combined_boxes(self, previous_index, gap):
+        boxes = []
+        for step in range(1, gap + 1):
+            update = self.updates[(previous_index + step) % len(self.frames)]
+            if update is None:
+                return None
+            boxes.extend(box for box, _ in update)
+
+        changed_area = sum((right - left) * (lower - upper) for left, upper, right, lower in boxes)
+        if changed_area > self.full_frame_ratio * self.width * self.height:
+            return None
+        return boxes
+
+    @classmethod
+    def load(cls, image_folder_path, rotation=0, frames_skip=1, full_frame_ratio=0.5, rotate=0, shift_x=0, shared=None):
+        """Load every ``frames_skip``-th PNG of ``image_folder_path`` and convert it for the display.
+
+        Changed regions between consecutive frames are computed as well. If they cover more than
+        ``full_frame_ratio`` of the display, the full frame is written instead. ``rotate`` and
+        ``shift_x`` transform source frames that were not pre-processed. Repeated frames are held
+        instead of stored again, and frames found in ``shared`` (digest to buffer, e.g. from the
+        frame sets of other emotions) reuse that buffer.
+        """
+        image_files = sorted([f for f in os.listdir(image_folder_path) if f.endswith(".png")])
+
+        frames = []
+        updates = []
+        holds = []
+        digests = []
+        buffers = dict(shared or {})
+        first_image = previous_image = None
+        for image_file in image_files[::max(1, frames_skip)]:
+            with Image.open(os.path.join(image_folder_path, image_file)) as image:
+                native_image = to_display_orientation(transform_image(image, rotate, shift_x), rotation)
+            buffer = image_to_rgb565(native_image)
+            digest = frame_digest(buffer)
+            if digests and digest == digests[-1]:
+                holds[-1] += 1
+                continue
+
+            frames.append(buffers.setdefault(digest, buffer))
+            holds.append(1)
+            digests.append(digest)
+
+            # Diff each frame against the one before, only the previous image is kept in memory
+            if previous_image is None:
+                first_image = native_image
+                updates.append(None)
+            else:
+                updates.append(cls._frame_update(previous_image, native_image, frames[-1], full_frame_ratio))
+            previous_image = native_image
+
+        if not frames:
+            return cls(frames, 0, 0)
+
+        # The animation loops, so the first frame follows the last one
+        updates[0] = cls._frame_update(previous_image, first_image, frames[0], full_frame_ratio)
+
+        # Size in the native orientation of the display
+        width, height = first_image.size
+
+        return cls(frames, width, height, updates, full_frame_ratio, holds, digests)
+
+    def save(self, path, compression="none", duration=0, metadata=None):
+        """Write the frames and their changed regions into a ``FramePack`` at ``path``.
+
+        ``duration`` is the length of one tick in milliseconds, held frames last several ticks.
+        """
+        boxes = [[box for box, _ in update] if update is not None else None for update in self.updates or []]
+        FramePack.write(path, self.frames, self.width, self.height, boxes=boxes or None,
+                        durations=[duration * hold for hold in self.holds], compression=compression,
+                        metadata=metadata, digests=self.digests)
+
+    @classmethod
+    def load_pack(cls, path, full_frame_ratio=0.5, metadata=None, duration=None, shared=None):
+        """Load the frames of the ``FramePack`` at ``path``; uncompressed frames stay in the page cache.
+
+        ``duration`` is the length of one tick in milliseconds, the frame durations of the pack are
+        converted into holds with it. Frames found in ``shared`` reuse that buffer.
+        Raises ``ValueError`` if the pack was written with a different ``metadata``.
+        """
+        pack = FramePack(path)
+        if metadata is not None and pack.metadata != metadata:
+            pack.close()
+            raise ValueError(f"Frame pack {path} was written for {pack.metadata}, expected {metadata}")
+
+        buffers = dict(shared or {})
+        digests = [pack.digest(index) for index in range(len(pack))]
+        frames = []
+        for index, digest in enumerate(digests):
+            if digest not in buffers:
+                buffers[digest] = pack.frame(index)
+            frames.append(buffers[digest])
+        holds = [max(1, round(pack.duration(index) / duration)) if duration else 1 for index in range(len(pack))]
+        updates = []
+        for index, frame in enumerate(frames):
+            boxes = pack.boxes(index)
+            updates.append([(box, crop_rgb565(frame, pack.width, box)) for box in boxes] if boxes is not None else None)
+        return cls(frames, pack.width, pack.height, updates, full_frame_ratio, holds, digests)
+
+    @staticmethod
+    def _frame_update(previous_image, native_image, frame, full_frame_ratio):
+        width, height = native_image.size
+        boxes = changed_regions(previous_image, native_image)
+        changed_area = sum((right - left) * (lower - upper) for left, upper, right, lower in boxes)
+        if changed_area > full_frame_ratio * width * height:
+            return None
+        return [(box, crop_rgb565(frame, width, box)) for box in boxes]
+
+#######################################################################################################################
+
+class IndexedFrameSet(FrameSet):
+    """Frames of one emotion as 8-bit palette indices, with one palette shared by all frames.
+
+    This needs half the memory of RGB565 frames. The windows are expanded to RGB565 when they
+    are written, with two 256-byte lookup tables (``bytes.translate``) per palette. Each window is
+    expanded into a new buffer, the frames are not written from the stored buffers as RGB565 frames are.
+    The palette is lossy for frames with more than 256 colors.
+    """
+
+    BYTES_PER_PIXEL = 1
+
+    def __init__(self, frames, width, height, palette, updates=None, full_frame_ratio=0.5, holds=None, digests=None):
+        super().__init__(frames, width, height, updates, full_frame_ratio, holds, digests)
+        self.palette = palette
+        self._high_table, self._low_table = rgb565_lookup_tables(palette)
+
+    def __getitem__(self, index):
+        return expand_indexed(super().__getitem__(index), self._high_table, self._low_table)
+
+    def crop(self, index, box):
+        return expand_indexed(super().crop(index, box), self._high_table, self._low_table)
+
+    def regions(self, index, previous_index=None):
+        return [(box, expand_indexed(buffer, self._high_table, self._low_table))
+                for box, buffer in super().regions(index, previous_index)]
+
+    def shared_frames(self):
+        """Return the index buffers by digest and palette; they only mean the same frame with the same palette."""
+        if self.digests is None:
+            return {}
+        palette = bytes(self.palette)
+        return {(digest, palette): frame for digest, frame in zip(self.digests, self.frames)}
+
+    @classmethod
+    def from_frame_set(cls, frame_set: FrameSet, colors=256, shared=None):
+        """Quantize the RGB565 frames of ``frame_set`` to one palette of up to ``colors`` colors.
+
+        The palette is built from all frames at half resolution, then every frame is mapped to
+        it without dithering, so unchanged pixels keep their index and the deltas stay valid.
+        Frames found in ``shared`` with the same palette reuse that buffer.
+        """
+        width, height = frame_set.width, frame_set.height
+        if not frame_set.frames:
+            return cls([], width, height, [])
+
+        # Frame sets with few colors get an exact palette, otherwise it is built from all frames at half resolution
+        exact_colors = set()
+        sample_width, sample_height = max(1, width // 2), max(1, height // 2)
+        sample = Image.new("RGB", (sample_width, sample_height * len(frame_set.frames)))
+        for i, frame in enumerate(frame_set.frames):
+            image = rgb565_to_image(frame, (width, height))
+            if exact_colors is not None:
+                frame_colors = image.getcolors(colors)
+                exact_colors = exact_colors.union(color for _, color in frame_colors) if frame_colors else None
+                if exact_colors is not None and len(exact_colors) > colors:
+                    exact_colors = None
+            sample.paste(image.resize((sample_width, sample_height), Image.NEAREST), (0, i * sample_height))
+
+        if exact_colors is not None:
+            palette_image = Image.new("P", (1, 1))
+            palette_image.putpalette([channel for color in sorted(exact_colors) for channel in color])
+        else:
+            palette_image = sample.quantize(colors, method=Image.Quantize.FASTOCTREE, dither=Image.Dither.NONE)
+
+        palette = palette_image.getpalette()[:colors * 3]
+        frames = [rgb565_to_image(frame, (width, height)).quantize(palette=palette_image, dither=Image.Dither.NONE).tobytes()
+                  for frame in frame_set.frames]
+        if shared and frame_set.digests is not None:
+            frames = [shared.get((digest, bytes(palette)), frame) for digest, frame in zip(frame_set.digests, frames)]
+
+        updates = None
+        if frame_set.updates is not None:
+            updates = [[(box, crop_buffer(frames[index], width, box, 1)) for box, _ in update]
+                       if update is not None else None
+                       for index, update in enumerate(frame_set.updates)]
+
+        return cls(frames, width, height, palette, updates, frame_set.full_frame_ratio, frame_set.holds,
+                   frame_set.digests)
+
+#######################################################################################################################
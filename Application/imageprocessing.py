@@ -0,0 +1,171 @@
+# SPDX-FileCopyrightText: 2023 Karl Bauer (BAUER GROUP)
+# SPDX-License-Identifier: MIT
+
+#######################################################################################################################
+#
+# Description :  Package for Toni der Topf
+# Author      :  Karl Bauer (karl.bauer@bauer-group.com) / www.bauer-group.com
+#
+#######################################################################################################################
+
+# System Imports
+import sys
+import hashlib
+from array import array
+from PIL import Image, ImageChops
+
+#######################################################################################################################
+
+# Lookup tables for the RGB888 -> RGB565 conversion (big endian, as expected by the ILI9341)
+_RGB565_RED_HIGH = [value & 0xF8 for value in range(256)]
+_RGB565_GREEN_HIGH = [value >> 5 for value in range(256)]
+_RGB565_GREEN_LOW = [(value & 0x1C) << 3 for value in range(256)]
+_RGB565_BLUE_LOW = [value >> 3 for value in range(256)]
+_RGB565_MASK = [value & 0xF8 for value in range(256)] + [value & 0xFC for value in range(256)] + \
+               [value & 0xF8 for value in range(256)]
+
+_TRANSPOSE_FOR_ROTATION = {
+    90: Image.Transpose.ROTATE_90,
+    180: Image.Transpose.ROTATE_180,
+    270: Image.Transpose.ROTATE_270,
+}
+
+#######################################################################################################################
+
+def shift_and_wrap(image: Image.Image, x: int) -> Image.Image:
+    """Shift ``image`` horizontally by ``x`` pixels, wrapping pixels around the edge.
+
+    Positive values move the content to the right. The work is done by Pillow on the
+    whole pixel buffer, so no per-pixel Python code is involved.
+    """
+    return ImageChops.offset(image, x, 0)
+
+
+def transform_image(image: Image.Image, rotate=0, shift_x=0) -> Image.Image:
+    """Apply the display rotation and horizontal shift used for the temporary images."""
+    processed_image = image
+
+    # Rotate the image
+    if rotate != 0:
+        processed_image = processed_image.rotate(rotate)
+
+    # Shift the image
+    if shift_x != 0:
+        processed_image = shift_and_wrap(processed_image, shift_x)
+
+    return processed_image
+
+
+def to_display_orientation(image: Image.Image, rotation=0, mode="RGB") -> Image.Image:
+    """Return ``image`` as ``mode`` (RGB) in the native orientation of the panel for the display ``rotation``.
+
+    The image is turned the same way ``adafruit_rgb_display`` does it, so the result can be
+    written with a single block transfer.
+    """
+    if rotation not in (0, 90, 180, 270):
+        raise ValueError("Rotation must be 0/90/180/270")
+
+    image = image.convert(mode)
+    if rotation != 0:
+        image = image.transpose(_TRANSPOSE_FOR_ROTATION[rotation])
+    return image
+
+
+def from_display_orientation(image: Image.Image, rotation=0) -> Image.Image:
+    """Turn an ``image`` in the native orientation of the panel back, as it is seen on the display."""
+    if rotation not in (0, 90, 180, 270):
+        raise ValueError("Rotation must be 0/90/180/270")
+    if rotation != 0:
+        image = image.transpose(_TRANSPOSE_FOR_ROTATION[(360 - rotation) % 360])
+    return image
+
+
+def image_to_rgb565(image: Image.Image, rotation=0) -> bytes:
+    """Convert ``image`` into a ready-to-send RGB565 buffer for the display.
+
+    ``rotation`` is the display rotation (0/90/180/270), see ``to_display_orientation``.
+    Every pixel is packed as two bytes, high byte first: ``RRRRRGGG GGGBBBBB``.
+    """
+    image = to_display_orientation(image, rotation)
+
+    red, green, blue = image.split()
+    high = ImageChops.add(red.point(_RGB565_RED_HIGH), green.point(_RGB565_GREEN_HIGH))
+    low = ImageChops.add(green.point(_RGB565_GREEN_LOW), blue.point(_RGB565_BLUE_LOW))
+
+    # Interleave high and low bytes of every pixel
+    return Image.merge("LA", (high, low)).tobytes()
+
+
+def rgb565_to_image(buffer, size) -> Image.Image:
+    """Decode a big endian RGB565 ``buffer`` of ``size`` (width, height) back into an RGB image."""
+    if sys.byteorder == "little":
+        # Pillow only decodes native (little endian) RGB565, swap the bytes of every pixel first
+        pixels = array("H")
+        pixels.frombytes(buffer)
+        pixels.byteswap()
+        buffer = pixels.tobytes()
+    return Image.frombuffer("RGB", size, bytes(buffer), "raw", "BGR;16", 0, 1)
+
+
+def changed_regions(previous: Image.Image, current: Image.Image, band_height=16):
+    """Return the boxes ``(left, upper, right, lower)`` where ``current`` differs from ``previous``.
+
+    Both images must have the same size and be in display orientation. The image is split
+    into horizontal bands of ``band_height`` rows and one bounding box is returned per band
+    with changes, so separate areas (eyes, mouth) do not merge into one large box.
+    Differences that disappear in RGB565 are ignored.
+    """
+    difference = ImageChops.difference(
+        previous.convert("RGB").point(_RGB565_MASK), current.convert("RGB").point(_RGB565_MASK)
+    )
+
+    width, height = difference.size
+    regions = []
+    for upper in range(0, height, band_height):
+        lower = min(upper + band_height, height)
+        box = difference.crop((0, upper, width, lower)).getbbox()
+        if box is not None:
+            regions.append((box[0], upper + box[1], box[2], upper + box[3]))
+    return regions
+
+
+def crop_rgb565(buffer, width, box) -> bytes:
+    """Cut the window ``box`` (``left, upper, right, lower``) out of an RGB565 ``buffer`` of ``width`` pixels."""
+    return crop_buffer(buffer, width, box, 2)
+
+
+def crop_buffer(buffer, width, box, bytes_per_pixel) -> bytes:
+    """Cut the window ``box`` out of a ``buffer`` of ``width`` pixels with ``bytes_per_pixel`` bytes each."""
+    left, upper, right, lower = box
+    view = memoryview(buffer)
+    row_bytes = width * bytes_per_pixel
+    return b"".join(view[row * row_bytes + left * bytes_per_pixel:row * row_bytes + right * bytes_per_pixel]
+                    for row in range(upper, lower))
+
+
+def frame_digest(buffer) -> bytes:
+    """Return the content address of a frame ``buffer``: an 8 byte BLAKE2b digest of its pixels."""
+    return hashlib.blake2b(buffer, digest_size=8).digest()
+
+
+def rgb565_lookup_tables(palette):
+    """Return the tables mapping palette indices to the high and low RGB565 bytes of the color.
+
+    ``palette`` is a flat ``[r, g, b, r, g, b, ...]`` list with up to 256 colors.
+    """
+    palette = list(palette) + [0] * (768 - len(palette))
+    high = bytes((palette[i * 3] & 0xF8) | (palette[i * 3 + 1] >> 5) for i in range(256))
+    low = bytes(((palette[i * 3 + 1] & 0x1C) << 3) | (palette[i * 3 + 2] >> 3) for i in range(256))
+    return high, low
+
+
+def expand_indexed(indices, high_table, low_table) -> bytearray:
+    """Expand 8-bit palette ``indices`` into an RGB565 buffer with the tables of ``rgb565_lookup_tables``."""
+    if not isinstance(indices, (bytes, bytearray)):
+        indices = bytes(indices)
+    buffer = bytearray(len(indices) * 2)
+    buffer[0::2] = indices.translate(high_table)
+    buffer[1::2] = indices.translate(low_table)
+    return buffer
+
+#######################################################################################################################
@@ -0,0 +1,231 @@
+# SPDX-FileCopyrightText: 2023 Karl Bauer (BAUER GROUP)
+# SPDX-License-Identifier: MIT
+
+#######################################################################################################################
+#
+# Description :  Package for Toni der Topf
+# Author      :  Karl Bauer (karl.bauer@bauer-group.com) / www.bauer-group.com
+#
+#######################################################################################################################
+
+# System Imports
+import atexit
+import signal
+import logging
+import threading
+import multiprocessing
+
+# Local Imports
+from .applogger import ApplicationLogger
+from .displaymanager import DisplayManager, Emotions
+from .displaybackend import create_display_backend
+from .framerategovernor import FrameRateGovernor
+from .sensoroverlay import SensorOverlay
+from .displaymirror import DisplayMirror
+
+#######################################################################################################################
+
+def _render_main(connection, lag_values, settings):
+    # Entry point of the render process: runs a DisplayManager and executes the commands of the pipe
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # The application process decides when to stop
+
+    log = ApplicationLogger(level=settings["log_level"])
+    governor = None
+    if settings["governor"] is not None:
+        lag_sources = [lambda slot=slot: lag_values[slot] for slot in range(len(lag_values))]
+        governor = FrameRateGovernor(log, lag_sources=lag_sources, **settings["governor"])
+
+    overlay = SensorOverlay() if settings["overlay"] else None
+    mirror = DisplayMirror(log, overlay=overlay, **settings["mirror"]) if settings["mirror"] is not None else None
+    display_manager = DisplayManager(
+        log,
+        governor=governor,
+        overlay=overlay,
+        mirror=mirror,
+        backend=create_display_backend(settings["backend"], path=settings["backend_path"]),
+        **settings["display"],
+    )
+    display_manager.start()
+
+    stopped = False
+    try:
+        while not stopped:
+            try:
+                command, argument = connection.recv()
+            except EOFError:
+                log.warning("Application process is gone, stopping the render process...")
+                break
+
+            if command == "emotion":
+                display_manager.set_emotion(Emotions(argument))
+            elif command == "prefetch":
+                display_manager.prefetch(Emotions(argument))
+            elif command == "overlay":
+                display_manager.update_overlay(*argument)
+            elif command == "metrics":
+                connection.send(display_manager.metrics)
+            elif command == "prepared":
+                emotion, timeout = argument
+                connection.send(display_manager.wait_prepared(Emotions(emotion) if emotion else None, timeout))
+            elif command == "stop":
+                stopped = True
+    finally:
+        display_manager.stop()
+
+    # The final metrics are the reply to the stop command
+    if stopped:
+        connection.send(display_manager.metrics)
+
+#######################################################################################################################
+
+class RenderProcess:
+    """Runs the render loop of the ``DisplayManager`` in a process of its own.
+
+    The render loop then has its own interpreter and GIL, so CPU bursts of the sensor threads,
+    the MQTT client or logging in the application process do not delay frames. Commands
+    (emotion, prefetch, overlay values) are sent over a pipe. The lag of the application
+    threads, which the frame rate governor of the render process watches, is published in a
+    small block of shared memory. Frames are read from the memory-mapped frame packs, so
+    uncompressed frames are shared with the page cache instead of being copied into the process.
+
+    The interface matches the ``DisplayManager`` as used by the application.
+    """
+
+    _LAG_INTERVAL = 1.0  # Seconds between updates of the lag values
+    _REPLY_TIMEOUT = 2.0
+    _STOP_TIMEOUT = 15.0
+
+    def __init__(
+        self,
+        app_logger: ApplicationLogger,
+        log_level=logging.DEBUG,
+        governor_settings=None,
+        lag_sources=None,
+        overlay=False,
+        mirror_settings=None,
+        backend="ili9341",
+        backend_path=None,
+        **display_settings,
+    ):
+        self._log = app_logger
+        # Spawned, not forked: the application process already runs threads (sensors, MQTT)
+        self._context = multiprocessing.get_context("spawn")
+        self._lag_sources = list(lag_sources or [])
+        self._lag_values = self._context.RawArray("d", max(1, len(self._lag_sources)))
+        self._settings = {
+            "log_level": log_level,
+            "governor": governor_settings,
+            "overlay": overlay,
+            "mirror": mirror_settings,
+            "backend": backend,
+            "backend_path": backend_path,
+            "display": display_settings,
+        }
+
+        self._current_emotion = display_settings.get("default_emotion", Emotions.HAPPY)
+        self._valid_emotions = list(Emotions)
+        self._connection = None
+        self._process = None
+        self._lock = threading.Lock()  # One request at a time over the pipe
+        self._stopped = threading.Event()
+        self._lag_thread = None
+        self._final_metrics = {}
+
+    def start(self):
+        self._connection, child_connection = self._context.Pipe()
+        self._process = self._context.Process(
+            target=_render_main, args=(child_connection, self._lag_values, self._settings), name="RenderProcess",
+        )
+        # Not daemonic, as daemonic processes may not start the worker processes of the image preprocessing.
+        # stop() joins it; it is also stopped at exit, before multiprocessing waits for its children.
+        self._process.start()
+        child_connection.close()
+        atexit.register(self.stop)
+        self._log.debug(f"Render process started (pid {self._process.pid})")
+
+        self._lag_thread = threading.Thread(target=self._publish_lag, daemon=True)
+        self._lag_thread.start()
+
+    def is_alive(self):
+        return self._process is not None and self._process.is_alive()
+
+    def set_emotion(self, emotion: Emotions):
+        if emotion not in self._valid_emotions:
+            valid = [e.value for e in self._valid_emotions]
+            raise ValueError(f"Invalid emotion: {emotion}. Valid emotions are: {valid}")
+        if emotion != self._current_emotion:
+            self._current_emotion = emotion
+            self._send("emotion", emotion.value)
+
+    @property
+    def current_emotion(self):
+        """Return the emotion currently being displayed."""
+        return self._current_emotion
+
+    def prefetch(self, emotion: Emotions):
+        """Load the frames of ``emotion`` in the render process, so a later switch to it does not stall."""
+        if emotion in self._valid_emotions:
+            self._send("prefetch", emotion.value)
+
+    def wait_prepared(self, emotion: Emotions = None, timeout=None):
+        """Wait until the pre-processed images of ``emotion`` (of all emotions if ``None``) are ready in the render process."""
+        reply_timeout = None if timeout is None else timeout + self._REPLY_TIMEOUT
+        return bool(self._request("prepared", reply_timeout, (emotion.value if emotion else None, timeout)))
+
+    def update_overlay(self, temperature=None, light_intensity=None, moisture=None):
+        """Show new values in the sensor overlay of the render process."""
+        self._send("overlay", (temperature, light_intensity, moisture))
+
+    @property
+    def metrics(self):
+        """Return the metrics of the render process (the last ones once it was stopped)."""
+        if not self.is_alive():
+            return self._final_metrics
+        return self._request("metrics") or self._final_metrics
+
+    def stop(self):
+        if self._process is None or self._stopped.is_set():
+            return
+        atexit.unregister(self.stop)
+        self._stopped.set()
+
+        if self._process.is_alive():
+            metrics = self._request("stop", self._STOP_TIMEOUT)
+            if metrics:
+                self._final_metrics = metrics
+        self._process.join(self._STOP_TIMEOUT)
+        if self._process.is_alive():
+            self._log.warning("Render process did not stop, terminating it...")
+            self._process.terminate()
+            self._process.join()
+
+        self._connection.close()
+        self._log.debug(f"Render process stopped (exit code {self._process.exitcode})")
+
+    def _publish_lag(self):
+        while not self._stopped.wait(self._LAG_INTERVAL):
+            for slot, lag_source in enumerate(self._lag_sources):
+                self._lag_values[slot] = lag_source()
+
+    def _send(self, command, argument=None):
+        with self._lock:
+            try:
+                self._connection.send((command, argument))
+            except (AttributeError, OSError):
+                self._log.error(f"Render process is not running, command {command} is dropped.")
+
+    def _request(self, command, timeout=_REPLY_TIMEOUT, argument=None):
+        with self._lock:
+            try:
+                # Replies to requests that timed out before are dropped
+                while self._connection.poll():
+                    self._connection.recv()
+                self._connection.send((command, argument))
+                if self._connection.poll(timeout):
+                    return self._connection.recv()
+            except (EOFError, OSError):
+                pass
+            self._log.error(f"Render process did not reply to {command}.")
+            return None
+
+#######################################################################################################################
@@ -9,68 +9,68 @@
 #######################################################################################################################
 
 # System Imports
-import threading
-import time
 import board
 import busio
 import adafruit_ads1x15.ads1115 as ADS
+from adafruit_ads1x15.ads1x15 import Mode
 from adafruit_ads1x15.analog_in import AnalogIn
 
+# Local Imports
+from .adcsampler import ADCSampler
+
 class SensorADS1x15:
-    def __init__(self, i2c_bus = busio.I2C(board.SCL, board.SDA), address=0x48, change_threshold=50, polling_rate=1, gain=1.0):
-        self.ads = ADS.ADS1115(i2c=i2c_bus, address=address, gain=gain)
+    def __init__(self, i2c_bus = busio.I2C(board.SCL, board.SDA), address=0x48, change_threshold=50, polling_rate=1, gain=1.0,
+                 data_rate=860, continuous=True, oversampling=8, reducer="median", active_channels=(0, 1, 2, 3)):
+        # In continuous mode the converter runs on its own, a read only fetches the last conversion instead of
+        # starting one and polling the bus until it is done
+        self.ads = ADS.ADS1115(i2c=i2c_bus, address=address, gain=gain, data_rate=data_rate,
+                               mode=Mode.CONTINUOUS if continuous else Mode.SINGLE)
         self.change_threshold = change_threshold
         self.polling_rate = polling_rate
 
-        # Set up initial readings
         self.channels = [AnalogIn(self.ads, ADS.P0),
                          AnalogIn(self.ads, ADS.P1),
                          AnalogIn(self.ads, ADS.P2),
                          AnalogIn(self.ads, ADS.P3)]
-        self.last_values = [channel.value for channel in self.channels]
+        # Every active channel is oversampled and reported as median or mean, the others are not read (None)
+        self.sampler = ADCSampler(lambda channel: self.channels[channel].value, channels=active_channels,
+                                  samples=oversampling, reducer=reducer, data_rate=data_rate, continuous=continuous)
+
+        # Set up initial readings
+        self.last_values = self.read()
 
         # Set up list for callback functions
         self.callbacks = []
 
-        # Event to control polling thread
-        self._stop_event = threading.Event()
-
-        self.polling_thread = threading.Thread(target=self._poll_sensor)
-        self.polling_thread.daemon = True
-        self.polling_thread.start()
-
     def register_callback(self, callback):
         self.callbacks.append(callback)
 
-        # Immediately call the new callback with the current sensor values
-        current_values = [channel.value for channel in self.channels]
-        for i, value in enumerate(current_values):
+        # Immediately call the new callback with the last sensor values
+        for i, value in enumerate(self.last_values):
             callback(i, value)  # Pass channel number and current value to callback
 
     def read(self):
         # Get current readings
-        current_values = [channel.value for channel in self.channels]
+        values = self.sampler.read()
+        current_values = [values.get(i) for i in range(len(self.channels))]
 
         return current_values
 
-    def stop(self):
-        self._stop_event.set()
-        if self.polling_thread.is_alive():
-            self.polling_thread.join()
-
-    def _poll_sensor(self):
-        while not self._stop_event.is_set():
-            # Get current readings
-            current_values = [channel.value for channel in self.channels]
+    @property
+    def latency_stats(self):
+        # Read latency per channel and per cycle
+        return self.sampler.stats
 
-            # If any reading has changed significantly, call all callback functions
-            for i in range(4):
-                if abs(current_values[i] - self.last_values[i]) > self.change_threshold:
-                    for callback in self.callbacks:
-                        callback(i, current_values[i])  # Pass channel number and new value to callback
+    def update(self, current_values):
+        # Called with the result of ``read`` every ``polling_rate`` seconds by the acquisition scheduler
 
-            # Save current readings for next comparison
-            self.last_values = current_values
+        # If any reading has changed significantly, call all callback functions
+        for i in range(4):
+            if current_values[i] is None:
+                continue
+            if self.last_values[i] is None or abs(current_values[i] - self.last_values[i]) > self.change_threshold:
+                for callback in self.callbacks:
+                    callback(i, current_values[i])  # Pass channel number and new value to callback
 
-            # Wait for the next poll
-            time.sleep(self.polling_rate)
+        # Save current readings for next comparison
+        self.last_values = current_values
@@ -9,8 +9,6 @@
 #######################################################################################################################
 
 # System Imports
-import threading
-import time
 import board
 import busio
 import adafruit_bh1750
@@ -27,13 +25,6 @@ class SensorBH1750:
         # Set up list for callback functions
         self.callbacks = []
 
-        # Event to control polling thread
-        self._stop_event = threading.Event()
-
-        self.polling_thread = threading.Thread(target=self._poll_sensor)
-        self.polling_thread.daemon = True
-        self.polling_thread.start()
-
     def register_callback(self, callback):
         self.callbacks.append(callback)
 
@@ -47,24 +38,14 @@ class SensorBH1750:
 
         return current_light_intensity
 
-    def stop(self):
-        self._stop_event.set()
-        if self.polling_thread.is_alive():
-            self.polling_thread.join()
-
-    def _poll_sensor(self):
-        while not self._stop_event.is_set():
-            # Get current reading
-            current_light_intensity = round(self.bh1750.lux, 2)
-
-            # If readings have changed significantly, call all callback functions
-            if abs(current_light_intensity - self.last_light_intensity) > self.change_threshold:
-                for callback in self.callbacks:
-                    callback(current_light_intensity)
+    def update(self, current_light_intensity):
+        # Called with the result of ``read`` every ``polling_rate`` seconds by the acquisition scheduler
 
-            # Save current reading for next comparison
-            self.last_light_intensity = current_light_intensity
+        # If readings have changed significantly, call all callback functions
+        if abs(current_light_intensity - self.last_light_intensity) > self.change_threshold:
+            for callback in self.callbacks:
+                callback(current_light_intensity)
 
-            # Wait for the next poll
-            time.sleep(self.polling_rate)
+        # Save current reading for next comparison
+        self.last_light_intensity = current_light_intensity
 
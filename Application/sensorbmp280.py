@@ -9,8 +9,6 @@
 #######################################################################################################################
 
 # System Imports
-import threading
-import time
 import board
 import busio
 import adafruit_bmp280
@@ -28,13 +26,6 @@ class SensorBMP280:
         # Set up list for callback functions
         self.callbacks = []
 
-        # Event to control polling thread
-        self._stop_event = threading.Event()
-
-        self.polling_thread = threading.Thread(target=self._poll_sensor)
-        self.polling_thread.daemon = True
-        self.polling_thread.start()
-
     def register_callback(self, callback):
         self.callbacks.append(callback)
 
@@ -50,26 +41,16 @@ class SensorBMP280:
 
         return current_temperature, current_pressure
 
-    def stop(self):
-        self._stop_event.set()
-        if self.polling_thread.is_alive():
-            self.polling_thread.join()
-
-    def _poll_sensor(self):
-        while not self._stop_event.is_set():
-            # Get current readings
-            current_temperature = round(self.bmp280.temperature, 2)
-            current_pressure = round(self.bmp280.pressure, 2)
-
-            # If readings have changed significantly, call all callback functions
-            if abs(current_temperature - self.last_temperature) > self.change_threshold or \
-               abs(current_pressure - self.last_pressure) > self.change_threshold:
-                for callback in self.callbacks:
-                    callback(current_temperature, current_pressure)
+    def update(self, readings):
+        # Called with the result of ``read`` every ``polling_rate`` seconds by the acquisition scheduler
+        current_temperature, current_pressure = readings
 
-            # Save current readings for next comparison
-            self.last_temperature = current_temperature
-            self.last_pressure = current_pressure
+        # If readings have changed significantly, call all callback functions
+        if abs(current_temperature - self.last_temperature) > self.change_threshold or \
+           abs(current_pressure - self.last_pressure) > self.change_threshold:
+            for callback in self.callbacks:
+                callback(current_temperature, current_pressure)
 
-            # Wait for the next poll
-            time.sleep(self.polling_rate)
+        # Save current readings for next comparison
+        self.last_temperature = current_temperature
+        self.last_pressure = current_pressure
@@ -0,0 +1,239 @@
+# SPDX-FileCopyrightText: 2023 Karl Bauer (BAUER GROUP)
+# SPDX-License-Identifier: MIT
+
+#######################################################################################################################
+#
+# Description :  Package for Toni der Topf
+# Author      :  Karl Bauer (karl.bauer@bauer-group.com) / www.bauer-group.com
+#
+#######################################################################################################################
+
+# System Imports
+import time
+import operator
+import threading
+from array import array
+
+#######################################################################################################################
+
+class RingBuffer:
+    """Fixed-capacity ring of timestamped rows, stored column-wise in arrays.
+
+    Timestamps are ``array('d')``, the value columns ``array('f')``. Appending overwrites the
+    oldest row in O(1). ``window`` returns the rows since a timestamp as array slices in time
+    order, so queries run over them with the C loops of ``min``, ``max`` and ``sum``.
+    """
+
+    def __init__(self, capacity, columns=("value",)):
+        if capacity <= 0:
+            raise ValueError(f"Invalid ring buffer capacity: {capacity}")
+        self.capacity = capacity
+        self.columns = tuple(columns)
+        self.times = array("d", bytes(8 * capacity))
+        self.values = {column: array("f", bytes(4 * capacity)) for column in self.columns}
+        self._head = 0  # Position of the next row
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    @property
+    def nbytes(self):
+        return self.times.itemsize * self.capacity + sum(values.itemsize * self.capacity for values in self.values.values())
+
+    @property
+    def oldest(self):
+        return self.times[self._position(0)] if self._count else None
+
+    def last(self):
+        """Return ``(timestamp, values)`` of the newest row, or ``None``."""
+        if not self._count:
+            return None
+        position = self._position(self._count - 1)
+        return self.times[position], tuple(self.values[column][position] for column in self.columns)
+
+    def append(self, timestamp, *values):
+        self.times[self._head] = timestamp
+        for column, value in zip(self.columns, values):
+            self.values[column][self._head] = value
+        self._head = (self._head + 1) % self.capacity
+        if self._count < self.capacity:
+            self._count += 1
+
+    def window(self, since):
+        """Return ``(times, {column: values})`` of the rows with a timestamp of at least ``since``."""
+        first = self._first_since(since)
+        start = self._position(first)
+        end = self._position(self._count)
+        if first == self._count:
+            return array("d"), {column: array("f") for column in self.columns}
+        if start < end:
+            return self.times[start:end], {column: values[start:end] for column, values in self.values.items()}
+        # The window wraps around the end of the arrays
+        return (self.times[start:] + self.times[:end],
+                {column: values[start:] + values[:end] for column, values in self.values.items()})
+
+    def _position(self, index):
+        # Array position of the ``index``-th oldest row
+        return (self._head - self._count + index) % self.capacity
+
+    def _first_since(self, since):
+        # Binary search over the rows in time order
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            if self.times[self._position(middle)] < since:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+#######################################################################################################################
+
+class ChannelHistory:
+    """History of one sensor channel: recent raw samples and downsampled tiers for longer periods.
+
+    Every tier keeps the mean, minimum and maximum of the samples in buckets of ``interval``
+    seconds. All tiers are fed from the raw samples, the bucket that is still filling is part of
+    the queries.
+    """
+
+    TIER_COLUMNS = ("mean", "min", "max")
+
+    def __init__(self, raw_capacity, tiers):
+        self.raw = RingBuffer(raw_capacity)
+        self.tiers = [(interval, RingBuffer(capacity, self.TIER_COLUMNS)) for interval, capacity in tiers]
+        self._pending = [None] * len(self.tiers)  # [bucket start, sum, count, min, max] per tier
+
+    @property
+    def nbytes(self):
+        return self.raw.nbytes + sum(buffer.nbytes for _, buffer in self.tiers)
+
+    def append(self, timestamp, value):
+        self.raw.append(timestamp, value)
+        for tier, (interval, buffer) in enumerate(self.tiers):
+            pending = self._pending[tier]
+            start = timestamp - timestamp % interval
+            if pending is not None and pending[0] != start:
+                buffer.append(pending[0], pending[1] / pending[2], pending[3], pending[4])
+                pending = None
+            if pending is None:
+                self._pending[tier] = [start, value, 1, value, value]
+            else:
+                pending[1] += value
+                pending[2] += 1
+                pending[3] = min(pending[3], value)
+                pending[4] = max(pending[4], value)
+
+    def query(self, seconds, now):
+        """Return ``count``, ``min``, ``max``, ``mean`` and ``slope`` (per second) of the last ``seconds``, or ``None``."""
+        since = now - seconds
+        oldest = self.raw.oldest
+        if oldest is not None and (oldest <= since or not self.tiers or len(self.raw) < self.raw.capacity):
+            times, values = self.raw.window(since)
+            values = values["value"]
+            return self._summary(times, values, values, values, len(times))
+
+        # The raw samples do not reach back far enough, use the finest tier that does
+        for tier, (interval, buffer) in enumerate(self.tiers):
+            if len(buffer) < buffer.capacity or buffer.oldest <= since or tier == len(self.tiers) - 1:
+                break
+        times, values = buffer.window(since - interval)
+        times = array("d", (start + interval / 2 for start in times))
+        means, minimums, maximums = values["mean"], values["min"], values["max"]
+        pending = self._pending[tier]
+        if pending is not None:
+            times.append(pending[0] + interval / 2)
+            means.append(pending[1] / pending[2])
+            minimums.append(pending[3])
+            maximums.append(pending[4])
+        return self._summary(times, means, minimums, maximums, len(times))
+
+    @staticmethod
+    def _summary(times, means, minimums, maximums, count):
+        if not count:
+            return None
+        total = sum(means)
+        return {
+            "count": count,
+            "min": min(minimums),
+            "max": max(maximums),
+            "mean": total / count,
+            "slope": ChannelHistory._slope(times, means, total),
+        }
+
+    @staticmethod
+    def _slope(times, values, value_sum):
+        # Least squares fit of value over time
+        count = len(times)
+        if count < 2:
+            return 0.0
+        time_sum = sum(times)
+        time_square_sum = sum(map(operator.mul, times, times))
+        cross_sum = sum(map(operator.mul, times, values))
+        denominator = count * time_square_sum - time_sum * time_sum
+        if denominator <= 0:
+            return 0.0
+        return (count * cross_sum - time_sum * value_sum) / denominator
+
+#######################################################################################################################
+
+class SensorHistory:
+    """Fixed-size history of every sensor channel, for trends without keeping own copies of the values.
+
+    The defaults keep 15 minutes of raw samples at one read per second, two hours in 10 second
+    buckets and a day in 1 minute buckets: about 55 KB per channel.
+    """
+
+    RAW_CAPACITY = 900
+    TIERS = ((10, 720), (60, 1440))  # (bucket seconds, capacity)
+
+    def __init__(self, raw_capacity=RAW_CAPACITY, tiers=TIERS, clock=time.monotonic):
+        self.raw_capacity = raw_capacity
+        self.tiers = tuple(tiers)
+        self._clock = clock
+        self._origin = clock()  # Timestamps are stored relative to it, which keeps the sums of the slope fit small
+        self._channels = {}
+        self._lock = threading.Lock()
+
+    @property
+    def channels(self):
+        return list(self._channels)
+
+    @property
+    def nbytes(self):
+        return sum(channel.nbytes for channel in self._channels.values())
+
+    def append(self, channel, value, timestamp=None):
+        """Add a sample of ``channel``; ``None`` values (sensor not read yet) are ignored."""
+        if value is None:
+            return
+        timestamp = (self._clock() if timestamp is None else timestamp) - self._origin
+        with self._lock:
+            history = self._channels.get(channel)
+            if history is None:
+                history = self._channels[channel] = ChannelHistory(self.raw_capacity, self.tiers)
+            history.append(timestamp, value)
+
+    def query(self, channel, seconds):
+        """Return ``count``, ``min``, ``max``, ``mean`` and ``slope`` (per second) of the last ``seconds`` of ``channel``.
+
+        Windows longer than the raw samples are answered from the finest tier that covers them,
+        ``count`` is then the number of buckets. Returns ``None`` if there is no sample in the window.
+        """
+        now = self._clock() - self._origin
+        with self._lock:
+            history = self._channels.get(channel)
+            return history.query(seconds, now) if history is not None else None
+
+    def latest(self, channel):
+        """Return ``(age in seconds, value)`` of the newest sample of ``channel``, or ``None``."""
+        with self._lock:
+            history = self._channels.get(channel)
+            last = history.raw.last() if history is not None else None
+        if last is None:
+            return None
+        timestamp, (value,) = last
+        return self._clock() - self._origin - timestamp, value
+
+#######################################################################################################################
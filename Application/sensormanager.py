@@ -9,41 +9,88 @@
 #######################################################################################################################
 
 # System Imports
+import time
+import threading
 import board
 import busio
 
 # Local Imports
+from .acquisitionscheduler import AcquisitionScheduler
+from .sensorhistory import SensorHistory
 from .sensorads1x15 import SensorADS1x15
 from .sensorbh1750 import SensorBH1750
 from .sensorbmp280 import SensorBMP280
 
 class SensorManager:
-    def __init__(self, i2c_bus=None, bmp280_address=0x76, bh1750_address=0x23, ads1x15_address=0x48):
+    def __init__(self, i2c_bus=None, bmp280_address=0x76, bh1750_address=0x23, ads1x15_address=0x48, ads1x15_settings=None,
+                 filters=None):
         # Create a single I2C bus instance
         if i2c_bus is None:
             i2c_bus = busio.I2C(board.SCL, board.SDA)
         self._i2c_bus = i2c_bus
+        self.bus_lock = threading.Lock()  # Held for every access to the I2C bus
 
         # Initialize list for manager-specific callbacks
         self.callbacks = []
+        self.reading_callbacks = []  # Called with every reading: channel, value, wall clock time
+        self.notifications = 0
+
+        # Filters per channel (e.g. ``signalfilter.create_filter``) between the readings and the change callbacks
+        self.filters = dict(filters or {})
 
         # Initialize sensor data storage
         self.bmp280_data = (None, None)  # Temperature, pressure
         self.bh1750_data = None  # Light intensity
         self.ads1x15_data = [None] * 4  # Channel readings
 
+        # Every reading, not only the significant changes, for trends over the last day
+        self.history = SensorHistory()
+
         # Create sensor objects
         self._sensor_bmp280 = SensorBMP280(i2c_bus=self._i2c_bus, address=bmp280_address)
         self._sensor_bh1750 = SensorBH1750(i2c_bus=self._i2c_bus, address=bh1750_address)
-        self._sensor_ads1x15 = SensorADS1x15(i2c_bus=self._i2c_bus, address=ads1x15_address)
+        self._sensor_ads1x15 = SensorADS1x15(i2c_bus=self._i2c_bus, address=ads1x15_address, **(ads1x15_settings or {}))
 
         # Register this SensorManager as a callback
         self._sensor_bmp280.register_callback(self._bmp280_callback)
         self._sensor_bh1750.register_callback(self._bh1750_callback)
         self._sensor_ads1x15.register_callback(self._ads1x15_callback)
 
+        # One thread reads all sensors, reads that fall due together share one bus access
+        self.acquisition = AcquisitionScheduler(bus_lock=self.bus_lock)
+        self.acquisition.add("bmp280", self._sensor_bmp280.polling_rate, self._sensor_bmp280.read, self._bmp280_read)
+        self.acquisition.add("bh1750", self._sensor_bh1750.polling_rate, self._sensor_bh1750.read, self._bh1750_read)
+        self.acquisition.add("ads1x15", self._sensor_ads1x15.polling_rate, self._sensor_ads1x15.read, self._ads1x15_read)
+        self.acquisition.start()
+
+    # Handlers of the acquisition scheduler: record every reading, then let the sensor check the filtered values for changes
+    def _bmp280_read(self, readings):
+        self._sensor_bmp280.update(tuple(self._record((("temperature", readings[0]), ("pressure", readings[1])))))
+
+    def _bh1750_read(self, light_intensity):
+        self._sensor_bh1750.update(*self._record((("light_intensity", light_intensity),)))
+
+    def _ads1x15_read(self, values):
+        self._sensor_ads1x15.update(self._record((f"ads1x15_{channel}", value) for channel, value in enumerate(values)))
+
+    def _record(self, readings):
+        # The history and the reading callbacks get the raw values, the filtered values are returned
+        timestamp, wall_time = time.monotonic(), time.time()
+        filtered = []
+        for channel, value in readings:
+            self.history.append(channel, value, timestamp)
+            for callback in self.reading_callbacks:
+                callback(channel, value, wall_time)
+
+            channel_filter = self.filters.get(channel)
+            if channel_filter is not None and value is not None:
+                value = round(channel_filter.update(value), 2)
+            filtered.append(value)
+        return filtered
+
     # Callbacks to handle sensor data updates
     def notify_callbacks(self):
+        self.notifications += 1
         for callback in self.callbacks:
             callback(self)
 
@@ -78,6 +125,25 @@ class SensorManager:
     def ads1x15_channel_values(self):
         return self.ads1x15_data
 
+    def trend(self, channel, seconds):
+        # Minimum, maximum, mean and slope (per second) of a channel of ``history`` over the last ``seconds``
+        return self.history.query(channel, seconds)
+
+    @property
+    def polling_lag(self):
+        # Seconds the most overdue sensor read is behind its schedule
+        return self.acquisition.lag
+
+    @property
+    def acquisition_stats(self):
+        # Reads, errors, drift and missed deadlines per sensor
+        return self.acquisition.stats
+
+    @property
+    def adc_stats(self):
+        # Oversampling settings and read latency per channel and cycle of the ADS1115
+        return self._sensor_ads1x15.latency_stats
+
     def register_callback(self, callback):
         # Register a callback to receive updates from this SensorManager.
         # The callback should be a function that takes a single argument: the SensorManager instance.
@@ -86,7 +152,10 @@ class SensorManager:
         # Immediately call the new callback with the current sensor values
         callback(self)
 
+    def register_reading_callback(self, callback):
+        # Register a callback for every single reading (not only significant changes), e.g. to store them.
+        # The callback takes the channel name, the value and the wall clock time of the reading.
+        self.reading_callbacks.append(callback)
+
     def stop(self):
-        self._sensor_bmp280.stop()
-        self._sensor_bh1750.stop()
-        self._sensor_ads1x15.stop()
+        self.acquisition.stop()
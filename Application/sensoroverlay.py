@@ -0,0 +1,193 @@
+# SPDX-FileCopyrightText: 2023 Karl Bauer (BAUER GROUP)
+# SPDX-License-Identifier: MIT
+
+#######################################################################################################################
+#
+# Description :  Package for Toni der Topf
+# Author      :  Karl Bauer (karl.bauer@bauer-group.com) / www.bauer-group.com
+#
+#######################################################################################################################
+
+# System Imports
+import threading
+from PIL import Image, ImageDraw, ImageFont
+
+# Local Imports
+from .imageprocessing import crop_buffer, image_to_rgb565, rgb565_to_image, to_display_orientation
+
+#######################################################################################################################
+
+class GlyphCache:
+    """Renders every character once and composes text from the cached glyph masks."""
+
+    DEFAULT_FONT = "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf"  # fonts-dejavu, see ApplicationSetup.sh
+
+    def __init__(self, font_path=DEFAULT_FONT, size=18):
+        try:
+            self._font = ImageFont.truetype(font_path, size)
+            ascent, descent = self._font.getmetrics()
+            self.height = ascent + descent
+        except OSError:
+            self._font = ImageFont.load_default()
+            self.height = self._font.getbbox("Ag")[3]
+
+        self._glyphs = {}
+        self.rendered_glyphs = 0
+
+    def glyph(self, char):
+        """Return the mask (``L`` image) and the advance width of ``char``."""
+        glyph = self._glyphs.get(char)
+        if glyph is None:
+            advance = round(self._font.getlength(char))
+            width = max(1, advance, self._font.getbbox(char)[2])
+            mask = Image.new("L", (width, self.height))
+            ImageDraw.Draw(mask).text((0, 0), char, fill=255, font=self._font)
+            glyph = self._glyphs[char] = (mask, advance)
+            self.rendered_glyphs += 1
+        return glyph
+
+    def render(self, text):
+        """Return the mask of ``text``, composed from the cached glyphs."""
+        glyphs = [self.glyph(char) for char in text]
+        width = sum(advance for _, advance in glyphs)
+        if glyphs:
+            width = max(width, width - glyphs[-1][1] + glyphs[-1][0].width)
+
+        mask = Image.new("L", (max(1, width), self.height))
+        x = 0
+        for glyph_mask, advance in glyphs:
+            mask.paste(glyph_mask, (x, 0), glyph_mask)
+            x += advance
+        return mask
+
+#######################################################################################################################
+
+class SensorOverlay:
+    """Readout of temperature, light and soil moisture in a fixed strip of the display.
+
+    The text is only rendered again when a shown value changes. During playback the windows of
+    a frame are clipped around the strip, and the strip is composited onto the frame below it
+    (dimmed, then blended with the text mask) only when the frame or the text changed there.
+    """
+
+    def __init__(
+        self,
+        box=(0, 212, 320, 240),
+        display_size=(320, 240),
+        rotation=90,
+        glyph_cache: GlyphCache = None,
+        color=(255, 255, 255),
+        dim=0.5,
+    ):
+        self.box = box
+        self.rotation = rotation
+        self._glyph_cache = glyph_cache if glyph_cache is not None else GlyphCache()
+        self._size = (box[2] - box[0], box[3] - box[1])
+
+        # Position of the strip in the native orientation of the display
+        area = Image.new("L", display_size)
+        area.paste(255, box)
+        self.native_box = to_display_orientation(area, rotation, "L").getbbox()
+        native_size = (self.native_box[2] - self.native_box[0], self.native_box[3] - self.native_box[1])
+
+        self._color_layer = Image.new("RGB", native_size, color)
+        self._dim_lut = [int(value * dim) for value in range(256)] * 3
+
+        self._lock = threading.Lock()
+        self._text = None
+        self._mask = None
+        self.version = 0
+        self._drawn_version = None
+
+    @staticmethod
+    def format_values(temperature=None, light_intensity=None, moisture=None):
+        return "   ".join([
+            f"{temperature:.1f} °C" if temperature is not None else "- °C",
+            f"{light_intensity:.0f} lx" if light_intensity is not None else "- lx",
+            f"{moisture:.0f} %" if moisture is not None else "- %",
+        ])
+
+    def update(self, temperature=None, light_intensity=None, moisture=None):
+        """Show new values. Returns ``True`` if the text changed and the overlay was rendered again."""
+        text = self.format_values(temperature, light_intensity, moisture)
+        if text == self._text:
+            return False
+
+        text_mask = self._glyph_cache.render(text)
+        strip = Image.new("L", self._size)
+        strip.paste(text_mask, ((self._size[0] - text_mask.width) // 2, (self._size[1] - text_mask.height) // 2))
+        mask = to_display_orientation(strip, self.rotation, "L")
+
+        with self._lock:
+            self._text = text
+            self._mask = mask
+            self.version += 1
+        return True
+
+    @property
+    def text(self):
+        return self._text
+
+    def apply(self, windows, crop):
+        """Return ``windows`` with the overlay added.
+
+        ``windows`` are the ``(box, buffer)`` pairs of the next frame and ``crop(box)`` returns the
+        RGB565 pixels of that frame in ``box``. Windows are clipped around the overlay, and the
+        overlay is written when the frame below it or the text changed.
+        """
+        with self._lock:
+            mask, version = self._mask, self.version
+        if mask is None:
+            return windows
+
+        result = []
+        touched = False
+        for box, buffer in windows:
+            if not _intersects(box, self.native_box):
+                result.append((box, buffer))
+                continue
+
+            touched = True
+            left, upper, right, _ = box
+            for piece in _subtract(box, self.native_box):
+                local = (piece[0] - left, piece[1] - upper, piece[2] - left, piece[3] - upper)
+                result.append((piece, crop_buffer(buffer, right - left, local, 2)))
+
+        if touched or version != self._drawn_version:
+            result.append((self.native_box, self.composite(crop(self.native_box), mask)))
+            self._drawn_version = version
+        return result
+
+    def composite(self, background, mask=None):
+        """Blend the text onto the RGB565 ``background`` of the overlay box and return it as RGB565."""
+        mask = mask if mask is not None else self._mask
+        image = rgb565_to_image(background, self._color_layer.size).point(self._dim_lut)
+        return image_to_rgb565(Image.composite(self._color_layer, image, mask))
+
+    def invalidate(self):
+        """Write the overlay with the next frame (e.g. after the display was overwritten)."""
+        self._drawn_version = None
+
+#######################################################################################################################
+
+def _intersects(box, other):
+    return box[0] < other[2] and other[0] < box[2] and box[1] < other[3] and other[1] < box[3]
+
+
+def _subtract(box, other):
+    # Parts of ``box`` outside ``other``: up to four boxes above, below, left and right of it
+    left, upper, right, lower = box
+    o_left, o_upper, o_right, o_lower = other
+    pieces = []
+    if upper < o_upper:
+        pieces.append((left, upper, right, o_upper))
+    if o_lower < lower:
+        pieces.append((left, o_lower, right, lower))
+    middle_upper, middle_lower = max(upper, o_upper), min(lower, o_lower)
+    if left < o_left:
+        pieces.append((left, middle_upper, o_left, middle_lower))
+    if o_right < right:
+        pieces.append((o_right, middle_upper, right, middle_lower))
+    return pieces
+
+#######################################################################################################################
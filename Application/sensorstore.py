@@ -0,0 +1,483 @@
+# SPDX-FileCopyrightText: 2023 Karl Bauer (BAUER GROUP)
+# SPDX-License-Identifier: MIT
+
+#######################################################################################################################
+#
+# Description :  Package for Toni der Topf
+# Author      :  Karl Bauer (karl.bauer@bauer-group.com) / www.bauer-group.com
+#
+#######################################################################################################################
+
+# System Imports
+import os
+import mmap
+import time
+import bisect
+import struct
+import threading
+import zlib
+from array import array
+
+# Local Imports
+from .applogger import ApplicationLogger
+
+#######################################################################################################################
+
+def _write_varint(output, value):
+    # Unsigned LEB128
+    while value > 0x7F:
+        output.append(value & 0x7F | 0x80)
+        value >>= 7
+    output.append(value)
+
+def _read_varint(data, offset):
+    value = shift = 0
+    while True:
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, offset
+        shift += 7
+
+def encode_samples(times_ms, bits):
+    """Encode the samples after the first one: zigzag varint delta-of-delta timestamps, XOR values.
+
+    ``bits`` are the float32 bit patterns of the values. A value equal to the one before is a
+    single zero byte, otherwise a byte with the length and the trailing zero bytes of the XOR
+    against the previous value is followed by its significant bytes.
+    """
+    output = bytearray()
+    previous_time, previous_delta, previous_bits = times_ms[0], 0, bits[0]
+    for timestamp, value in zip(times_ms[1:], bits[1:]):
+        delta = timestamp - previous_time
+        delta_of_delta = delta - previous_delta
+        _write_varint(output, delta_of_delta << 1 if delta_of_delta >= 0 else (-delta_of_delta << 1) - 1)
+        previous_time, previous_delta = timestamp, delta
+
+        xor = value ^ previous_bits
+        previous_bits = value
+        if not xor:
+            output.append(0)
+            continue
+        trailing = ((xor & -xor).bit_length() - 1) // 8
+        xor >>= 8 * trailing
+        length = (xor.bit_length() + 7) // 8
+        output.append(length << 2 | trailing)
+        output += xor.to_bytes(length, "little")
+    return output
+
+def decode_samples(data, count, first_time_ms, first_bits):
+    """Decode ``count`` samples written by ``encode_samples``; returns timestamps (ms) and float32 bit patterns."""
+    times_ms = array("q", [first_time_ms])
+    bits = array("I", [first_bits])
+    offset = 0
+    timestamp, delta, value = first_time_ms, 0, first_bits
+    for _ in range(count - 1):
+        zigzag, offset = _read_varint(data, offset)
+        delta += zigzag >> 1 if not zigzag & 1 else -((zigzag + 1) >> 1)
+        timestamp += delta
+        times_ms.append(timestamp)
+
+        header = data[offset]
+        offset += 1
+        if header:
+            length, trailing = header >> 2, header & 3
+            value ^= int.from_bytes(data[offset:offset + length], "little") << (8 * trailing)
+            offset += length
+        bits.append(value)
+    return times_ms, bits
+
+#######################################################################################################################
+
+class SensorStore:
+    """Persistent, append-only time series of all sensor channels.
+
+    Samples are collected in memory and written in batches every ``flush_interval`` seconds (or
+    when ``max_pending`` samples of a channel are waiting), to keep the number of writes to the
+    SD card low. Raw samples go into one segment file per ``segment_seconds``::
+
+        header  magic, version
+        blocks  per channel and batch: channel name, sample count, payload size, first and last
+                timestamp (ms), first value (float32), CRC32 of the payload, followed by the
+                delta-of-delta timestamps and XOR values (``encode_samples``)
+
+    A block that was not written completely (power loss) fails its CRC check and is cut off
+    before the next write. Segments are read through ``mmap``, blocks outside a queried range
+    are skipped by their header.
+
+    Segments older than ``raw_retention`` are rolled up into hourly aggregates (count, mean,
+    minimum, maximum) by the background compaction and then deleted. The aggregates are kept in
+    one file of fixed size records per channel, for ``aggregate_retention`` seconds.
+    """
+
+    SEGMENT_EXTENSION = ".seg"
+    AGGREGATE_EXTENSION = ".agg"
+    HOUR = 3600
+
+    _MAGIC = b"TEOSEG\0\0"
+    _VERSION = 1
+    _HEADER = struct.Struct("<8sH")
+    _BLOCK = struct.Struct("<16sHIqqII")  # channel, count, payload size, first ms, last ms, first bits, CRC32
+    _AGGREGATE = struct.Struct("<qIfff")  # hour start (s), count, mean, min, max
+
+    def __init__(
+        self,
+        app_logger: ApplicationLogger,
+        path,
+        flush_interval=300.0,
+        max_pending=4096,
+        segment_seconds=86400,
+        raw_retention=7 * 86400,
+        aggregate_retention=365 * 86400,
+        compaction_interval=3600.0,
+        clock=time.time,
+    ):
+        if segment_seconds % self.HOUR:
+            raise ValueError(f"Segment length must be a multiple of an hour: {segment_seconds}")
+
+        self._log = app_logger
+        self.path = path
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.segment_seconds = segment_seconds
+        self.raw_retention = raw_retention
+        self.aggregate_retention = aggregate_retention
+        self.compaction_interval = compaction_interval
+        self._clock = clock
+
+        self._raw_folder = os.path.join(path, "raw")
+        self._hourly_folder = os.path.join(path, "hourly")
+        os.makedirs(self._raw_folder, exist_ok=True)
+        os.makedirs(self._hourly_folder, exist_ok=True)
+
+        self._pending = {}  # channel -> (timestamps in ms, values)
+        self._lock = threading.Lock()  # Pending samples
+        self._io_lock = threading.Lock()  # Segment and aggregate files
+        self._checked_segments = set()  # Segments whose tail was validated before appending
+        self._wake = threading.Event()
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._next_compaction = 0.0
+
+        self.samples = 0
+        self.blocks = 0
+        self.flushes = 0
+        self.bytes_written = 0
+        self.compactions = 0
+
+    @property
+    def stats(self):
+        return {
+            "samples": self.samples,
+            "flushes": self.flushes,
+            "blocks": self.blocks,
+            "bytes_written": self.bytes_written,
+            "bytes_per_sample": round(self.bytes_written / self.samples, 2) if self.samples else 0.0,
+            "compactions": self.compactions,
+            "segments": len(self._segments()),
+        }
+
+    def start(self):
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        self._wake.set()
+        if self._thread is not None and self._thread.is_alive():
+            self._thread.join()
+        self.flush()
+
+    def append(self, channel, value, timestamp=None):
+        """Queue a sample of ``channel``; ``timestamp`` is wall clock time in seconds. ``None`` values are ignored."""
+        if value is None:
+            return
+        timestamp_ms = round((self._clock() if timestamp is None else timestamp) * 1000)
+        with self._lock:
+            pending = self._pending.get(channel)
+            if pending is None:
+                if len(channel.encode()) > 16:
+                    raise ValueError(f"Channel name too long: {channel}")
+                pending = self._pending[channel] = (array("q"), array("f"))
+            pending[0].append(timestamp_ms)
+            pending[1].append(value)
+            if len(pending[0]) >= self.max_pending:
+                self._wake.set()
+
+    def flush(self):
+        """Write the queued samples as one block per channel and segment."""
+        with self._io_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+            if not pending:
+                return
+
+            blocks = {}  # segment start -> encoded blocks
+            for channel, (times_ms, values) in pending.items():
+                bits = array("I", values.tobytes())
+                start = 0
+                while start < len(times_ms):
+                    # A block stays within one segment and below the 16 bit sample count
+                    segment = times_ms[start] // 1000 // self.segment_seconds * self.segment_seconds
+                    segment_end_ms = (segment + self.segment_seconds) * 1000
+                    end = start + 1
+                    while end < len(times_ms) and end - start < 0xFFFF and segment * 1000 <= times_ms[end] < segment_end_ms:
+                        end += 1
+                    blocks.setdefault(segment, []).append(self._encode_block(channel, times_ms[start:end], bits[start:end]))
+                    self.samples += end - start
+                    start = end
+
+            for segment, encoded in blocks.items():
+                data = b"".join(encoded)
+                with open(self._open_segment(segment), "ab") as f:
+                    f.write(data)
+                    f.flush()
+                    os.fsync(f.fileno())
+                self.blocks += len(encoded)
+                self.bytes_written += len(data)
+            self.flushes += 1
+
+    def query(self, channel, start, end=None):
+        """Return ``(timestamps, values)`` of the raw samples of ``channel`` with ``start <= timestamp < end``.
+
+        Timestamps are seconds (``array('d')``), values ``array('f')``, in the order they were written.
+        """
+        end = self._clock() + 1 if end is None else end
+        start_ms, end_ms = start * 1000, end * 1000
+        times = array("d")
+        values = array("f")
+        with self._io_lock:
+            for segment in self._segments():
+                if segment + self.segment_seconds <= start or segment >= end:
+                    continue
+                for times_ms, bits in self._read_segment(self._segment_path(segment), channel, start_ms, end_ms):
+                    self._extend(times, values, times_ms, bits, start_ms, end_ms)
+            with self._lock:
+                pending = self._pending.get(channel)
+                if pending is not None:
+                    self._extend(times, values, pending[0], array("I", pending[1].tobytes()), start_ms, end_ms)
+        return times, values
+
+    def hourly(self, channel, start, end=None):
+        """Return ``(hour start, count, mean, min, max)`` of every hour of ``channel`` in the range.
+
+        Compacted hours come from the aggregate file, newer hours are rolled up from the raw samples.
+        """
+        end = self._clock() + 1 if end is None else end
+        aggregates = [record for record in self._read_aggregates(channel) if start <= record[0] < end]
+        last_hour = aggregates[-1][0] if aggregates else start - self.HOUR
+        times, values = self.query(channel, max(start, last_hour + self.HOUR), end)
+        return aggregates + self._roll_up(times, values)
+
+    def compact(self, now=None):
+        """Roll segments older than the raw retention up into hourly aggregates and apply the aggregate retention.
+
+        The segments are decoded one block at a time without holding the file lock, so flushes and
+        queries are not blocked while a large segment is rolled up.
+        """
+        now = self._clock() if now is None else now
+        for segment in self._segments():
+            if segment + self.segment_seconds > now - self.raw_retention:
+                break
+            path = self._segment_path(segment)
+            hours = {}  # channel -> hour start -> [count, sum, min, max]
+            end = self._accumulate_segment(path, 0, hours)
+            with self._io_lock:
+                # Blocks a flush appended in the meantime (samples with an old timestamp) are rolled up as well
+                if os.path.getsize(path) != end:
+                    self._accumulate_segment(path, end, hours)
+                for channel, channel_hours in hours.items():
+                    self._append_aggregates(channel, self._aggregates(channel_hours))
+                os.remove(path)
+                self._checked_segments.discard(segment)
+            self._log.debug(f"Sensor store: segment {segment} rolled up into hourly aggregates")
+
+        with self._io_lock:
+            for file_name in os.listdir(self._hourly_folder):
+                if file_name.endswith(self.AGGREGATE_EXTENSION):
+                    self._expire_aggregates(os.path.join(self._hourly_folder, file_name), now - self.aggregate_retention)
+        self.compactions += 1
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+                now = self._clock()
+                if now >= self._next_compaction:
+                    self._next_compaction = now + self.compaction_interval
+                    self.compact(now)
+            except OSError as e:
+                self._log.error(f"Sensor store could not write to {self.path}: {e}")
+
+    def _encode_block(self, channel, times_ms, bits):
+        payload = encode_samples(times_ms, bits)
+        return self._BLOCK.pack(channel.encode(), len(times_ms), len(payload), times_ms[0], times_ms[-1], bits[0],
+                                zlib.crc32(payload)) + payload
+
+    def _segments(self):
+        return sorted(int(file_name[:-len(self.SEGMENT_EXTENSION)]) for file_name in os.listdir(self._raw_folder)
+                      if file_name.endswith(self.SEGMENT_EXTENSION))
+
+    def _segment_path(self, segment):
+        return os.path.join(self._raw_folder, f"{segment}{self.SEGMENT_EXTENSION}")
+
+    def _open_segment(self, segment):
+        # New segments get a header, existing ones lose a block that was not written completely
+        path = self._segment_path(segment)
+        if segment not in self._checked_segments:
+            valid_size = self._valid_size(path) if os.path.exists(path) else None
+            if not valid_size:
+                with open(path, "wb") as f:
+                    f.write(self._HEADER.pack(self._MAGIC, self._VERSION))
+            elif valid_size != os.path.getsize(path):
+                self._log.warning(f"Sensor store: cutting off an incomplete block of {path}")
+                with open(path, "r+b") as f:
+                    f.truncate(valid_size)
+            self._checked_segments.add(segment)
+        return path
+
+    def _valid_size(self, path):
+        # Size up to the end of the last complete block, 0 if the file is not a segment
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size < self._HEADER.size:
+                return 0
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                if self._HEADER.unpack_from(data, 0) != (self._MAGIC, self._VERSION):
+                    return 0
+                offset = self._HEADER.size
+                for _, _, offset in self._walk(data):
+                    pass
+                return offset
+
+    def _walk(self, data):
+        # Yields (header, payload offset, end offset) of every block with a valid CRC
+        magic, version = self._HEADER.unpack_from(data, 0)
+        if magic != self._MAGIC or version != self._VERSION:
+            return
+        offset = self._HEADER.size
+        while offset + self._BLOCK.size <= len(data):
+            header = self._BLOCK.unpack_from(data, offset)
+            payload_offset = offset + self._BLOCK.size
+            end = payload_offset + header[2]
+            if end > len(data) or zlib.crc32(data[payload_offset:end]) != header[6]:
+                return
+            yield header, payload_offset, end
+            offset = end
+
+    def _read_segment(self, path, channel, start_ms, end_ms):
+        # Decoded blocks of ``channel`` that overlap the range
+        name = channel.encode().ljust(16, b"\0")
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size < self._HEADER.size:
+                return []
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                return [decode_samples(data[payload_offset:end], count, first_ms, first_bits)
+                        for (block_channel, count, _, first_ms, last_ms, first_bits, _), payload_offset, end
+                        in self._walk(data)
+                        if block_channel == name and last_ms >= start_ms and first_ms < end_ms]
+
+    def _accumulate_segment(self, path, offset, hours):
+        # Adds the complete blocks from ``offset`` on to the hourly accumulators, decoding one block at a time.
+        # Returns the offset after the last complete block.
+        with open(path, "rb") as f:
+            if not offset:
+                header = f.read(self._HEADER.size)
+                if len(header) < self._HEADER.size or self._HEADER.unpack(header) != (self._MAGIC, self._VERSION):
+                    return 0
+                offset = self._HEADER.size
+            f.seek(offset)
+            while True:
+                header = f.read(self._BLOCK.size)
+                if len(header) < self._BLOCK.size:
+                    return offset
+                channel, count, payload_size, first_ms, _, first_bits, crc = self._BLOCK.unpack(header)
+                payload = f.read(payload_size)
+                if len(payload) < payload_size or zlib.crc32(payload) != crc:
+                    return offset
+                times_ms, bits = decode_samples(payload, count, first_ms, first_bits)
+                self._accumulate(hours.setdefault(channel.rstrip(b"\0").decode(), {}),
+                                 (timestamp / 1000 for timestamp in times_ms), array("f", bits.tobytes()))
+                offset += self._BLOCK.size + payload_size
+
+    @staticmethod
+    def _extend(times, values, times_ms, bits, start_ms, end_ms):
+        if start_ms <= min(times_ms) and max(times_ms) < end_ms:
+            selected_times, selected_bits = times_ms, bits
+        else:
+            # Only blocks at the ends of the range are split. Their timestamps are not necessarily sorted,
+            # the clock can jump back when it is set after a boot without network
+            selected = [i for i, timestamp in enumerate(times_ms) if start_ms <= timestamp < end_ms]
+            selected_times = [times_ms[i] for i in selected]
+            selected_bits = array("I", [bits[i] for i in selected])
+        times.extend(timestamp / 1000 for timestamp in selected_times)
+        values.frombytes(array("I", selected_bits).tobytes())
+
+    def _roll_up(self, times, values):
+        hours = {}
+        self._accumulate(hours, times, values)
+        return self._aggregates(hours)
+
+    def _accumulate(self, hours, times, values):
+        for timestamp, value in zip(times, values):
+            hour = int(timestamp // self.HOUR * self.HOUR)
+            aggregate = hours.get(hour)
+            if aggregate is None:
+                hours[hour] = [1, value, value, value]
+            else:
+                aggregate[0] += 1
+                aggregate[1] += value
+                aggregate[2] = min(aggregate[2], value)
+                aggregate[3] = max(aggregate[3], value)
+
+    @staticmethod
+    def _aggregates(hours):
+        return [(hour, count, total / count, minimum, maximum)
+                for hour, (count, total, minimum, maximum) in sorted(hours.items())]
+
+    def _aggregate_path(self, channel):
+        return os.path.join(self._hourly_folder, f"{channel}{self.AGGREGATE_EXTENSION}")
+
+    def _read_aggregates(self, channel):
+        path = self._aggregate_path(channel)
+        if not os.path.exists(path):
+            return []
+        with open(path, "rb") as f:
+            data = f.read()
+        # A record that was not written completely is ignored
+        data = data[:len(data) - len(data) % self._AGGREGATE.size]
+        return list(self._AGGREGATE.iter_unpack(data))
+
+    def _append_aggregates(self, channel, aggregates):
+        # Hours that were already rolled up (compaction interrupted before the segment was deleted) are skipped
+        existing = self._read_aggregates(channel)
+        last_hour = existing[-1][0] if existing else None
+        records = [self._AGGREGATE.pack(*record) for record in aggregates if last_hour is None or record[0] > last_hour]
+        if not records:
+            return
+        path = self._aggregate_path(channel)
+        with open(path, "ab") as f:
+            f.truncate(len(existing) * self._AGGREGATE.size)
+            f.write(b"".join(records))
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _expire_aggregates(self, path, oldest):
+        with open(path, "rb") as f:
+            data = f.read()
+        data = data[:len(data) - len(data) % self._AGGREGATE.size]
+        hours = [record[0] for record in self._AGGREGATE.iter_unpack(data)]
+        first = bisect.bisect_left(hours, oldest)
+        if not first:
+            return
+        temporary_path = path + ".tmp"
+        with open(temporary_path, "wb") as f:
+            f.write(data[first * self._AGGREGATE.size:])
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporary_path, path)
+
+#######################################################################################################################
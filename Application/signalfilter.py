@@ -0,0 +1,129 @@
+# SPDX-FileCopyrightText: 2023 Karl Bauer (BAUER GROUP)
+# SPDX-License-Identifier: MIT
+
+#######################################################################################################################
+#
+# Description :  Package for Toni der Topf
+# Author      :  Karl Bauer (karl.bauer@bauer-group.com) / www.bauer-group.com
+#
+#######################################################################################################################
+
+# System Imports
+import bisect
+from collections import deque
+
+#######################################################################################################################
+
+class EMAFilter:
+    """Exponential moving average; ``alpha`` is the weight of a new sample (1 = no smoothing)."""
+
+    def __init__(self, alpha):
+        if not 0 < alpha <= 1:
+            raise ValueError(f"Invalid EMA alpha: {alpha}")
+        self.alpha = alpha
+        self.value = None
+
+    def update(self, value):
+        self.value = value if self.value is None else self.value + self.alpha * (value - self.value)
+        return self.value
+
+class MedianFilter:
+    """Median of the last ``size`` samples, removes single spikes without delaying steps by more than ``size // 2``."""
+
+    def __init__(self, size):
+        if size < 1:
+            raise ValueError(f"Invalid median size: {size}")
+        self.size = size
+        self._window = deque()
+        self._sorted = []
+
+    def update(self, value):
+        if len(self._window) == self.size:
+            del self._sorted[bisect.bisect_left(self._sorted, self._window.popleft())]
+        self._window.append(value)
+        bisect.insort(self._sorted, value)
+        return self._sorted[(len(self._sorted) - 1) // 2]
+
+class KalmanFilter:
+    """One-dimensional Kalman filter for a slowly drifting value.
+
+    ``process_variance`` is how much the true value may change between two samples,
+    ``measurement_variance`` the noise of the sensor (both squared units of the value).
+    """
+
+    def __init__(self, process_variance, measurement_variance):
+        if process_variance < 0 or measurement_variance <= 0:
+            raise ValueError(f"Invalid Kalman variances: {process_variance}, {measurement_variance}")
+        self.process_variance = process_variance
+        self.measurement_variance = measurement_variance
+        self.value = None
+        self.error = 0.0
+
+    def update(self, value):
+        if self.value is None:
+            self.value, self.error = value, self.measurement_variance
+            return self.value
+        error = self.error + self.process_variance
+        gain = error / (error + self.measurement_variance)
+        self.value += gain * (value - self.value)
+        self.error = (1 - gain) * error
+        return self.value
+
+class FilterChain:
+    """Filters applied one after the other, e.g. a median against spikes followed by an EMA."""
+
+    def __init__(self, filters):
+        self.filters = list(filters)
+
+    def update(self, value):
+        for stage in self.filters:
+            value = stage.update(value)
+        return value
+
+_FILTERS = {"ema": (EMAFilter, (float,)), "median": (MedianFilter, (int,)), "kalman": (KalmanFilter, (float, float))}
+
+def create_filter(spec: str) -> FilterChain:
+    """Create the filter chain of a specification like ``median:5+ema:0.2`` or ``kalman:0.0001:0.01``.
+
+    Raises ``ValueError`` for unknown filters or invalid parameters.
+    """
+    filters = []
+    for stage in spec.split('+'):
+        name, *parameters = [part.strip() for part in stage.split(':')]
+        if name.lower() not in _FILTERS:
+            raise ValueError(f"Unknown filter: {name}. Valid filters are: {list(_FILTERS)}")
+        filter_class, types = _FILTERS[name.lower()]
+        if len(parameters) != len(types):
+            raise ValueError(f"Filter {name} needs {len(types)} parameter(s): {stage}")
+        filters.append(filter_class(*(convert(parameter) for convert, parameter in zip(types, parameters))))
+    return FilterChain(filters)
+
+#######################################################################################################################
+
+class Hysteresis:
+    """Threshold with a hysteresis band, so noise around the threshold does not toggle the state.
+
+    The state becomes active when the value passes ``threshold`` (above it, or below it with
+    ``below``) and only becomes inactive again once the value is back by more than ``band``.
+    """
+
+    def __init__(self, threshold, band=0.0, below=False):
+        self.threshold = threshold
+        self.band = band
+        self.below = below
+        self.active = False
+
+    def test(self, value):
+        """Return the state for ``value`` without changing it."""
+        if value is None:
+            return False
+        if self.below:
+            return value < (self.threshold + self.band if self.active else self.threshold)
+        return value > (self.threshold - self.band if self.active else self.threshold)
+
+    def update(self, value):
+        """Return the state for ``value`` and keep it for the next sample."""
+        self.active = self.test(value)
+        return self.active
+
+#######################################################################################################################
@@ -0,0 +1,111 @@
+# SPDX-FileCopyrightText: 2023 Karl Bauer (BAUER GROUP)
+# SPDX-License-Identifier: MIT
+
+#######################################################################################################################
+#
+# Description :  Package for Toni der Topf
+# Author      :  Karl Bauer (karl.bauer@bauer-group.com) / www.bauer-group.com
+#
+#######################################################################################################################
+
+# System Imports
+import bisect
+import threading
+
+#######################################################################################################################
+
+class Histogram:
+    """Duration histogram with fixed buckets; recording a value is a bisect and a few additions."""
+
+    # Upper bounds of the buckets in milliseconds, the last bucket takes everything above
+    BOUNDS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000)
+
+    def __init__(self, bounds_ms=BOUNDS_MS):
+        self.bounds_ms = tuple(bounds_ms)
+        self._bounds = [bound / 1000 for bound in self.bounds_ms]
+        self.reset()
+
+    def reset(self):
+        self.counts = [0] * (len(self.bounds_ms) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds):
+        self.counts[bisect.bisect_left(self._bounds, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, percent):
+        """Return the upper bound (ms) of the bucket holding the ``percent`` percentile, or the maximum above all buckets."""
+        if self.count == 0:
+            return 0.0
+        rank = percent / 100 * self.count
+        seen = 0
+        for bucket, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                return self.bounds_ms[bucket] if bucket < len(self.bounds_ms) else round(self.max * 1000, 3)
+        return round(self.max * 1000, 3)
+
+    @property
+    def snapshot(self):
+        buckets = {f"<={bound}ms": count for bound, count in zip(self.bounds_ms, self.counts)}
+        buckets[f">{self.bounds_ms[-1]}ms"] = self.counts[-1]
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total / self.count * 1000, 3) if self.count else 0.0,
+            "max_ms": round(self.max * 1000, 3),
+            "p50_ms": self.percentile(50),
+            "p95_ms": self.percentile(95),
+            "p99_ms": self.percentile(99),
+            "buckets": buckets,
+        }
+
+#######################################################################################################################
+
+class StageTimer:
+    """Histograms of the time spent in each stage of the render loop.
+
+    ``load``: loading a frame set (PNG decoding and conversion, frame pack or animation).
+    ``convert``: preparing the windows of a frame (deltas, crops, decoding of animations).
+    ``transfer``: writing the windows to the display backend.
+    ``wait``: sleeping until the next frame; ``overshoot``: how late the sleep ended.
+    """
+
+    STAGES = ("load", "convert", "transfer", "wait", "overshoot")
+
+    def __init__(self, stages=STAGES, bounds_ms=Histogram.BOUNDS_MS):
+        self.histograms = {stage: Histogram(bounds_ms) for stage in stages}
+        self._lock = threading.Lock()  # Frame sets are loaded in another thread
+
+    def record(self, stage, seconds):
+        with self._lock:
+            self.histograms[stage].record(seconds)
+
+    def reset(self):
+        with self._lock:
+            for histogram in self.histograms.values():
+                histogram.reset()
+
+    @property
+    def snapshot(self):
+        with self._lock:
+            return {stage: histogram.snapshot for stage, histogram in self.histograms.items()}
+
+    def format(self):
+        """Return the histograms as text table, one line per stage."""
+        lines = []
+        with self._lock:
+            for stage, histogram in self.histograms.items():
+                snapshot = histogram.snapshot
+                lines.append(
+                    f"{stage:>10}: n={snapshot['count']:<7} mean={snapshot['mean_ms']:>9.3f} ms  "
+                    f"p50<={snapshot['p50_ms']} ms  p95<={snapshot['p95_ms']} ms  p99<={snapshot['p99_ms']} ms  "
+                    f"max={snapshot['max_ms']} ms  buckets={histogram.counts}"
+                )
+        return "\n".join(lines)
+
+#######################################################################################################################
@@ -0,0 +1,88 @@
+# SPDX-FileCopyrightText: 2023 Karl Bauer (BAUER GROUP)
+# SPDX-License-Identifier: MIT
+
+#######################################################################################################################
+#
+# Description :  Package for Toni der Topf
+# Author      :  Karl Bauer (karl.bauer@bauer-group.com) / www.bauer-group.com
+#
+#######################################################################################################################
+
+# System Imports
+import os
+import shutil
+from PIL import Image
+
+# Local Imports
+from .applogger import ApplicationLogger
+
+#######################################################################################################################
+
+class TransitionBuilder:
+    """Builds crossfade sequences between two emotions and caches them in the temp folder.
+
+    A transition blends the last frame shown of the previous emotion (only every ``frames_skip``-th
+    image is shown) into the first frame of the next one. It is built on first use and stored as PNG frames next to the pre-processed emotion
+    frames, so playing it costs the same as playing a normal frame.
+    """
+
+    FOLDER_NAME = "transitions"
+
+    def __init__(self, app_logger: ApplicationLogger, temp_folder, frame_count, frames_skip=1):
+        self._log = app_logger
+        self._temp_folder = temp_folder
+        self._transitions_folder = os.path.join(temp_folder, self.FOLDER_NAME)
+        self.frame_count = frame_count
+        self.frames_skip = max(1, frames_skip)
+
+    def folder(self, from_emotion, to_emotion):
+        return os.path.join(self._transitions_folder,
+                            f"{from_emotion}-{to_emotion}-{self.frame_count}-{self.frames_skip}")
+
+    def ensure(self, from_emotion, to_emotion):
+        """Return the folder with the transition frames, building them if they do not exist yet."""
+        folder = self.folder(from_emotion, to_emotion)
+        if os.path.isdir(folder):
+            return folder
+
+        self._log.debug(f"Building transition {from_emotion} -> {to_emotion} ({self.frame_count} frames)...")
+        with self._open_frame(from_emotion, -1) as from_frame, self._open_frame(to_emotion, 0) as to_frame:
+            frames = self.crossfade(from_frame, to_frame, self.frame_count)
+
+        # Build into a temporary folder, so an interrupted build is never picked up
+        build_folder = folder + ".tmp"
+        shutil.rmtree(build_folder, ignore_errors=True)
+        os.makedirs(build_folder)
+        for i, frame in enumerate(frames):
+            frame.save(os.path.join(build_folder, f"frame{i + 1:03}.png"))
+        os.replace(build_folder, folder)
+
+        return folder
+
+    def _open_frame(self, emotion, position):
+        image_folder_path = os.path.join(self._temp_folder, emotion)
+        image_files = sorted([f for f in os.listdir(image_folder_path) if f.endswith(".png")])
+        image_files = image_files[::self.frames_skip]  # The frames that are shown, as in FrameSet.load
+        return Image.open(os.path.join(image_folder_path, image_files[position]))
+
+    @staticmethod
+    def crossfade(from_frame: Image.Image, to_frame: Image.Image, frame_count):
+        """Return ``frame_count`` images blending from ``from_frame`` to ``to_frame`` (both excluded)."""
+        from_frame = from_frame.convert("RGB")
+        to_frame = to_frame.convert("RGB")
+        return [Image.blend(from_frame, to_frame, (i + 1) / (frame_count + 1)) for i in range(frame_count)]
+
+    @classmethod
+    def clear(cls, temp_folder, emotion=None):
+        """Remove the cached transitions (of ``emotion`` only, if given), e.g. after its frames were regenerated."""
+        transitions_folder = os.path.join(temp_folder, cls.FOLDER_NAME)
+        if emotion is None:
+            shutil.rmtree(transitions_folder, ignore_errors=True)
+            return
+        if not os.path.isdir(transitions_folder):
+            return
+        for folder in os.listdir(transitions_folder):
+            if emotion in folder.split("-")[:2]:
+                shutil.rmtree(os.path.join(transitions_folder, folder), ignore_errors=True)
+
+#######################################################################################################################
@@ -0,0 +1,126 @@
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+root_path = Path(__file__).resolve().parents[1]
+sys.path.append(str(root_path))
+
+from Application.acquisitionscheduler import AcquisitionScheduler
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _start_grid(scheduler):
+    # Deadlines as set by start(), without running the thread
+    for job in scheduler.jobs:
+        job.next_due = scheduler._clock() + job.interval
+
+
+def test_reads_due_together_are_batched():
+    clock = _Clock()
+    scheduler = AcquisitionScheduler(clock=clock)
+    values = []
+    scheduler.add("a", 1.0, lambda: 1, values.append)
+    scheduler.add("b", 1.0, lambda: 2, values.append)
+    scheduler.add("c", 3.0, lambda: 3, values.append)
+    _start_grid(scheduler)
+
+    clock.now = 1.0
+    scheduler.run_due(clock.now)
+
+    assert values == [1, 2]
+    assert scheduler.batches == 1
+    assert [job.next_due for job in scheduler.jobs] == [2.0, 2.0, 3.0]
+
+
+def test_reads_hold_the_bus_lock_and_handlers_do_not():
+    clock = _Clock()
+    bus_lock = threading.Lock()
+    scheduler = AcquisitionScheduler(bus_lock=bus_lock, clock=clock)
+    locked = []
+    scheduler.add("a", 1.0, lambda: locked.append(bus_lock.locked()), lambda value: locked.append(bus_lock.locked()))
+    _start_grid(scheduler)
+
+    scheduler.run_due(1.0)
+
+    assert locked == [True, False]
+
+
+def test_errors_do_not_stop_other_jobs():
+    clock = _Clock()
+    scheduler = AcquisitionScheduler(clock=clock)
+    values = []
+
+    def failing_read():
+        raise OSError("No ACK")
+
+    failing = scheduler.add("failing", 1.0, failing_read, values.append)
+    scheduler.add("ok", 1.0, lambda: 42, values.append)
+    _start_grid(scheduler)
+
+    clock.now = 1.0
+    scheduler.run_due(clock.now)
+
+    assert values == [42]
+    assert failing.errors == 1
+    assert failing.stats["last_error"] == "OSError('No ACK')"
+    # The failed job keeps its schedule
+    assert failing.next_due == 2.0
+
+
+def test_skipped_deadlines_are_counted_as_missed():
+    clock = _Clock()
+    scheduler = AcquisitionScheduler(clock=clock)
+    job = scheduler.add("a", 1.0, lambda: 0, lambda value: None)
+    _start_grid(scheduler)
+
+    # The bus was blocked for 3.5 seconds: deadlines 2 and 3 passed
+    clock.now = 3.5
+    scheduler.run_due(clock.now)
+
+    assert job.missed == 2
+    assert job.next_due == 4.0
+    assert job.stats["drift_max_ms"] == 2500.0
+
+
+def test_lag_is_the_most_overdue_read():
+    clock = _Clock()
+    scheduler = AcquisitionScheduler(clock=clock)
+    scheduler.add("a", 1.0, lambda: 0, lambda value: None)
+    scheduler.add("b", 5.0, lambda: 0, lambda value: None)
+    _start_grid(scheduler)
+
+    assert scheduler.lag == 0.0
+    clock.now = 1.25
+    assert scheduler.lag == 0.25
+
+
+def test_invalid_interval_is_rejected():
+    with pytest.raises(ValueError):
+        AcquisitionScheduler().add("a", 0, lambda: 0, lambda value: None)
+
+
+def test_thread_reads_on_schedule():
+    scheduler = AcquisitionScheduler()
+    fast = scheduler.add("fast", 0.02, time.monotonic, lambda value: None)
+    slow = scheduler.add("slow", 0.1, time.monotonic, lambda value: None)
+    scheduler.start()
+    time.sleep(0.25)
+    scheduler.stop()
+
+    assert 8 <= fast.reads <= 13
+    assert 1 <= slow.reads <= 3
+    stats = scheduler.stats
+    assert set(stats["jobs"]) == {"fast", "slow"}
+    assert stats["jobs"]["fast"]["reads"] == fast.reads
+    # Reads that fall due together are batched
+    assert stats["batches"] <= fast.reads + slow.reads
@@ -0,0 +1,89 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+root_path = Path(__file__).resolve().parents[1]
+sys.path.append(str(root_path))
+
+from Application.adcsampler import ADCSampler
+
+
+class _FakeADC:
+    """Returns the next value of a channel for every read and advances a fake clock."""
+
+    def __init__(self, samples, read_time=0.0005):
+        self.samples = {channel: list(values) for channel, values in samples.items()}
+        self.read_time = read_time
+        self.reads = []
+        self.sleeps = []
+        self.now = 0.0
+
+    def read(self, channel):
+        self.reads.append(channel)
+        self.now += self.read_time
+        return self.samples[channel].pop(0)
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+    def clock(self):
+        return self.now
+
+
+def _sampler(adc, **kwargs):
+    return ADCSampler(adc.read, sleep=adc.sleep, clock=adc.clock, **kwargs)
+
+
+def test_median_rejects_spikes():
+    adc = _FakeADC({0: [100, 101, 5000, 99, 100]})
+    sampler = _sampler(adc, channels=(0,), samples=5)
+
+    assert sampler.read() == {0: 100}
+    assert sampler.spread[0] == 5000 - 99
+
+
+def test_mean_oversampling():
+    adc = _FakeADC({0: [100, 101, 102, 103]})
+    sampler = _sampler(adc, channels=(0,), samples=4, reducer="mean")
+
+    assert sampler.read() == {0: 101.5}
+
+
+def test_channels_are_sampled_one_after_the_other():
+    adc = _FakeADC({0: [1, 1, 1], 2: [5, 5, 5]})
+    sampler = _sampler(adc, channels=(0, 2), samples=3, data_rate=500)
+
+    assert sampler.read() == {0: 1, 2: 5}
+    # The multiplexer switches once per channel, the reads are one conversion period apart
+    assert adc.reads == [0, 0, 0, 2, 2, 2]
+    assert adc.sleeps == [1 / 500] * 4
+
+
+def test_single_shot_reads_do_not_wait():
+    adc = _FakeADC({0: [1, 2, 3]})
+    sampler = _sampler(adc, channels=(0,), samples=3, continuous=False)
+
+    sampler.read()
+    assert adc.sleeps == []
+
+
+def test_latency_stats():
+    adc = _FakeADC({0: [1] * 4, 1: [1] * 4}, read_time=0.001)
+    sampler = _sampler(adc, channels=(0, 1), samples=2, data_rate=1000)
+    sampler.read()
+    sampler.read()
+
+    stats = sampler.stats
+    assert stats["mode"] == "continuous"
+    assert stats["channels"][0]["mean_ms"] == pytest.approx(3.0)
+    assert stats["cycle"]["mean_ms"] == pytest.approx(6.0)
+    assert stats["channels"][1]["spread"] == 0
+
+
+def test_invalid_settings_are_rejected():
+    with pytest.raises(ValueError):
+        ADCSampler(lambda channel: 0, reducer="mode")
+    with pytest.raises(ValueError):
+        ADCSampler(lambda channel: 0, samples=0)
@@ -0,0 +1,101 @@
+import json
+import sys
+from pathlib import Path
+
+import pytest
+from PIL import Image
+
+root_path = Path(__file__).resolve().parents[1]
+sys.path.append(str(root_path))
+
+from Application.animatedframesource import AnimatedFrameSource, find_animation
+
+
+def _create_animation(path, colors, durations):
+    # A small square in front of a transparent background
+    frames = []
+    for color in colors:
+        frame = Image.new("RGBA", (64, 64), (0, 0, 0, 0))
+        frame.paste(color, (24, 24, 40, 40))
+        frames.append(frame)
+    frames[0].save(path, save_all=True, append_images=frames[1:], duration=durations, loop=0)
+
+
+def test_tick_frames_follow_durations(tmp_path):
+    path = tmp_path / "test.gif"
+    _create_animation(path, [(255, 0, 0, 255), (0, 255, 0, 255), (0, 0, 255, 255)], [200, 100, 300])
+
+    source = AnimatedFrameSource.load(str(path), frame_rate=10)
+    assert source.durations == [200, 100, 300]
+    assert source.tick_frames == [0, 0, 1, 2, 2, 2]
+
+
+@pytest.mark.parametrize("extension", [".gif", ".webp"])
+def test_durations_are_read_without_decoding(tmp_path, monkeypatch, extension):
+    path = tmp_path / ("test" + extension)
+    _create_animation(path, [(255, 0, 0, 255), (0, 255, 0, 255), (0, 0, 255, 255)], [200, 100, 300])
+
+    def open_image(*args, **kwargs):
+        raise AssertionError("The animation was opened to read the durations")
+
+    monkeypatch.setattr(Image, "open", open_image)
+    source = AnimatedFrameSource.load(str(path), frame_rate=10)
+    assert source.durations == [200, 100, 300]
+    assert source.decoded_frames == 0
+
+
+def test_playback_continues_after_close(tmp_path):
+    path = tmp_path / "test.gif"
+    _create_animation(path, [(255, 0, 0, 255), (0, 0, 255, 255)], [100, 100])
+
+    source = AnimatedFrameSource.load(str(path), frame_rate=10, window=1)
+    source.regions(0)
+    source.close()
+    assert source._image is None
+    assert source.regions(1, 0)
+    assert source.decoded_frames == 2
+
+
+def test_held_frames_write_nothing(tmp_path):
+    path = tmp_path / "test.webp"
+    _create_animation(path, [(255, 0, 0, 255), (0, 0, 255, 255)], [200, 200])
+
+    source = AnimatedFrameSource.load(str(path), frame_rate=10)
+    full_frame = source.regions(0)
+    assert full_frame[0][0] == (0, 0, source.width, source.height)
+    assert len(full_frame[0][1]) == source.width * source.height * 2
+    assert source.regions(1, 0) == []
+
+    # Only the square in the center of the display changes
+    update = source.regions(2, 1)
+    assert update
+    assert sum((right - left) * (lower - upper) for (left, upper, right, lower), _ in update) < 70 * 70
+    assert source.decoded_frames == 2
+
+
+def test_frame_window_is_bounded(tmp_path):
+    path = tmp_path / "test.gif"
+    colors = [(i * 20, 0, 255 - i * 20, 255) for i in range(10)]
+    _create_animation(path, colors, [100] * 10)
+
+    source = AnimatedFrameSource.load(str(path), frame_rate=10, window=3)
+    previous = None
+    for index in list(range(len(source))) * 2:
+        source.regions(index, previous)
+        previous = index
+
+    assert len(source._frames) == 3
+    assert source.decoded_frames == 20
+    assert source.nbytes == 3 * source.width * source.height * 2
+
+
+def test_find_animation(tmp_path):
+    (tmp_path / "smileys").mkdir()
+    (tmp_path / "smileys" / "grin.gif").write_bytes(b"")
+    (tmp_path / "smileys" / "grin.webp").write_bytes(b"")
+    (tmp_path / "emotions.json").write_text(json.dumps({"smileys": ["grin"]}))
+
+    assert find_animation(str(tmp_path), "grin") == str(tmp_path / "smileys" / "grin.webp")
+    assert find_animation(str(tmp_path), "smileys/grin") == str(tmp_path / "smileys" / "grin.webp")
+    with pytest.raises(ValueError):
+        find_animation(str(tmp_path), "frown")
@@ -0,0 +1,109 @@
+import json
+import os
+import sys
+from pathlib import Path
+
+from PIL import Image
+
+root_path = Path(__file__).resolve().parents[1]
+sys.path.append(str(root_path))
+
+from Application.applogger import ApplicationLogger
+from Application.assetpreprocessor import AssetPreprocessor
+from Application.imageprocessing import transform_image
+
+
+def _make_assets(assets, emotions=("happy", "sleepy"), count=3):
+    for emotion in emotions:
+        folder = assets / emotion
+        folder.mkdir(parents=True)
+        for i in range(count):
+            image = Image.new("RGB", (8, 4))
+            image.putpixel((i, 0), (255, 255, 255))
+            image.save(folder / f"frame{i + 1:03}.png")
+
+
+def _preprocessor(assets, temp, shift_x=-2, workers=1):
+    return AssetPreprocessor(ApplicationLogger(level=100), str(assets), str(temp), shift_x=shift_x, workers=workers)
+
+
+def test_prepare_generates_transformed_frames_and_manifest(tmp_path):
+    assets, temp = tmp_path / "assets", tmp_path / "temp"
+    _make_assets(assets)
+
+    assert _preprocessor(assets, temp).prepare(["happy", "sleepy"]) == 6
+
+    with Image.open(assets / "happy" / "frame002.png") as source, Image.open(temp / "happy" / "frame002.png") as output:
+        assert output.tobytes() == transform_image(source, 0, -2).tobytes()
+
+    manifest = json.loads((temp / "manifest.json").read_text())
+    entry = manifest["frames"]["happy/frame002.png"]
+    assert entry["shift_x"] == -2 and entry["rotate"] == 0
+    assert entry["source"] and entry["output"]
+
+
+def test_prepare_only_regenerates_stale_frames(tmp_path):
+    assets, temp = tmp_path / "assets", tmp_path / "temp"
+    _make_assets(assets)
+    _preprocessor(assets, temp).prepare(["happy", "sleepy"])
+
+    assert _preprocessor(assets, temp).prepare(["happy", "sleepy"]) == 0
+
+    # Changed source frame and deleted output
+    Image.new("RGB", (8, 4), (1, 2, 3)).save(assets / "sleepy" / "frame001.png")
+    os.remove(temp / "happy" / "frame003.png")
+    assert _preprocessor(assets, temp).prepare(["happy", "sleepy"]) == 2
+
+    # Same content written again: the hash still matches
+    Image.new("RGB", (8, 4), (1, 2, 3)).save(assets / "sleepy" / "frame001.png")
+    assert _preprocessor(assets, temp).prepare(["happy", "sleepy"]) == 0
+
+
+def test_prepare_regenerates_everything_on_new_parameters(tmp_path):
+    assets, temp = tmp_path / "assets", tmp_path / "temp"
+    _make_assets(assets)
+    _preprocessor(assets, temp).prepare(["happy", "sleepy"])
+
+    assert _preprocessor(assets, temp, shift_x=3, workers=2).prepare(["happy", "sleepy"]) == 6
+
+
+def test_prepare_removes_frame_packs_of_changed_emotions(tmp_path):
+    assets, temp = tmp_path / "assets", tmp_path / "temp"
+    _make_assets(assets)
+    _preprocessor(assets, temp).prepare(["happy", "sleepy"])
+    (temp / "happy.pack").write_bytes(b"pack")
+    (temp / "sleepy.pack").write_bytes(b"pack")
+
+    Image.new("RGB", (8, 4), (1, 2, 3)).save(assets / "sleepy" / "frame001.png")
+    _preprocessor(assets, temp).prepare(["happy", "sleepy"])
+
+    assert (temp / "happy.pack").exists()
+    assert not (temp / "sleepy.pack").exists()
+
+
+def test_prepare_keeps_manifest_of_other_emotions(tmp_path):
+    assets, temp = tmp_path / "assets", tmp_path / "temp"
+    _make_assets(assets)
+
+    assert _preprocessor(assets, temp).prepare(["happy"]) == 3
+    assert _preprocessor(assets, temp).prepare(["sleepy"]) == 3
+
+    manifest = json.loads((temp / "manifest.json").read_text())
+    assert "happy/frame001.png" in manifest["frames"] and "sleepy/frame001.png" in manifest["frames"]
+    assert _preprocessor(assets, temp).prepare(["happy", "sleepy"]) == 0
+
+
+def test_identical_outputs_are_stored_once(tmp_path):
+    assets, temp = tmp_path / "assets", tmp_path / "temp"
+    _make_assets(assets)
+
+    _preprocessor(assets, temp).prepare(["happy", "sleepy"])
+    assert os.path.samefile(temp / "happy" / "frame001.png", temp / "sleepy" / "frame001.png")
+    assert _preprocessor(assets, temp).prepare(["happy", "sleepy"]) == 0
+
+    # Regenerating one of the frames does not change the other
+    Image.new("RGB", (8, 4), (1, 2, 3)).save(assets / "sleepy" / "frame001.png")
+    assert _preprocessor(assets, temp).prepare(["happy", "sleepy"]) == 1
+    assert not os.path.samefile(temp / "happy" / "frame001.png", temp / "sleepy" / "frame001.png")
+    with Image.open(temp / "happy" / "frame001.png") as output:
+        assert output.getpixel((0, 0)) != (1, 2, 3)
@@ -14,6 +14,17 @@ class TestConfiguration(unittest.TestCase):
             logging.INFO,
         )
 
+    def test_mapping_from_string(self):
+        self.assertEqual(
+            Configuration.mapping_from_string("Happy=grin, hot = hot-face,invalid,sleepy="),
+            {"happy": "grin", "hot": "hot-face"},
+        )
+        self.assertEqual(Configuration.mapping_from_string(""), {})
+
+    def test_channels_from_string(self):
+        self.assertEqual(Configuration.channels_from_string("0, 2,2,4,x"), (0, 2))
+        self.assertEqual(Configuration.channels_from_string(""), ())
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,121 @@
+import sys
+from pathlib import Path
+
+import pytest
+from PIL import Image
+
+root_path = Path(__file__).resolve().parents[1]
+sys.path.append(str(root_path))
+
+from Application.displaybackend import FileBackend, NullBackend, SPIWindowWriter, create_display_backend
+from Application.imageprocessing import image_to_rgb565, to_display_orientation
+
+
+def test_file_backend_window_write():
+    backend = FileBackend(width=4, height=2, rotation=0)
+    backend.write_window((1, 0, 3, 2), bytes([0xF8, 0x00]) * 4)  # red
+    backend.end_frame()
+
+    snapshot = backend.snapshot()
+    assert snapshot.getpixel((0, 0)) == (0, 0, 0)
+    assert snapshot.getpixel((1, 0))[0] > 240
+    assert snapshot.getpixel((2, 1))[0] > 240
+    assert snapshot.getpixel((3, 1)) == (0, 0, 0)
+    assert backend.stats["bytes_written"] == 8
+
+
+def test_file_backend_snapshot_round_trip(tmp_path):
+    image = Image.new("RGB", (320, 240))
+    image.putdata([((x * 8) & 0xF8, (x + y) & 0xFC, (y * 8) & 0xF8) for y in range(240) for x in range(320)])
+
+    path = tmp_path / "framebuffer.raw"
+    backend = FileBackend(path=str(path))
+    buffer = image_to_rgb565(image, backend.rotation)
+    backend.write_window((0, 0, backend.native_width, backend.native_height), buffer)
+    backend.end_frame()
+    backend.close()
+
+    # Decoding fills the low bits of each channel, mask them before comparing
+    red, green, blue = backend.snapshot().split()
+    snapshot = Image.merge("RGB", (red.point(lambda v: v & 0xF8), green.point(lambda v: v & 0xFC), blue.point(lambda v: v & 0xF8)))
+    assert snapshot.tobytes() == to_display_orientation(image, backend.rotation).tobytes()
+    assert path.read_bytes() == buffer
+
+
+def test_null_backend_stats():
+    backend = NullBackend()
+    for _ in range(3):
+        backend.write_window((0, 0, 10, 10), bytes(200))
+        backend.end_frame()
+
+    stats = backend.stats
+    assert stats["frames"] == 3
+    assert stats["windows"] == 3
+    assert stats["bytes_per_frame"] == 200
+
+
+def test_create_display_backend():
+    assert isinstance(create_display_backend("null"), NullBackend)
+    assert isinstance(create_display_backend("FILE"), FileBackend)
+    with pytest.raises(ValueError):
+        create_display_backend("vga")
+
+
+class StubPin:
+    def __init__(self):
+        self.value = None
+
+
+class StubSPI:
+    def __init__(self, dc_pin):
+        self.dc_pin = dc_pin
+        self.transfers = []
+
+    def write(self, buffer, start=0, end=None):
+        self.transfers.append((self.dc_pin.value, buffer, start, len(buffer) if end is None else end))
+
+
+class StubSPIDevice:
+    def __init__(self, dc_pin):
+        self.spi = StubSPI(dc_pin)
+        self.locks = 0
+
+    def __enter__(self):
+        self.locks += 1
+        return self.spi
+
+    def __exit__(self, *args):
+        pass
+
+
+def test_spi_window_writer_sends_caller_buffer_without_copies():
+    dc_pin = StubPin()
+    device = StubSPIDevice(dc_pin)
+    writer = SPIWindowWriter(device, dc_pin, chunk_size=100)
+
+    buffer = memoryview(bytearray(range(250)))
+    writer.write_window((10, 20, 15, 45), buffer)
+
+    commands = [(dc, bytes(data[start:end])) for dc, data, start, end in device.spi.transfers[:6]]
+    assert commands == [
+        (0, b"\x2a"), (1, bytes([0, 10, 0, 14])),
+        (0, b"\x2b"), (1, bytes([0, 20, 0, 44])),
+        (0, b"\x2c"), (1, bytes(buffer[0:100])),
+    ]
+    # The pixel data is sent from the caller's buffer in chunks, within one bus transaction
+    assert [(data is buffer, start, end) for _, data, start, end in device.spi.transfers[5:]] == [
+        (True, 0, 100), (True, 100, 200), (True, 200, 250),
+    ]
+    assert device.locks == 1
+
+
+def test_spi_window_writer_reuses_command_buffers():
+    dc_pin = StubPin()
+    device = StubSPIDevice(dc_pin)
+    writer = SPIWindowWriter(device, dc_pin)
+
+    writer.write_window((0, 0, 1, 1), bytes(2))
+    writer.write_window((1, 1, 2, 2), bytes(2))
+
+    first, second = device.spi.transfers[:6], device.spi.transfers[6:12]
+    assert all(a[1] is b[1] for a, b in zip(first[:5], second[:5]))
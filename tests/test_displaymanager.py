@@ -1,52 +1,35 @@
+import importlib.util
+import os
 import sys
-import types
+import time
 from pathlib import Path
 
 from PIL import Image
 
+root_path = Path(__file__).resolve().parents[1]
+sys.path.append(str(root_path))
 
-# Stub hardware-specific modules before importing DisplayManager
-digitalio = types.ModuleType("digitalio")
-
-
-class DummyDIO:
-    def __init__(self, pin):
-        self.value = False
-
-    def switch_to_output(self):
-        pass
-
-
-digitalio.DigitalInOut = DummyDIO
-
-board = types.ModuleType("board")
-board.CE0 = board.D25 = board.D24 = board.D23 = board.SCL = board.SDA = None
-board.SPI = lambda: None
-
-adafruit_rgb_display = types.ModuleType("adafruit_rgb_display")
-ili9341_module = types.ModuleType("ili9341")
-
+from Application.assetpreprocessor import AssetPreprocessor
+from Application.displaymanager import DisplayManager, Emotions
+from Application.displaybackend import FileBackend
+from Application.framepack import FramePack
+from Application.frameset import FrameSet
+from Application.imageprocessing import image_to_rgb565, rgb565_to_image
 
-class DummyDisplay:
-    def __init__(self, *args, **kwargs):
-        pass
 
-    def image(self, img):
+class DummyLogger:
+    def debug(self, msg):
         pass
 
+    info = warning = error = debug
 
-ili9341_module.ILI9341 = DummyDisplay
-adafruit_rgb_display.ili9341 = ili9341_module
-
-sys.modules["digitalio"] = digitalio
-sys.modules["board"] = board
-sys.modules["adafruit_rgb_display"] = adafruit_rgb_display
-sys.modules["adafruit_rgb_display.ili9341"] = ili9341_module
 
-root_path = Path(__file__).resolve().parents[1]
-sys.path.append(str(root_path))
-
-from Application.displaymanager import DisplayManager
+def _create_assets(folder, colors):
+    for emotion in Emotions:
+        emotion_folder = folder / emotion.value
+        emotion_folder.mkdir(parents=True)
+        for i in range(2):
+            Image.new("RGB", (320, 240), colors[emotion]).save(emotion_folder / f"frame{i + 1:03}.png")
 
 
 def test_shift_and_wrap_right():
@@ -70,3 +53,190 @@ def test_shift_and_wrap_left():
         (255, 0, 0),
     ]
 
+
+def test_render_to_file_backend(tmp_path):
+    colors = {emotion: (i * 40, 255 - i * 40, 0) for i, emotion in enumerate(Emotions)}
+    _create_assets(tmp_path / "emotion", colors)
+
+    backend = FileBackend()
+    manager = DisplayManager(DummyLogger(), frame_rate=50, assets_folder=str(tmp_path / "emotion"),
+                             temp_folder=str(tmp_path / "temp"), backend=backend, stage_timing=True)
+    # The display shows the colors quantized to RGB565
+    expected = rgb565_to_image(image_to_rgb565(Image.new("RGB", (1, 1), colors[Emotions.HOT])), (1, 1)).getpixel((0, 0))
+
+    shown = False
+    manager.start()
+    try:
+        manager.set_emotion(Emotions.HOT)
+        deadline = time.monotonic() + 5
+        while not shown and time.monotonic() < deadline:
+            shown = backend.snapshot().getpixel((120, 160)) == expected
+            time.sleep(0.01)
+    finally:
+        manager.stop()
+
+    assert shown
+    assert manager.metrics["frames"]["frames_shown"] > 0
+    assert manager.metrics["backend"]["bytes_written"] > 0
+    stages = manager.metrics["stages"]
+    assert stages["load"]["count"] >= 1
+    # The two identical frames of each emotion are one held frame, which is not transferred again
+    assert stages["transfer"]["count"] + manager.metrics["held_frames"] >= manager.metrics["frames"]["frames_shown"]
+    assert manager.metrics["startup"]["time_to_first_face_s"] > 0
+
+
+def test_raw_frames_match_preprocessed_frames(tmp_path):
+    colors = {emotion: (i * 40, 255 - i * 40, 0) for i, emotion in enumerate(Emotions)}
+    _create_assets(tmp_path / "emotion", colors)
+    Image.new("RGB", (320, 240), (0, 0, 255)).save(tmp_path / "emotion" / Emotions.HOT.value / "frame002.png")
+
+    manager = DisplayManager(DummyLogger(), assets_folder=str(tmp_path / "emotion"), temp_folder=str(tmp_path / "temp"),
+                             shift_x=-10, backend=FileBackend())
+    assert manager.wait_prepared(timeout=10)
+    manager.stop()
+
+    assert all(manager.is_prepared(emotion) for emotion in Emotions)
+    assert manager.metrics["startup"]["preprocessing_s"] is not None
+
+    # Emotions that are not prepared yet are transformed on the fly, with the same result
+    raw_frames = FrameSet.load(str(tmp_path / "emotion" / Emotions.HOT.value), rotation=90, shift_x=-10)
+    prepared_frames = list(manager._emotion_loader(Emotions.HOT)())
+    assert [bytes(frame) for frame in raw_frames] == [bytes(frame) for frame in prepared_frames]
+
+
+def test_switch_completes_with_a_frame_cache_smaller_than_transition_and_emotion(tmp_path):
+    colors = {emotion: (i * 40, 255 - i * 40, 0) for i, emotion in enumerate(Emotions)}
+    _create_assets(tmp_path / "emotion", colors)
+
+    # Each frame set alone exceeds the budget, so loading one evicts the other
+    manager = DisplayManager(DummyLogger(), assets_folder=str(tmp_path / "emotion"), temp_folder=str(tmp_path / "temp"),
+                             transition_frames=4, frame_cache_size=1000, backend=FileBackend())
+    assert manager.wait_prepared(timeout=10)
+    manager._loader.start()
+    try:
+        incoming = None
+        deadline = time.monotonic() + 10
+        while incoming is None and time.monotonic() < deadline:
+            incoming = manager._frames_for_switch(Emotions.HAPPY, Emotions.HOT)
+            manager._wake_event.wait(0.05)
+            manager._wake_event.clear()
+    finally:
+        manager._loader.stop()
+        manager.stop()
+
+    assert incoming is not None
+    transition, frames = incoming
+    assert len(transition.frames) == 4
+    assert len(frames) > 0
+    assert manager._switch_frames == {}
+
+
+class RecordingBackend(FileBackend):
+    def __init__(self):
+        super().__init__()
+        self.shown = []
+
+    def end_frame(self):
+        super().end_frame()
+        self.shown.append(self.snapshot().getpixel((120, 160)))
+
+
+def test_transition_starts_after_the_last_frame_of_the_animation(tmp_path):
+    colors = {emotion: (0, 255, 0) for emotion in Emotions}
+    colors[Emotions.HOT] = (0, 0, 240)
+    _create_assets(tmp_path / "emotion", colors)
+    happy_colors = [(0, 0, 0), (80, 0, 0), (160, 0, 0), (240, 0, 0)]
+    for i, color in enumerate(happy_colors):
+        Image.new("RGB", (320, 240), color).save(tmp_path / "emotion" / Emotions.HAPPY.value / f"frame{i + 1:03}.png")
+
+    def quantized(color):
+        return rgb565_to_image(image_to_rgb565(Image.new("RGB", (1, 1), color)), (1, 1)).getpixel((0, 0))
+
+    backend = RecordingBackend()
+    manager = DisplayManager(DummyLogger(), frame_rate=10, assets_folder=str(tmp_path / "emotion"),
+                             temp_folder=str(tmp_path / "temp"), transition_frames=2, backend=backend)
+    assert manager.wait_prepared(timeout=10)
+    manager.start()
+    try:
+        time.sleep(0.25)
+        manager.set_emotion(Emotions.HOT)
+        deadline = time.monotonic() + 5
+        while quantized(colors[Emotions.HOT]) not in backend.shown and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        manager.stop()
+
+    # The crossfade starts from the frame on the display, the animation is not cut off in the middle
+    shown = backend.shown[:backend.shown.index(quantized(colors[Emotions.HOT]))]
+    happy = [quantized(color) for color in happy_colors]
+    first_transition = next(i for i, color in enumerate(shown) if color[0] > 0 and color[2] > 0)
+    assert shown[first_transition - 1] == happy[-1]
+    assert len(shown) - first_transition == 2
+
+
+def test_frame_packs_of_the_pack_tool_are_loaded(tmp_path, monkeypatch):
+    colors = {emotion: (i * 40, 255 - i * 40, 0) for i, emotion in enumerate(Emotions)}
+    _create_assets(tmp_path / "emotion", colors)
+    spec = importlib.util.spec_from_file_location("PackEmotionFrames", root_path / "tools" / "PackEmotionFrames.py")
+    tool = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(tool)
+
+    tool.pack_emotions(str(tmp_path / "emotion"), str(tmp_path / "temp"))
+    pack_path = tmp_path / "temp" / (Emotions.HOT.value + FramePack.EXTENSION)
+    mtime = os.stat(pack_path).st_mtime_ns
+
+    manager = DisplayManager(DummyLogger(), frame_rate=tool.frame_rate, frames_skip=tool.frames_skip, shift_x=tool.shift_x,
+                             assets_folder=str(tmp_path / "emotion"), temp_folder=str(tmp_path / "temp"),
+                             backend=FileBackend(rotation=tool.rotation))
+    assert manager.wait_prepared(timeout=10)
+    manager.stop()
+
+    # The images are not decoded again, the pack written by the tool is loaded as it is
+    def load_images(*args, **kwargs):
+        raise AssertionError("The images were loaded instead of the frame pack")
+
+    monkeypatch.setattr(FrameSet, "load", load_images)
+    frames = manager._emotion_loader(Emotions.HOT)()
+    assert os.stat(pack_path).st_mtime_ns == mtime
+    assert len(frames) == 1
+
+
+def test_early_wake_ups_are_not_counted_as_held_frames(tmp_path):
+    colors = {emotion: (i * 40, 255 - i * 40, 0) for i, emotion in enumerate(Emotions)}
+    _create_assets(tmp_path / "emotion", colors)
+
+    # Both frames of an emotion are the same, so every tick after the first one holds the frame
+    manager = DisplayManager(DummyLogger(), frame_rate=5, assets_folder=str(tmp_path / "emotion"),
+                             temp_folder=str(tmp_path / "temp"), backend=FileBackend())
+    manager.start()
+    try:
+        deadline = time.monotonic() + 1
+        while time.monotonic() < deadline:
+            manager._wake_event.set()
+            time.sleep(0.005)
+    finally:
+        manager.stop()
+
+    frames = manager.metrics["frames"]
+    assert frames["frames_shown"] <= 10
+    assert manager.metrics["held_frames"] < frames["frames_shown"]
+
+
+def test_failed_preparation_is_retried_without_worker_processes(tmp_path, monkeypatch):
+    colors = {emotion: (i * 40, 255 - i * 40, 0) for i, emotion in enumerate(Emotions)}
+    _create_assets(tmp_path / "emotion", colors)
+    prepare = AssetPreprocessor.prepare
+
+    def prepare_without_pool(self, emotions):
+        if self._workers != 1:
+            raise AssertionError("daemonic processes are not allowed to have children")
+        return prepare(self, emotions)
+
+    monkeypatch.setattr(AssetPreprocessor, "prepare", prepare_without_pool)
+    manager = DisplayManager(DummyLogger(), assets_folder=str(tmp_path / "emotion"), temp_folder=str(tmp_path / "temp"),
+                             backend=FileBackend())
+    try:
+        assert manager.wait_prepared(Emotions.HOT, timeout=10)
+        assert manager.wait_prepared(timeout=10)
+    finally:
+        manager.stop()
@@ -0,0 +1,104 @@
+import io
+import sys
+import threading
+import time
+import urllib.request
+from pathlib import Path
+
+from PIL import Image
+
+root_path = Path(__file__).resolve().parents[1]
+sys.path.append(str(root_path))
+
+from Application.applogger import ApplicationLogger
+from Application.displaymirror import DisplayMirror
+from Application.frameset import FrameSet
+from Application.imageprocessing import image_to_rgb565
+
+
+def _frames():
+    # Two frames of 4 x 2 pixels (display orientation), the first pixel tells them apart
+    images = [Image.new("RGB", (4, 2), (0, 0, 255)) for _ in range(2)]
+    images[1].putpixel((0, 0), (255, 0, 0))
+    return FrameSet([image_to_rgb565(image, rotation=90) for image in images], 2, 4)
+
+
+def _mirror(**kwargs):
+    return DisplayMirror(ApplicationLogger(level=100), port=0, address="127.0.0.1", **kwargs)
+
+
+def test_nothing_is_copied_without_clients():
+    mirror = _mirror()
+    mirror.publish(_frames(), 0)
+
+    assert mirror.snapshots == 0
+
+
+def test_frames_are_copied_when_changed_and_capped():
+    mirror = _mirror(max_fps=1000)
+    frames = _frames()
+    with mirror.client():
+        mirror.publish(frames, 0)
+        mirror.publish(frames, 0, changed=False)
+        assert mirror.snapshots == 1
+
+        time.sleep(0.002)
+        mirror.publish(frames, 1)
+        assert mirror.snapshots == 2
+
+    capped = _mirror(max_fps=1)
+    with capped.client():
+        capped.publish(frames, 0)
+        capped.publish(frames, 1)
+    assert capped.snapshots == 1
+
+
+def test_frame_is_encoded_once_in_display_orientation():
+    mirror = _mirror()
+    with mirror.client():
+        mirror.publish(_frames(), 1)
+        version, data = mirror.frame("png")
+        assert mirror.frame("png") == (version, data)
+        assert mirror.encodes == 1
+
+    with Image.open(io.BytesIO(data)) as image:
+        assert image.size == (4, 2)
+        assert image.getpixel((0, 0)) == (255, 0, 0)
+        assert image.getpixel((1, 0)) == (0, 0, 255)
+
+
+def test_http_stream_and_frame():
+    mirror = _mirror(max_fps=50)
+    mirror.start()
+    stop = threading.Event()
+    frames = _frames()
+
+    def render():
+        index = 0
+        while not stop.is_set():
+            mirror.publish(frames, index)
+            index = 1 - index
+            time.sleep(0.01)
+
+    renderer = threading.Thread(target=render)
+    renderer.start()
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{mirror.port}/frame.png", timeout=5) as response:
+            assert response.headers["Content-Type"] == "image/png"
+            with Image.open(io.BytesIO(response.read())) as image:
+                assert image.size == (4, 2)
+
+        with urllib.request.urlopen(f"http://127.0.0.1:{mirror.port}/stream.mjpg", timeout=5) as response:
+            assert response.headers["Content-Type"].startswith("multipart/x-mixed-replace")
+            assert response.readline() == b"--frame\r\n"
+            assert response.readline() == b"Content-Type: image/jpeg\r\n"
+    finally:
+        stop.set()
+        renderer.join()
+        mirror.stop()
+
+    # The stream ends with the mirror and unregisters its client
+    deadline = time.monotonic() + 2
+    while mirror.clients and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert mirror.clients == 0
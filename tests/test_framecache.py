@@ -0,0 +1,62 @@
+import sys
+from pathlib import Path
+
+root_path = Path(__file__).resolve().parents[1]
+sys.path.append(str(root_path))
+
+from Application.framecache import FrameCache
+
+
+class DummyFrames:
+    def __init__(self, nbytes):
+        self.nbytes = nbytes
+
+
+def test_get_counts_hits_and_misses():
+    cache = FrameCache(max_bytes=100)
+    loads = []
+
+    def loader():
+        loads.append(1)
+        return DummyFrames(10)
+
+    first = cache.get("happy", loader)
+    second = cache.get("happy", loader)
+
+    assert first is second
+    assert len(loads) == 1
+    assert (cache.hits, cache.misses, cache.evictions) == (1, 1, 0)
+
+
+def test_least_recently_used_is_evicted_over_budget():
+    cache = FrameCache(max_bytes=25)
+    cache.put("happy", DummyFrames(10))
+    cache.put("sleepy", DummyFrames(10))
+    cache.get("happy")
+    cache.put("hot", DummyFrames(10))
+
+    assert "sleepy" not in cache
+    assert "happy" in cache and "hot" in cache
+    assert cache.evictions == 1
+    assert cache.nbytes == 20
+
+
+def test_entry_larger_than_budget_is_kept():
+    cache = FrameCache(max_bytes=5)
+    cache.put("happy", DummyFrames(10))
+    cache.put("hot", DummyFrames(10))
+
+    assert "hot" in cache
+    assert len(cache) == 1
+    assert cache.get("missing") is None
+
+
+def test_evicted_entries_are_passed_to_on_evict():
+    evicted = []
+    cache = FrameCache(max_bytes=15, on_evict=lambda key, value: evicted.append(key))
+    cache.put("happy", DummyFrames(10))
+    cache.put("sleepy", DummyFrames(10))
+    assert evicted == ["happy"]
+
+    cache.clear()
+    assert evicted == ["happy", "sleepy"]
@@ -0,0 +1,86 @@
+import sys
+import threading
+import time
+from pathlib import Path
+
+root_path = Path(__file__).resolve().parents[1]
+sys.path.append(str(root_path))
+
+from Application.applogger import ApplicationLogger
+from Application.framecache import FrameCache
+from Application.frameloader import FrameLoader
+
+
+class DummyFrames:
+    nbytes = 1
+
+
+def test_loader_fills_cache_in_background():
+    cache = FrameCache(max_bytes=100)
+    loaded = threading.Event()
+    loader = FrameLoader(ApplicationLogger(level=100), cache, on_loaded=lambda key, frames: loaded.set())
+    loader.start()
+
+    assert loader.request("happy", DummyFrames) is True
+    assert loaded.wait(2)
+    assert "happy" in cache
+    assert not loader.is_pending("happy")
+
+    # Already cached, nothing to do
+    assert loader.request("happy", DummyFrames) is False
+    loader.stop()
+
+
+def test_switch_requests_are_served_before_prefetch():
+    cache = FrameCache(max_bytes=100)
+    order = []
+    done = threading.Semaphore(0)
+    loader = FrameLoader(ApplicationLogger(level=100), cache, on_loaded=lambda key, frames: done.release())
+
+    def load(key):
+        def run():
+            order.append(key)
+            return DummyFrames()
+        return run
+
+    loader.request("sleepy", load("sleepy"), FrameLoader.PRIORITY_PREFETCH)
+    loader.request("hot", load("hot"), FrameLoader.PRIORITY_SWITCH)
+    assert loader.request("hot", load("hot")) is False
+
+    loader.start()
+    assert done.acquire(timeout=2) and done.acquire(timeout=2)
+    loader.stop()
+
+    assert order == ["hot", "sleepy"]
+
+
+def test_failed_loads_are_retried_after_a_delay():
+    cache = FrameCache(max_bytes=100)
+    now = [0.0]
+    loaded = []
+    loader = FrameLoader(ApplicationLogger(level=100), cache, on_loaded=lambda key, frames: loaded.append(key),
+                         clock=lambda: now[0])
+    loader.start()
+
+    def fail():
+        raise OSError("broken frames")
+
+    for expected_delay in (1.0, 2.0, 4.0):
+        assert loader.request("hot", fail) is True
+        deadline = time.monotonic() + 2
+        while loader.is_pending("hot") and time.monotonic() < deadline:
+            time.sleep(0.01)
+        # Not requested again before the retry delay, which doubles with every failure
+        assert loader.request("hot", fail) is False
+        now[0] += expected_delay
+
+    assert loader.failures("hot") == 3
+    assert loader.request("hot", DummyFrames) is True
+    deadline = time.monotonic() + 2
+    while not loaded and time.monotonic() < deadline:
+        time.sleep(0.01)
+    loader.stop()
+
+    # Failures are not reported as loaded frames
+    assert loaded == ["hot"]
+    assert loader.failures("hot") == 0
@@ -0,0 +1,65 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+root_path = Path(__file__).resolve().parents[1]
+sys.path.append(str(root_path))
+
+from Application.framepack import FramePack
+
+
+def _frames():
+    return [bytes([i]) * 4 * 2 * 2 for i in range(3)]
+
+
+@pytest.mark.parametrize("compression", ["none", "zlib"])
+def test_write_and_read(tmp_path, compression):
+    path = str(tmp_path / "test.pack")
+    boxes = [None, [(0, 0, 2, 1)], [(1, 0, 4, 1), (0, 1, 1, 2)]]
+    FramePack.write(path, _frames(), 4, 2, boxes=boxes, durations=[100, 200, 300],
+                    compression=compression, metadata={"rotation": 90})
+
+    pack = FramePack(path)
+    assert (pack.width, pack.height, len(pack)) == (4, 2, 3)
+    assert pack.metadata == {"rotation": 90}
+    assert [bytes(pack.frame(i)) for i in range(3)] == _frames()
+    assert [pack.duration(i) for i in range(3)] == [100, 200, 300]
+    assert [pack.boxes(i) for i in range(3)] == boxes
+
+
+def test_uncompressed_frames_are_views(tmp_path):
+    path = str(tmp_path / "test.pack")
+    FramePack.write(path, _frames(), 4, 2)
+
+    frame = FramePack(path).frame(1)
+    assert isinstance(frame, memoryview)
+    assert frame.tobytes() == _frames()[1]
+
+
+def test_invalid_pack(tmp_path):
+    path = tmp_path / "test.pack"
+    path.write_bytes(b"not a frame pack")
+    with pytest.raises(ValueError):
+        FramePack(str(path))
+
+
+def test_invalid_compression(tmp_path):
+    assert not FramePack.is_supported("brotli")
+    with pytest.raises(ValueError):
+        FramePack.write(str(tmp_path / "test.pack"), _frames(), 4, 2, compression="brotli")
+
+
+def test_identical_frames_are_stored_once(tmp_path):
+    path = str(tmp_path / "test.pack")
+    frames = _frames()
+    FramePack.write(path, frames + frames, 4, 2)
+    single_path = str(tmp_path / "single.pack")
+    FramePack.write(single_path, frames, 4, 2)
+
+    pack = FramePack(path)
+    assert [bytes(pack.frame(i)) for i in range(6)] == frames + frames
+    assert pack.digest(0) == pack.digest(3) != pack.digest(1)
+    # Only the index entries of the repeated frames were added
+    size = (tmp_path / "test.pack").stat().st_size
+    assert size == (tmp_path / "single.pack").stat().st_size + 3 * FramePack._INDEX_ENTRY.size
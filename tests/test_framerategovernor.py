@@ -0,0 +1,64 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+root_path = Path(__file__).resolve().parents[1]
+sys.path.append(str(root_path))
+
+from Application.applogger import ApplicationLogger
+from Application.framerategovernor import FrameRateGovernor
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _governor(clock, load=0.1, lag=0.0):
+    return FrameRateGovernor(ApplicationLogger(level=100), min_fps=2, max_fps=10, interval=5.0,
+                             lag_sources=[lambda: lag], clock=clock, load_average=lambda: (load, load, load))
+
+
+def test_backs_off_when_rendering_uses_too_much_cpu():
+    clock = FakeClock()
+    governor = _governor(clock)
+
+    for _ in range(50):
+        governor.record_frame(0.08)
+    clock.now += 5
+    assert governor.update() == pytest.approx(7.5)
+    assert governor.metrics["render_usage"] == pytest.approx(0.8)
+    assert governor.decreases == 1
+
+
+def test_backs_off_on_lag_and_recovers_with_headroom():
+    clock = FakeClock()
+    lag = [2.0]
+    governor = FrameRateGovernor(ApplicationLogger(level=100), min_fps=2, max_fps=10, interval=5.0,
+                                 lag_sources=[lambda: lag[0]], clock=clock, load_average=lambda: (0.1, 0.1, 0.1))
+
+    for _ in range(20):
+        clock.now += 5
+        governor.update()
+    assert governor.fps == 2
+
+    lag[0] = 0.0
+    clock.now += 5
+    assert governor.update() == 3
+    assert governor.increases == 1
+
+
+def test_update_waits_for_interval():
+    clock = FakeClock()
+    governor = _governor(clock, load=8.0)
+    clock.now += 1
+    assert governor.update() == 10
+
+
+def test_invalid_bounds():
+    with pytest.raises(ValueError):
+        FrameRateGovernor(ApplicationLogger(level=100), min_fps=5, max_fps=2)
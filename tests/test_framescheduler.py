@@ -0,0 +1,100 @@
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+root_path = Path(__file__).resolve().parents[1]
+sys.path.append(str(root_path))
+
+from Application.framescheduler import FrameScheduler
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_frame_index_follows_elapsed_time():
+    clock = FakeClock()
+    scheduler = FrameScheduler(10, clock=clock)
+
+    assert scheduler.frame_index(36) == 0
+    clock.now += 0.1
+    assert scheduler.frame_index(36) == 1
+    clock.now += 3.6
+    assert scheduler.frame_index(36) == 1
+    assert scheduler.next_deadline() == pytest.approx(103.8)
+
+
+def test_late_frames_are_dropped():
+    clock = FakeClock()
+    scheduler = FrameScheduler(10, clock=clock)
+
+    scheduler.frame_index(36)
+    clock.now += 0.35  # writing the frame took 3.5 frame budgets
+    assert scheduler.frame_index(36) == 3
+    assert scheduler.late_frames == 1
+    assert scheduler.dropped_frames == 2
+
+
+def test_restart_and_rate_change_keep_position():
+    clock = FakeClock()
+    scheduler = FrameScheduler(10, clock=clock)
+    clock.now += 1.0
+    scheduler.frame_rate = 20
+    assert scheduler.frame_index(100) == 10
+    scheduler.restart()
+    assert scheduler.frame_index(100) == 0
+
+    with pytest.raises(ValueError):
+        scheduler.frame_rate = 0
+
+
+def test_wait_returns_early_on_wake_event():
+    scheduler = FrameScheduler(0.1)
+    scheduler.frame_index(10)
+    event = threading.Event()
+    event.set()
+
+    assert scheduler.wait(event) is False
+    assert not event.is_set()
+
+
+def test_wait_sleeps_until_deadline():
+    scheduler = FrameScheduler(200)
+    scheduler.frame_index(10)
+
+    assert scheduler.wait() is True
+    assert scheduler.stats["frames_shown"] == 1
+    assert scheduler.jitter == 0.0
+
+
+def test_same_tick_is_counted_once():
+    clock = FakeClock()
+    scheduler = FrameScheduler(10, clock=clock)
+
+    scheduler.frame_index(36)
+    clock.now += 0.05
+    scheduler.frame_index(36)
+
+    assert scheduler.frames_shown == 1
+
+
+def test_lower_display_rate_keeps_animation_speed():
+    clock = FakeClock()
+    scheduler = FrameScheduler(10, clock=clock)
+    scheduler.display_rate = 5
+
+    assert scheduler.frame_index(36) == 0
+    assert scheduler.next_deadline() == pytest.approx(100.2)
+    clock.now += 0.2
+    assert scheduler.frame_index(36) == 2
+    assert scheduler.position == 2
+    assert scheduler.dropped_frames == 0
+
+    scheduler.display_rate = None
+    assert scheduler.display_rate == 10
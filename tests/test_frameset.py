@@ -0,0 +1,214 @@
+import sys
+from pathlib import Path
+
+import pytest
+from PIL import Image
+
+root_path = Path(__file__).resolve().parents[1]
+sys.path.append(str(root_path))
+
+from Application.frameset import FrameSet, IndexedFrameSet
+
+
+def _write_frames(folder, count, size=(4, 2)):
+    for i in range(count):
+        Image.new("RGB", size, (i * 10, 0, 0)).save(folder / f"frame{i + 1:03}.png")
+
+
+def test_load_converts_frames_to_display_buffers(tmp_path):
+    _write_frames(tmp_path, 3)
+    frames = FrameSet.load(str(tmp_path), rotation=90)
+
+    assert len(frames) == 3
+    assert (frames.width, frames.height) == (2, 4)
+    assert all(len(frame) == 2 * 4 * 2 for frame in frames)
+    assert frames.nbytes == 3 * 16
+
+
+def test_load_only_keeps_every_nth_frame(tmp_path):
+    _write_frames(tmp_path, 10)
+    frames = FrameSet.load(str(tmp_path), frames_skip=5)
+
+    assert len(frames) == 2
+    # frame001 and frame006 have red values 0 and 50
+    assert frames[0][:2] == bytes([0, 0])
+    assert frames[1][:2] == bytes([50 & 0xF8, 0])
+
+
+def test_load_transforms_source_frames(tmp_path):
+    image = Image.new("RGB", (4, 2))
+    image.putpixel((0, 0), (255, 255, 255))
+    image.save(tmp_path / "frame001.png")
+
+    frames = FrameSet.load(str(tmp_path), shift_x=1)
+
+    # The white pixel moved one pixel to the right
+    assert frames[0][:2] == bytes([0, 0])
+    assert frames[0][2:4] == bytes([0xFF, 0xFF])
+
+
+def test_regions_only_cover_changed_pixels(tmp_path):
+    for i in range(3):
+        image = Image.new("RGB", (8, 8))
+        image.putpixel((i, 1), (255, 255, 255))
+        image.save(tmp_path / f"frame{i + 1:03}.png")
+
+    frames = FrameSet.load(str(tmp_path))
+
+    # Frame 1 after frame 0: pixel (0, 1) is cleared, pixel (1, 1) is set
+    assert frames.regions(1, 0) == [((0, 1, 2, 2), frames[1][16 + 0:16 + 4])]
+    # Unknown display content, so the full frame is written
+    assert frames.regions(2, None) == [((0, 0, 8, 8), frames[2])]
+    assert frames.regions(2, 2) == []
+
+
+def test_regions_fall_back_to_full_frame_for_large_changes(tmp_path):
+    Image.new("RGB", (4, 4), (0, 0, 0)).save(tmp_path / "frame001.png")
+    Image.new("RGB", (4, 4), (255, 255, 255)).save(tmp_path / "frame002.png")
+
+    frames = FrameSet.load(str(tmp_path))
+
+    assert frames.updates == [None, None]
+    assert frames.regions(1, 0) == [((0, 0, 4, 4), frames[1])]
+
+
+def test_regions_combine_skipped_frames(tmp_path):
+    for i in range(4):
+        image = Image.new("RGB", (8, 8))
+        image.putpixel((i, 1), (255, 255, 255))
+        image.save(tmp_path / f"frame{i + 1:03}.png")
+
+    frames = FrameSet.load(str(tmp_path))
+    regions = frames.regions(2, 0)
+
+    assert [box for box, _ in regions] == [(0, 1, 2, 2), (1, 1, 3, 2)]
+    # The buffers are cut out of the target frame
+    assert regions[1][1] == frames[2][16 + 2:16 + 6]
+
+
+def test_pack_round_trip(tmp_path):
+    for i in range(3):
+        image = Image.new("RGB", (8, 8))
+        image.putpixel((i, 1), (255, 255, 255))
+        image.save(tmp_path / f"frame{i + 1:03}.png")
+
+    frames = FrameSet.load(str(tmp_path), rotation=90)
+    pack_path = str(tmp_path / "test.pack")
+    frames.save(pack_path, metadata={"rotation": 90})
+
+    packed = FrameSet.load_pack(pack_path, metadata={"rotation": 90})
+    assert (packed.width, packed.height) == (frames.width, frames.height)
+    assert [bytes(frame) for frame in packed] == list(frames)
+    assert [[(box, bytes(buffer)) for box, buffer in update] for update in packed.updates] == frames.updates
+    assert packed.regions(2, 1) == frames.regions(2, 1)
+
+
+def test_pack_with_other_metadata_is_rejected(tmp_path):
+    _write_frames(tmp_path, 2)
+    pack_path = str(tmp_path / "test.pack")
+    FrameSet.load(str(tmp_path)).save(pack_path, metadata={"frames_skip": 1})
+
+    with pytest.raises(ValueError):
+        FrameSet.load_pack(pack_path, metadata={"frames_skip": 5})
+
+
+def test_indexed_frames_match_rgb565_frames(tmp_path):
+    colors = [(255, 0, 0), (0, 255, 0), (0, 0, 255), (255, 255, 255)]
+    for i in range(4):
+        image = Image.new("RGB", (8, 8))
+        image.paste(colors[i], (i, 2, i + 2, 4))
+        image.save(tmp_path / f"frame{i + 1:03}.png")
+
+    frames = FrameSet.load(str(tmp_path), rotation=90)
+    indexed = IndexedFrameSet.from_frame_set(frames)
+
+    # Few colors: the palette is exact and the deltas are kept
+    assert indexed.nbytes * 2 == frames.nbytes
+    assert [bytes(frame) for frame in indexed] == list(frames)
+    for index, previous_index in ((1, 0), (3, 0), (0, 3), (2, None)):
+        assert [(box, bytes(buffer)) for box, buffer in indexed.regions(index, previous_index)] == \
+            frames.regions(index, previous_index)
+
+
+def test_full_frame_regions_are_not_rebuilt(tmp_path):
+    _write_frames(tmp_path, 2)
+    frames = FrameSet.load(str(tmp_path))
+
+    assert frames.regions(1, None) is frames.regions(1, None)
+
+
+def test_crop_returns_rgb565_for_indexed_frames(tmp_path):
+    _write_frames(tmp_path, 2, size=(8, 8))
+    frames = FrameSet.load(str(tmp_path))
+    indexed = IndexedFrameSet.from_frame_set(frames)
+
+    assert bytes(indexed.crop(1, (2, 2, 5, 4))) == frames.crop(1, (2, 2, 5, 4))
+    assert len(frames.crop(1, (2, 2, 5, 4))) == 3 * 2 * 2
+
+
+def _write_colors(folder, colors, size=(4, 2)):
+    for i, color in enumerate(colors):
+        Image.new("RGB", size, color).save(folder / f"frame{i + 1:03}.png")
+
+
+def test_identical_frames_are_held(tmp_path):
+    _write_colors(tmp_path, [(0, 0, 0)] * 3 + [(255, 0, 0)] * 2 + [(0, 0, 0)])
+    frames = FrameSet.load(str(tmp_path))
+
+    assert len(frames.frames) == 3
+    assert frames.holds == [3, 2, 1]
+    assert len(frames) == 6
+    assert frames.tick_frames == [0, 0, 0, 1, 1, 2]
+    # Nothing is written while a frame is held
+    assert frames.regions(2, 1) == []
+    assert frames.regions(3, 2) != []
+    # The first and last frame are the same content and share one buffer
+    assert frames.frames[0] is frames.frames[2]
+    assert frames.nbytes == 2 * 4 * 2 * 2 + sum(len(buffer) for update in frames.updates for _, buffer in update or [])
+
+
+def test_pack_keeps_hold_durations(tmp_path):
+    _write_colors(tmp_path, [(0, 0, 0)] * 3 + [(255, 0, 0)])
+    frames = FrameSet.load(str(tmp_path))
+    pack_path = str(tmp_path / "test.pack")
+    frames.save(pack_path, duration=100)
+
+    assert FrameSet.load_pack(pack_path, duration=100).tick_frames == [0, 0, 0, 1]
+    # At half the frame rate, the frames are held for half the ticks
+    assert FrameSet.load_pack(pack_path, duration=200).holds == [2, 1]
+
+
+def test_shared_frames_are_reused(tmp_path):
+    (tmp_path / "happy").mkdir()
+    (tmp_path / "sleepy").mkdir()
+    _write_colors(tmp_path / "happy", [(0, 0, 0), (255, 0, 0)])
+    _write_colors(tmp_path / "sleepy", [(0, 0, 255), (255, 0, 0)])
+
+    happy = FrameSet.load(str(tmp_path / "happy"))
+    sleepy = FrameSet.load(str(tmp_path / "sleepy"), shared=happy.shared_frames())
+    assert sleepy.frames[1] is happy.frames[1]
+    assert sleepy.frames[0] is not happy.frames[0]
+
+    pack_path = str(tmp_path / "sleepy.pack")
+    sleepy.save(pack_path)
+    packed = FrameSet.load_pack(pack_path, shared=happy.shared_frames())
+    assert packed.frames[1] is happy.frames[1]
+
+
+def test_indexed_frames_keep_digests_and_share_frames(tmp_path):
+    (tmp_path / "happy").mkdir()
+    (tmp_path / "sleepy").mkdir()
+    _write_colors(tmp_path / "happy", [(0, 0, 0), (255, 0, 0)])
+    _write_colors(tmp_path / "sleepy", [(255, 0, 0), (0, 0, 0)])
+
+    happy = IndexedFrameSet.from_frame_set(FrameSet.load(str(tmp_path / "happy")))
+    assert happy.digests is not None
+    assert len(happy.shared_frames()) == 2
+
+    # Same colors, so the same exact palette: the index buffers are shared
+    sleepy = IndexedFrameSet.from_frame_set(FrameSet.load(str(tmp_path / "sleepy")), shared=happy.shared_frames())
+    assert sleepy.frames[0] is happy.frames[1]
+    assert [bytes(frame) for frame in sleepy] == list(FrameSet.load(str(tmp_path / "sleepy")))
+
+    # Index buffers are never taken for RGB565 frames
+    assert FrameSet.load(str(tmp_path / "sleepy"), shared=happy.shared_frames()).frames[0] is not happy.frames[1]
@@ -0,0 +1,117 @@
+import sys
+from pathlib import Path
+
+import pytest
+from PIL import Image
+
+root_path = Path(__file__).resolve().parents[1]
+sys.path.append(str(root_path))
+
+from Application.imageprocessing import (changed_regions, crop_buffer, crop_rgb565, expand_indexed, image_to_rgb565,
+                                         rgb565_lookup_tables, shift_and_wrap, transform_image)
+
+ASSET_FRAME = root_path / "Application" / "assets" / "emotion" / "happy" / "frame001.png"
+
+
+def reference_shift_and_wrap(image, x):
+    """Original per-pixel implementation, kept as regression oracle."""
+    data = image.load()
+    new_data = {}
+
+    for y in range(image.size[1]):
+        for x_new in range(image.size[0]):
+            new_data[(x_new, y)] = data[((x_new - x) % image.size[0], y)]
+
+    new_image = Image.new(image.mode, image.size)
+    new_image.putdata(
+        [
+            new_data[(x, y)]
+            for y in range(image.size[1])
+            for x in range(image.size[0])
+        ]
+    )
+
+    return new_image
+
+
+@pytest.mark.parametrize("shift", [-25, -1, 1, 25, 319, 345, -700])
+def test_shift_and_wrap_matches_reference(shift):
+    with Image.open(ASSET_FRAME) as image:
+        expected = reference_shift_and_wrap(image, shift)
+        result = shift_and_wrap(image, shift)
+
+    assert result.mode == expected.mode
+    assert result.size == expected.size
+    assert result.tobytes() == expected.tobytes()
+
+
+def test_transform_image_matches_reference():
+    with Image.open(ASSET_FRAME) as image:
+        expected = reference_shift_and_wrap(image.rotate(180), -25)
+        result = transform_image(image, rotate=180, shift_x=-25)
+
+    assert result.tobytes() == expected.tobytes()
+
+
+def test_transform_image_without_changes_returns_source():
+    image = Image.new("RGB", (4, 2))
+    assert transform_image(image) is image
+
+
+def color565(r, g, b):
+    return (r & 0xF8) << 8 | (g & 0xFC) << 3 | b >> 3
+
+
+def test_image_to_rgb565_packs_big_endian():
+    image = Image.new("RGB", (2, 1))
+    image.putdata([(255, 0, 0), (18, 200, 77)])
+    buffer = image_to_rgb565(image)
+    assert buffer == color565(255, 0, 0).to_bytes(2, "big") + color565(18, 200, 77).to_bytes(2, "big")
+
+
+def test_image_to_rgb565_uses_native_orientation():
+    with Image.open(ASSET_FRAME) as image:
+        buffer = image_to_rgb565(image, rotation=90)
+        rotated = image.convert("RGB").rotate(90, expand=True)
+
+    expected = b"".join(color565(*pixel).to_bytes(2, "big") for pixel in rotated.getdata())
+    assert buffer == expected
+
+
+def test_image_to_rgb565_rejects_invalid_rotation():
+    with pytest.raises(ValueError):
+        image_to_rgb565(Image.new("RGB", (2, 2)), rotation=45)
+
+
+def test_changed_regions_splits_into_bands():
+    previous = Image.new("RGB", (10, 40))
+    current = previous.copy()
+    current.putpixel((2, 3), (255, 0, 0))
+    current.putpixel((7, 35), (0, 0, 255))
+    current.putpixel((0, 20), (1, 1, 1))  # lost in RGB565
+
+    assert changed_regions(previous, current, band_height=16) == [(2, 3, 3, 4), (7, 35, 8, 36)]
+
+
+def test_crop_rgb565_extracts_window():
+    image = Image.new("RGB", (4, 3))
+    image.putpixel((1, 1), (255, 255, 255))
+    image.putpixel((2, 2), (255, 0, 0))
+    buffer = image_to_rgb565(image)
+
+    assert crop_rgb565(buffer, 4, (1, 1, 3, 3)) == image_to_rgb565(image.crop((1, 1, 3, 3)))
+
+
+def test_expand_indexed_matches_rgb565():
+    palette = [255, 0, 0, 0, 255, 0, 12, 34, 56]
+    image = Image.new("P", (3, 1))
+    image.putpalette(palette)
+    image.putdata([2, 0, 1])
+
+    high, low = rgb565_lookup_tables(palette)
+    assert expand_indexed(image.tobytes(), high, low) == image_to_rgb565(image.convert("RGB"))
+
+
+def test_crop_buffer_with_one_byte_per_pixel():
+    buffer = bytes(range(12))  # 4 x 3 pixels
+    assert crop_buffer(buffer, 4, (1, 1, 3, 3), 1) == bytes([5, 6, 9, 10])
@@ -0,0 +1,86 @@
+import logging
+import sys
+import time
+from pathlib import Path
+
+import pytest
+from PIL import Image
+
+root_path = Path(__file__).resolve().parents[1]
+sys.path.append(str(root_path))
+
+from Application.applogger import ApplicationLogger
+from Application.displaymanager import Emotions
+from Application.imageprocessing import image_to_rgb565, rgb565_to_image
+from Application.renderprocess import RenderProcess
+
+
+def _create_assets(folder, colors, count=1):
+    for emotion in Emotions:
+        emotion_folder = folder / emotion.value
+        emotion_folder.mkdir(parents=True)
+        for i in range(count):
+            Image.new("RGB", (320, 240), colors[emotion]).save(emotion_folder / f"frame{i + 1:03}.png")
+
+
+def _shown_color(path):
+    # The file backend writes the RGB565 framebuffer in native orientation (240 x 320)
+    data = path.read_bytes() if path.exists() else b""
+    if len(data) != 240 * 320 * 2:
+        return None  # The first frame is still being written
+    return rgb565_to_image(data, (240, 320)).getpixel((120, 160))
+
+
+def test_render_process_shows_emotions(tmp_path):
+    colors = {emotion: (i * 40, 255 - i * 40, 0) for i, emotion in enumerate(Emotions)}
+    _create_assets(tmp_path / "emotion", colors)
+    expected = rgb565_to_image(image_to_rgb565(Image.new("RGB", (1, 1), colors[Emotions.HOT])), (1, 1)).getpixel((0, 0))
+    framebuffer = tmp_path / "framebuffer.rgb565"
+
+    render_process = RenderProcess(ApplicationLogger(level=100), log_level=100,
+                                   governor_settings={"min_fps": 2, "max_fps": 20}, lag_sources=[lambda: 0.0],
+                                   backend="file", backend_path=str(framebuffer), frame_rate=20,
+                                   assets_folder=str(tmp_path / "emotion"), temp_folder=str(tmp_path / "temp"))
+    render_process.start()
+    try:
+        render_process.set_emotion(Emotions.HOT)
+        assert render_process.current_emotion == Emotions.HOT
+        shown = False
+        deadline = time.monotonic() + 20
+        while not shown and time.monotonic() < deadline:
+            shown = _shown_color(framebuffer) == expected
+            time.sleep(0.05)
+        assert shown
+        assert render_process.metrics["frames"]["frames_shown"] > 0
+    finally:
+        render_process.stop()
+
+    assert not render_process.is_alive()
+    assert render_process._process.exitcode == 0
+    assert render_process.metrics["frames"]["frames_shown"] > 0
+
+
+def test_images_are_prepared_with_worker_processes(tmp_path, capfd):
+    colors = {emotion: (i * 40, 255 - i * 40, 0) for i, emotion in enumerate(Emotions)}
+    _create_assets(tmp_path / "emotion", colors, count=3)
+
+    render_process = RenderProcess(ApplicationLogger(level=100), log_level=logging.WARNING, backend="null",
+                                   assets_folder=str(tmp_path / "emotion"), temp_folder=str(tmp_path / "temp"),
+                                   preprocess_workers=2)
+    render_process.start()
+    try:
+        assert render_process.wait_prepared(timeout=60)
+    finally:
+        render_process.stop()
+
+    # The process pool of the preprocessing could be started in the render process, no in-process fallback
+    captured = capfd.readouterr()
+    assert "Retrying without worker processes" not in captured.out + captured.err
+    assert render_process._process.exitcode == 0
+
+
+def test_invalid_emotion_is_rejected():
+    render_process = RenderProcess(ApplicationLogger(level=100))
+    with pytest.raises(ValueError):
+        render_process.set_emotion("happy")
+    render_process.stop()
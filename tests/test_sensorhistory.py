@@ -0,0 +1,105 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+root_path = Path(__file__).resolve().parents[1]
+sys.path.append(str(root_path))
+
+from Application.sensorhistory import RingBuffer, SensorHistory
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_ring_buffer_overwrites_the_oldest_rows():
+    buffer = RingBuffer(4)
+    for i in range(6):
+        buffer.append(float(i), i * 10)
+
+    assert len(buffer) == 4
+    assert buffer.oldest == 2.0
+    assert buffer.last() == (5.0, (50.0,))
+    times, values = buffer.window(3.0)
+    # The window wraps around the end of the arrays
+    assert list(times) == [3.0, 4.0, 5.0]
+    assert list(values["value"]) == [30.0, 40.0, 50.0]
+    assert list(buffer.window(10.0)[0]) == []
+    assert list(buffer.window(0.0)[0]) == [2.0, 3.0, 4.0, 5.0]
+
+
+def test_ring_buffer_rejects_invalid_capacity():
+    with pytest.raises(ValueError):
+        RingBuffer(0)
+
+
+def test_query_over_raw_samples():
+    clock = _Clock()
+    history = SensorHistory(raw_capacity=100, clock=clock)
+    for second in range(60):
+        clock.now = float(second)
+        history.append("temperature", 20.0 + second * 0.5)
+
+    summary = history.query("temperature", 10)
+    assert summary["count"] == 11
+    assert summary["min"] == 44.5
+    assert summary["max"] == 49.5
+    assert summary["mean"] == pytest.approx(47.0)
+    assert summary["slope"] == pytest.approx(0.5)
+    assert history.latest("temperature") == (0.0, 49.5)
+
+
+def test_unknown_channel_and_missing_values():
+    history = SensorHistory()
+    history.append("light_intensity", None)
+
+    assert history.query("light_intensity", 60) is None
+    assert history.latest("light_intensity") is None
+
+
+def test_long_windows_use_downsampled_tiers():
+    clock = _Clock()
+    history = SensorHistory(raw_capacity=30, tiers=((10, 30), (60, 100)), clock=clock)
+    for second in range(1200):
+        clock.now = float(second)
+        history.append("soil", float(second % 100))
+
+    # 20 minutes do not fit into the raw samples (30 s) nor the 10 s tier (5 min)
+    summary = history.query("soil", 1200)
+    assert summary["count"] == 20
+    assert summary["min"] == 0.0
+    assert summary["max"] == 99.0
+    assert summary["mean"] == pytest.approx(49.5, abs=5)
+
+    # 2 minutes are answered from the 10 s buckets
+    summary = history.query("soil", 120)
+    assert 12 <= summary["count"] <= 14
+    assert summary["min"] == 0.0
+
+
+def test_slope_from_tiers():
+    clock = _Clock()
+    history = SensorHistory(raw_capacity=10, tiers=((10, 100),), clock=clock)
+    for second in range(600):
+        clock.now = float(second)
+        history.append("pressure", 1000.0 + second / 60)
+
+    assert history.query("pressure", 300)["slope"] == pytest.approx(1 / 60, rel=1e-3)
+
+
+def test_default_history_fits_a_day_in_a_few_hundred_kb():
+    clock = _Clock()
+    history = SensorHistory(clock=clock)
+    channels = ["temperature", "pressure", "light_intensity"] + [f"ads1x15_{i}" for i in range(4)]
+    for channel in channels:
+        history.append(channel, 1.0)
+
+    assert sorted(history.channels) == sorted(channels)
+    assert history.nbytes < 400 * 1024
+    tier_seconds = max(interval * capacity for interval, capacity in SensorHistory.TIERS)
+    assert tier_seconds >= 24 * 3600
@@ -0,0 +1,77 @@
+import sys
+from pathlib import Path
+
+from PIL import Image
+
+root_path = Path(__file__).resolve().parents[1]
+sys.path.append(str(root_path))
+
+from Application.imageprocessing import crop_rgb565, image_to_rgb565, rgb565_to_image
+from Application.sensoroverlay import GlyphCache, SensorOverlay, _subtract
+
+
+def _frame(color=(0, 0, 255)):
+    # Native orientation of the display (rotation 90)
+    return image_to_rgb565(Image.new("RGB", (240, 320), color))
+
+
+def test_glyphs_are_rendered_once():
+    cache = GlyphCache()
+    first = cache.render("21.5 °C")
+    rendered = cache.rendered_glyphs
+    second = cache.render("25.1 °C")
+
+    assert cache.rendered_glyphs == rendered
+    assert first.size == second.size
+    assert first.getbbox() is not None
+
+
+def test_update_only_renders_changed_text():
+    overlay = SensorOverlay()
+    assert overlay.update(temperature=21.04, light_intensity=120.2, moisture=40)
+    assert not overlay.update(temperature=20.96, light_intensity=119.8, moisture=40.2)
+    assert overlay.version == 1
+    assert overlay.update(temperature=21.2, light_intensity=None, moisture=40)
+    assert overlay.text == "21.2 °C   - lx   40 %"
+
+
+def test_apply_clips_windows_and_adds_overlay():
+    overlay = SensorOverlay()
+    # The bottom strip of the landscape display is the right edge of the native frame
+    assert overlay.native_box == (212, 0, 240, 320)
+
+    frame = _frame()
+    crop = lambda box: crop_rgb565(frame, 240, box)
+    assert overlay.apply([((0, 0, 240, 320), frame)], crop) == [((0, 0, 240, 320), frame)]  # No values yet
+
+    overlay.update(temperature=21.0, light_intensity=100, moisture=50)
+    windows = overlay.apply([((0, 0, 240, 320), frame), ((0, 0, 10, 10), frame[:200])], crop)
+
+    assert [box for box, _ in windows] == [(0, 0, 212, 320), (0, 0, 10, 10), (212, 0, 240, 320)]
+    assert len(windows[0][1]) == 212 * 320 * 2
+
+    # Text pixels are drawn, the background is dimmed
+    strip = rgb565_to_image(windows[2][1], (28, 320))
+    colors = {color for _, color in strip.getcolors(10000)}
+    assert any(color[0] > 200 for color in colors)
+    assert any(color[0] == 0 and 100 < color[2] < 140 for color in colors)
+
+
+def test_overlay_is_only_written_when_needed():
+    overlay = SensorOverlay()
+    overlay.update(temperature=21.0)
+    frame = _frame()
+    crop = lambda box: crop_rgb565(frame, 240, box)
+
+    assert len(overlay.apply([], crop)) == 1
+    assert overlay.apply([], crop) == []
+    assert overlay.apply([((0, 0, 10, 10), frame[:200])], crop) == [((0, 0, 10, 10), frame[:200])]
+    assert len(overlay.apply([((200, 0, 220, 10), frame[:400])], crop)) == 2
+
+    overlay.update(temperature=22.0)
+    assert len(overlay.apply([], crop)) == 1
+
+
+def test_subtract():
+    assert _subtract((0, 0, 10, 10), (2, 2, 4, 4)) == [(0, 0, 10, 2), (0, 4, 10, 10), (0, 2, 2, 4), (4, 2, 10, 4)]
+    assert _subtract((0, 0, 10, 10), (0, 0, 10, 10)) == []
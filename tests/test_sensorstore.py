@@ -0,0 +1,187 @@
+import logging
+import os
+import sys
+import time
+from array import array
+from pathlib import Path
+
+import pytest
+
+root_path = Path(__file__).resolve().parents[1]
+sys.path.append(str(root_path))
+
+from Application.applogger import ApplicationLogger
+from Application.sensorstore import SensorStore, decode_samples, encode_samples
+
+DAY = 86400
+
+
+class _Clock:
+    def __init__(self, now=10 * DAY):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def _store(path, clock, **kwargs):
+    return SensorStore(ApplicationLogger(level=logging.ERROR), str(path), clock=clock, **kwargs)
+
+
+def test_encoding_round_trip():
+    times_ms = array("q", [1000, 2000, 3001, 3999, 3999, 10000, 9000])
+    bits = array("I", array("f", [20.5, 20.5, 20.25, -3.0, 1e9, 0.0, 20.5]).tobytes())
+    data = encode_samples(times_ms, bits)
+
+    decoded_times, decoded_bits = decode_samples(bytes(data), len(times_ms), times_ms[0], bits[0])
+    assert decoded_times == times_ms
+    assert decoded_bits == bits
+
+
+def test_regular_samples_are_compressed():
+    times_ms = array("q", range(0, 3600 * 1000, 1000))
+    bits = array("I", array("f", [20.0 + (i // 60) * 0.25 for i in range(3600)]).tobytes())
+
+    # Constant interval and mostly repeated values: about two bytes per sample instead of twelve
+    assert len(encode_samples(times_ms, bits)) < 2.1 * len(times_ms)
+
+
+def test_samples_survive_a_restart(tmp_path):
+    clock = _Clock()
+    store = _store(tmp_path, clock)
+    for second in range(100):
+        store.append("temperature", 20.0 + second / 100, timestamp=clock.now + second)
+    store.append("light_intensity", 120.0, timestamp=clock.now)
+    store.flush()
+
+    assert store.stats["samples"] == 101
+    assert store.stats["bytes_per_sample"] < 6
+
+    reopened = _store(tmp_path, clock)
+    times, values = reopened.query("temperature", clock.now + 10, clock.now + 20)
+    assert list(times) == [clock.now + second for second in range(10, 20)]
+    assert values[0] == pytest.approx(20.1)
+    assert list(reopened.query("light_intensity", 0, clock.now + 1)[1]) == [120.0]
+
+
+def test_query_includes_samples_not_written_yet(tmp_path):
+    clock = _Clock()
+    store = _store(tmp_path, clock)
+    store.append("temperature", 20.0, timestamp=clock.now - 1)
+    store.flush()
+    store.append("temperature", 21.0, timestamp=clock.now)
+
+    assert list(store.query("temperature", 0)[1]) == [20.0, 21.0]
+    assert store.flushes == 1
+
+
+def test_incomplete_block_is_cut_off(tmp_path):
+    clock = _Clock()
+    store = _store(tmp_path, clock)
+    store.append("temperature", 20.0, timestamp=clock.now)
+    store.flush()
+    segment = next((tmp_path / "raw").iterdir())
+    complete_size = segment.stat().st_size
+    store.append("temperature", 21.0, timestamp=clock.now + 1)
+    store.append("temperature", 22.0, timestamp=clock.now + 2)
+    store.flush()
+
+    # Power loss while the second block was written
+    with open(segment, "r+b") as f:
+        f.truncate(segment.stat().st_size - 2)
+
+    reopened = _store(tmp_path, clock)
+    assert list(reopened.query("temperature", 0, clock.now + 10)[1]) == [20.0]
+    reopened.append("temperature", 23.0, timestamp=clock.now + 3)
+    reopened.flush()
+    assert segment.stat().st_size > complete_size
+    assert list(reopened.query("temperature", 0, clock.now + 10)[1]) == [20.0, 23.0]
+
+
+def test_samples_are_split_into_segments(tmp_path):
+    clock = _Clock()
+    store = _store(tmp_path, clock)
+    for hour in range(48):
+        store.append("soil", float(hour), timestamp=clock.now + hour * 3600)
+    store.flush()
+
+    assert store.stats["segments"] == 2
+    assert len(store.query("soil", clock.now + DAY, clock.now + 2 * DAY)[0]) == 24
+
+
+def test_compaction_rolls_up_old_segments(tmp_path):
+    clock = _Clock(now=0)
+    store = _store(tmp_path, clock, raw_retention=2 * DAY, aggregate_retention=5 * DAY)
+    for minute in range(4 * 24 * 60):
+        store.append("soil", float(minute % 60), timestamp=minute * 60)
+    store.flush()
+
+    clock.now = 4 * DAY
+    store.compact()
+
+    # The first two days are only kept as hourly aggregates
+    assert store.stats["segments"] == 2
+    assert len(store.query("soil", 0, 2 * DAY)[0]) == 0
+    hourly = store.hourly("soil", 0, 3 * DAY)
+    assert [hour for hour, *_ in hourly] == [hour * 3600 for hour in range(72)]
+    assert hourly[0] == (0, 60, pytest.approx(29.5), 0.0, 59.0)
+    # The third day is rolled up from the raw samples
+    assert hourly[60] == (60 * 3600, 60, pytest.approx(29.5), 0.0, 59.0)
+
+    # Compacting again does not add the hours a second time
+    store.compact()
+    assert len(store.hourly("soil", 0, 2 * DAY)) == 48
+
+    clock.now = 8 * DAY
+    store.compact()
+    assert store.stats["segments"] == 0
+    # Aggregates older than 5 days are dropped
+    assert [hour for hour, *_ in store.hourly("soil", 0)][0] == 3 * DAY
+
+
+def test_background_thread_flushes_full_batches(tmp_path):
+    store = SensorStore(ApplicationLogger(level=logging.ERROR), str(tmp_path), flush_interval=60, max_pending=10)
+    store.start()
+    for i in range(10):
+        store.append("pressure", 1000.0 + i)
+
+    deadline = time.monotonic() + 2
+    while store.flushes == 0 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    store.stop()
+
+    assert store.flushes >= 1
+    assert len(store.query("pressure", 0)[0]) == 10
+    assert os.listdir(tmp_path / "raw")
+
+
+def test_invalid_segment_length_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        _store(tmp_path, _Clock(), segment_seconds=1000)
+
+
+def test_compaction_decodes_without_holding_the_file_lock(tmp_path):
+    clock = _Clock(now=0)
+    store = _store(tmp_path, clock, raw_retention=DAY)
+    for minute in range(60):
+        store.append("soil", 1.0, timestamp=minute * 60)
+    store.flush()
+    clock.now = 3 * DAY
+
+    accumulate = store._accumulate
+    locked = []
+
+    def accumulate_and_flush(hours, times, values):
+        locked.append(store._io_lock.locked())
+        if len(locked) == 1:
+            # A flush while the segment is rolled up, with a sample of the same (old) segment
+            store.append("soil", 3.0, timestamp=30)
+            store.flush()
+        accumulate(hours, times, values)
+
+    store._accumulate = accumulate_and_flush
+    store.compact()
+
+    assert locked[0] is False
+    assert store.stats["segments"] == 0
+    assert store.hourly("soil", 0, DAY) == [(0, 61, pytest.approx(63 / 61), 1.0, 3.0)]
@@ -0,0 +1,93 @@
+import random
+import sys
+from pathlib import Path
+
+import pytest
+
+root_path = Path(__file__).resolve().parents[1]
+sys.path.append(str(root_path))
+
+from Application.configuration import Configuration
+from Application.signalfilter import EMAFilter, Hysteresis, KalmanFilter, MedianFilter, create_filter
+
+
+def test_ema_filter():
+    ema = EMAFilter(0.5)
+
+    assert ema.update(10) == 10
+    assert ema.update(20) == 15
+    assert ema.update(20) == 17.5
+
+
+def test_median_filter_removes_spikes():
+    median = MedianFilter(3)
+
+    assert [median.update(value) for value in (10, 11, 500, 12, 13, 13)] == [10, 10, 11, 12, 13, 13]
+    # The window never holds more than ``size`` samples
+    assert len(median._sorted) == 3
+
+
+def test_kalman_filter_converges_and_reduces_noise():
+    generator = random.Random(1)
+    kalman = KalmanFilter(process_variance=1e-4, measurement_variance=0.25)
+    samples = [20.0 + generator.gauss(0, 0.5) for _ in range(500)]
+    filtered = [kalman.update(sample) for sample in samples]
+
+    assert filtered[-1] == pytest.approx(20.0, abs=0.15)
+    tail = filtered[100:]
+    assert max(tail) - min(tail) < (max(samples) - min(samples)) / 4
+
+
+def test_create_filter_chain():
+    chain = create_filter("median:3 + ema:0.5")
+
+    assert [type(stage) for stage in chain.filters] == [MedianFilter, EMAFilter]
+    assert [chain.update(value) for value in (10, 500, 10)] == [10, 10, 10]
+    assert isinstance(create_filter("Kalman:0.001:0.1").filters[0], KalmanFilter)
+
+
+@pytest.mark.parametrize("spec", ["lowpass:3", "ema", "ema:0", "median:0", "kalman:0.1", "ema:x"])
+def test_invalid_filters_are_rejected(spec):
+    with pytest.raises(ValueError):
+        create_filter(spec)
+
+
+def test_default_filters_are_valid():
+    for spec in Configuration().SENSOR_FILTERS.values():
+        create_filter(spec)
+
+
+def test_hysteresis_above():
+    hot = Hysteresis(24.0, band=0.5)
+
+    assert [hot.update(value) for value in (23.9, 24.1, 23.9, 23.6, 23.4, 24.0, 24.1)] == \
+        [False, True, True, True, False, False, True]
+    assert hot.update(None) is False
+
+
+def test_hysteresis_below_and_test_keeps_state():
+    night = Hysteresis(5.0, band=2.0, below=True)
+
+    assert night.update(4.0)
+    assert night.test(6.5)
+    assert not night.test(7.5)
+    # ``test`` did not release the state
+    assert night.active
+    assert not night.update(7.5)
+
+
+def test_filters_and_hysteresis_reduce_switches():
+    generator = random.Random(2)
+    # Soil value close to the dry threshold with sensor noise and a few spikes
+    samples = [14500 + generator.gauss(0, 120) + (3000 if i % 97 == 0 else 0) for i in range(1000)]
+
+    def switches(values, threshold):
+        states = [threshold.update(value) for value in values]
+        return sum(1 for previous, state in zip(states, states[1:]) if previous != state)
+
+    soil_filter = create_filter("median:5+ema:0.3")
+    raw_switches = switches(samples, Hysteresis(14500))
+    filtered_switches = switches([soil_filter.update(value) for value in samples], Hysteresis(14500, band=300))
+
+    assert raw_switches > 100
+    assert filtered_switches < raw_switches / 10
@@ -0,0 +1,49 @@
+import sys
+from pathlib import Path
+
+root_path = Path(__file__).resolve().parents[1]
+sys.path.append(str(root_path))
+
+from Application.stagetimer import Histogram, StageTimer
+
+
+def test_histogram_buckets():
+    histogram = Histogram(bounds_ms=(1, 10, 100))
+    for seconds in (0.0005, 0.001, 0.005, 0.05, 0.5):
+        histogram.record(seconds)
+
+    assert histogram.counts == [2, 1, 1, 1]
+    assert histogram.count == 5
+    assert histogram.max == 0.5
+
+
+def test_histogram_percentiles():
+    histogram = Histogram(bounds_ms=(1, 10, 100))
+    for _ in range(90):
+        histogram.record(0.0005)
+    for _ in range(9):
+        histogram.record(0.005)
+    histogram.record(0.2)
+
+    assert histogram.percentile(50) == 1
+    assert histogram.percentile(95) == 10
+    assert histogram.percentile(100) == 200.0
+
+    snapshot = histogram.snapshot
+    assert snapshot["count"] == 100
+    assert snapshot["buckets"] == {"<=1ms": 90, "<=10ms": 9, "<=100ms": 0, ">100ms": 1}
+
+
+def test_stage_timer():
+    timer = StageTimer()
+    timer.record("transfer", 0.002)
+    timer.record("wait", 0.09)
+
+    snapshot = timer.snapshot
+    assert set(snapshot) == set(StageTimer.STAGES)
+    assert snapshot["transfer"]["count"] == 1
+    assert snapshot["load"]["count"] == 0
+    assert "transfer" in timer.format()
+
+    timer.reset()
+    assert timer.snapshot["wait"]["count"] == 0
@@ -0,0 +1,68 @@
+import os
+import sys
+from pathlib import Path
+
+from PIL import Image
+
+root_path = Path(__file__).resolve().parents[1]
+sys.path.append(str(root_path))
+
+from Application.applogger import ApplicationLogger
+from Application.transitions import TransitionBuilder
+
+
+def test_crossfade_blends_between_frames():
+    from_frame = Image.new("RGB", (2, 2), (0, 0, 0))
+    to_frame = Image.new("RGB", (2, 2), (200, 100, 0))
+
+    frames = TransitionBuilder.crossfade(from_frame, to_frame, 3)
+
+    assert [frame.getpixel((0, 0)) for frame in frames] == [(50, 25, 0), (100, 50, 0), (150, 75, 0)]
+
+
+def test_ensure_builds_once_from_last_and_first_frame(tmp_path):
+    for emotion, colors in (("happy", [(10, 10, 10), (200, 0, 0)]), ("sleepy", [(0, 0, 200), (0, 0, 0)])):
+        (tmp_path / emotion).mkdir()
+        for i, color in enumerate(colors):
+            Image.new("RGB", (4, 4), color).save(tmp_path / emotion / f"frame{i + 1:03}.png")
+
+    builder = TransitionBuilder(ApplicationLogger(level=100), str(tmp_path), 1)
+    folder = builder.ensure("happy", "sleepy")
+
+    assert sorted(os.listdir(folder)) == ["frame001.png"]
+    with Image.open(os.path.join(folder, "frame001.png")) as frame:
+        assert frame.getpixel((0, 0)) == (100, 0, 100)
+
+    mtime = os.stat(os.path.join(folder, "frame001.png")).st_mtime_ns
+    assert builder.ensure("happy", "sleepy") == folder
+    assert os.stat(os.path.join(folder, "frame001.png")).st_mtime_ns == mtime
+
+    TransitionBuilder.clear(str(tmp_path))
+    assert not os.path.exists(folder)
+
+
+def test_ensure_starts_from_the_last_frame_shown_with_frames_skip(tmp_path):
+    # With every 2nd frame shown, the 3rd frame is the last one on the display
+    for emotion, colors in (("happy", [(10, 10, 10), (0, 0, 0), (200, 0, 0), (0, 200, 0)]), ("sleepy", [(0, 0, 200)])):
+        (tmp_path / emotion).mkdir()
+        for i, color in enumerate(colors):
+            Image.new("RGB", (4, 4), color).save(tmp_path / emotion / f"frame{i + 1:03}.png")
+
+    builder = TransitionBuilder(ApplicationLogger(level=100), str(tmp_path), 1, frames_skip=2)
+    folder = builder.ensure("happy", "sleepy")
+
+    with Image.open(os.path.join(folder, "frame001.png")) as frame:
+        assert frame.getpixel((0, 0)) == (100, 0, 100)
+    assert folder != TransitionBuilder(ApplicationLogger(level=100), str(tmp_path), 1).folder("happy", "sleepy")
+
+
+def test_clear_only_removes_transitions_of_emotion(tmp_path):
+    builder = TransitionBuilder(ApplicationLogger(level=100), str(tmp_path), 1)
+    for from_emotion, to_emotion in (("happy", "sleepy"), ("sleepy", "hot"), ("hot", "cold")):
+        os.makedirs(builder.folder(from_emotion, to_emotion))
+
+    TransitionBuilder.clear(str(tmp_path), "sleepy")
+
+    assert not os.path.exists(builder.folder("happy", "sleepy"))
+    assert not os.path.exists(builder.folder("sleepy", "hot"))
+    assert os.path.isdir(builder.folder("hot", "cold"))
@@ -0,0 +1,68 @@
+# SPDX-FileCopyrightText: 2023 Karl Bauer (BAUER GROUP)
+# SPDX-License-Identifier: MIT
+
+import os
+import sys
+import time
+from PIL import Image
+
+# Get the current script directory
+script_dir = os.path.dirname(os.path.realpath(__file__))
+sys.path.append(os.path.join(script_dir, '..'))
+
+from Application.imageprocessing import transform_image
+
+# Benchmark settings (same values as used by the application)
+emotion = sys.argv[1] if len(sys.argv) > 1 else 'happy'
+frame_count = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+shift_x = -25
+rotate = 0
+
+input_dir = os.path.join(script_dir, '../Application/assets', 'emotion', emotion)
+
+
+# Original per-pixel implementation, used as the baseline
+def reference_shift_and_wrap(image, x):
+    data = image.load()
+    new_data = {}
+
+    for y in range(image.size[1]):
+        for x_new in range(image.size[0]):
+            new_data[(x_new, y)] = data[((x_new - x) % image.size[0], y)]
+
+    new_image = Image.new(image.mode, image.size)
+    new_image.putdata([new_data[(x, y)] for y in range(image.size[1]) for x in range(image.size[0])])
+
+    return new_image
+
+
+def reference_transform_image(image):
+    if rotate != 0:
+        image = image.rotate(rotate)
+    if shift_x != 0:
+        image = reference_shift_and_wrap(image, shift_x)
+    return image
+
+
+# Decode the frames once, so only the transformation is measured
+image_files = sorted(f for f in os.listdir(input_dir) if f.endswith('.png'))[:frame_count]
+images = []
+for image_file in image_files:
+    with Image.open(os.path.join(input_dir, image_file)) as img:
+        img.load()
+        images.append(img.copy())
+
+results = {}
+for name, function in (('reference', reference_transform_image),
+                       ('buffer', lambda image: transform_image(image, rotate, shift_x))):
+    start = time.perf_counter()
+    outputs = [function(image) for image in images]
+    results[name] = (time.perf_counter() - start, outputs)
+
+identical = all(a.tobytes() == b.tobytes() for a, b in zip(results['reference'][1], results['buffer'][1]))
+
+# Print summary of the benchmark
+print(f"Frames: {len(images)} ({emotion}), shift_x={shift_x}, rotate={rotate}")
+for name, (duration, _) in results.items():
+    print(f"{name:>10}: {duration:8.3f} s total, {duration / len(images) * 1000:8.2f} ms/frame")
+print(f"Speedup: {results['reference'][0] / results['buffer'][0]:.1f}x, byte-identical: {identical}")
@@ -0,0 +1,77 @@
+# SPDX-FileCopyrightText: 2023 Karl Bauer (BAUER GROUP)
+# SPDX-License-Identifier: MIT
+
+import os
+import sys
+import json
+import time
+import logging
+import threading
+
+# Get the current script directory
+script_dir = os.path.dirname(os.path.realpath(__file__))
+sys.path.append(os.path.join(script_dir, '..'))
+
+from Application.applogger import ApplicationLogger
+from Application.displaymanager import DisplayManager, Emotions
+from Application.displaybackend import create_display_backend
+from Application.renderprocess import RenderProcess
+
+# Benchmark settings: seconds per mode, number of busy threads in the application process, backend (null or file)
+seconds_per_mode = float(sys.argv[1]) if len(sys.argv) > 1 else 20.0
+busy_threads = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+backend_name = sys.argv[3] if len(sys.argv) > 3 else 'null'
+
+logger = ApplicationLogger(level=logging.WARNING)
+display_settings = dict(frame_rate=10, frames_skip=5, shift_x=-25, rotate=0, stage_timing=True)
+
+# Stand-in for the sensor threads, the MQTT client and logging: pure Python work that holds the GIL
+payload = {f"sensor_{i}": {"value": i * 0.1, "unit": "lx", "history": list(range(50))} for i in range(50)}
+busy_logger = logging.getLogger("busy")
+busy_logger.addHandler(logging.NullHandler())
+
+
+def busy(stop_event):
+    while not stop_event.is_set():
+        busy_logger.info(json.dumps(payload))
+
+
+def run(mode):
+    if mode == 'thread':
+        display_manager = DisplayManager(logger, backend=create_display_backend(backend_name), **display_settings)
+    else:
+        display_manager = RenderProcess(logger, log_level=logging.WARNING, backend=backend_name, **display_settings)
+
+    stop_event = threading.Event()
+    threads = [threading.Thread(target=busy, args=(stop_event,), daemon=True) for _ in range(busy_threads)]
+    display_manager.start()
+    display_manager.wait_prepared()  # Measure the render loop, not the preprocessing
+    display_manager.set_emotion(Emotions.HAPPY)
+    time.sleep(1)  # Let the first frames load before the measured run starts
+    for thread in threads:
+        thread.start()
+    try:
+        for emotion in Emotions:
+            display_manager.set_emotion(emotion)
+            time.sleep(seconds_per_mode / len(Emotions))
+    finally:
+        stop_event.set()
+        for thread in threads:
+            thread.join()
+        display_manager.stop()
+    return display_manager.metrics
+
+
+# The render process is spawned and imports this script again, so the benchmark only runs in the main process
+if __name__ == '__main__':
+    results = {mode: run(mode) for mode in ('thread', 'process')}
+
+    # Print summary of the benchmark
+    print(f"Backend: {backend_name}, {busy_threads} busy thread(s), {seconds_per_mode:.0f} s per mode")
+    print(f"{'mode':>8} {'fps':>6} {'jitter':>9} {'max late':>9} {'late':>5} {'dropped':>7} {'overshoot p99':>14}")
+    for mode, metrics in results.items():
+        frames = metrics.get("frames", {})
+        overshoot = metrics.get("stages", {}).get("overshoot", {})
+        print(f"{mode:>8} {frames.get('achieved_fps', 0):>6} {frames.get('jitter_ms', 0):>7} ms "
+              f"{frames.get('max_lateness_ms', 0):>6} ms {frames.get('late_frames', 0):>5} {frames.get('dropped_frames', 0):>7} "
+              f"{overshoot.get('p99_ms', 0):>11} ms")
@@ -0,0 +1,45 @@
+# SPDX-FileCopyrightText: 2023 Karl Bauer (BAUER GROUP)
+# SPDX-License-Identifier: MIT
+
+import os
+import sys
+import json
+import time
+import logging
+
+# Get the current script directory
+script_dir = os.path.dirname(os.path.realpath(__file__))
+sys.path.append(os.path.join(script_dir, '..'))
+
+from Application.applogger import ApplicationLogger
+from Application.displaymanager import DisplayManager, Emotions
+from Application.displaybackend import create_display_backend
+
+# Benchmark settings: backend (null or file), seconds per emotion, optional output file of the file backend
+backend_name = sys.argv[1] if len(sys.argv) > 1 else 'null'
+seconds_per_emotion = float(sys.argv[2]) if len(sys.argv) > 2 else 3.0
+backend_path = sys.argv[3] if len(sys.argv) > 3 else None
+
+
+# The preprocessing workers import this script again, so the benchmark only runs in the main process
+if __name__ == '__main__':
+    # Runs the same render pipeline as the application, only the display is replaced
+    logger = ApplicationLogger(level=logging.INFO)
+    backend = create_display_backend(backend_name, path=backend_path)
+    display_manager = DisplayManager(logger, frame_rate=10, frames_skip=5, shift_x=-25, rotate=0, backend=backend,
+                                     stage_timing=True)
+    display_manager.wait_prepared()  # Measure the render pipeline, not the preprocessing
+
+    start = time.perf_counter()
+    display_manager.start()
+    try:
+        for emotion in Emotions:
+            display_manager.set_emotion(emotion)
+            time.sleep(seconds_per_emotion)
+    finally:
+        display_manager.stop()
+    duration = time.perf_counter() - start
+
+    # Print summary of the benchmark
+    print(f"Backend: {backend_name}, {len(Emotions)} emotions in {duration:.1f} s")
+    print(json.dumps(display_manager.metrics, indent=2))
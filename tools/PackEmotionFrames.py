@@ -0,0 +1,57 @@
+# SPDX-FileCopyrightText: 2023 Karl Bauer (BAUER GROUP)
+# SPDX-License-Identifier: MIT
+
+import os
+import sys
+import time
+import logging
+
+# Get the current script directory
+script_dir = os.path.dirname(os.path.realpath(__file__))
+sys.path.append(os.path.join(script_dir, '..'))
+
+from Application.applogger import ApplicationLogger
+from Application.assetpreprocessor import AssetPreprocessor
+from Application.displaymanager import DisplayManager
+from Application.framepack import FramePack
+from Application.frameset import FrameSet
+
+# Conversion settings (same values as used by the application)
+rotation = 90
+shift_x = -25
+frames_skip = 5
+frame_rate = 10
+
+
+def pack_emotions(input_dir, temp_dir, compression='none', shift_x=shift_x, frames_skip=frames_skip, frame_rate=frame_rate,
+                  rotation=rotation):
+    # The images are prepared into the temp folder of the application and the packs are written next to them,
+    # with the metadata the display manager checks, so the application loads them on its next start.
+    emotions = sorted(d for d in os.listdir(input_dir) if os.path.isdir(os.path.join(input_dir, d)))
+    preprocessor = AssetPreprocessor(ApplicationLogger(level=logging.INFO), input_dir, temp_dir, shift_x=shift_x)
+    preprocessor.prepare(emotions)
+
+    metadata = DisplayManager.frame_pack_metadata(rotation, frames_skip, compression)
+    duration = round(1000 / frame_rate)
+    for emotion in emotions:
+        start = time.perf_counter()
+        frames = FrameSet.load(os.path.join(temp_dir, emotion), rotation, frames_skip)
+        png_duration = time.perf_counter() - start
+
+        pack_path = os.path.join(temp_dir, emotion + FramePack.EXTENSION)
+        frames.save(pack_path, compression, duration, metadata)
+
+        start = time.perf_counter()
+        packed = FrameSet.load_pack(pack_path, metadata=metadata, duration=duration)
+        pack_duration = time.perf_counter() - start
+
+        print(f"{emotion:>10}: {len(packed)} frames ({len(packed.frames)} unique), {os.path.getsize(pack_path) / 1024 / 1024:6.2f} MB, "
+              f"load {png_duration * 1000:8.1f} ms (PNG) -> {pack_duration * 1000:6.1f} ms (pack)")
+
+
+if __name__ == '__main__':
+    compression = sys.argv[1] if len(sys.argv) > 1 else 'none'
+    temp_dir = sys.argv[2] if len(sys.argv) > 2 else os.path.join(script_dir, '../Application/assets', 'temp')
+    pack_emotions(os.path.join(script_dir, '../Application/assets', 'emotion'), temp_dir, compression)
+    print(f"Frame packs ({compression}) written to {os.path.realpath(temp_dir)}, "
+          f"they are used with DISPLAY_FRAME_PACK_COMPRESSION={compression}")